@@ -0,0 +1,210 @@
+"""
+Rolling per-calendar agenda shared by the cooking.py calendar tools.
+
+aubrey_next_meeting, aubrey_meeting_finder and aubrey_calendar_conflicts_detector
+all ask "what's on this calendar from about now to N days out". Instead of an
+events.list call per tool call, each calendar that is asked about gets a
+CalendarEventStore (see calendar_store.py): a time-sorted copy of its events
+from days_back ago to days_ahead from now, kept fresh with incremental
+syncToken syncs. Lookups bisect into it, so next_meeting is O(log n) and a
+range query is O(log n + events returned).
+
+How fresh the answers are is bounded: a read finds the view at most
+max_staleness seconds old, syncing first if it is older (incremental syncs
+are one small request). A background thread, if started, refreshes every
+view every refresh_seconds so reads rarely have to. Writes call invalidate(),
+so the next read syncs no matter how recent the last sync was.
+
+    agenda = AgendaViews(list_page)
+    events = agenda.list_events("primary", time_min, time_max)
+    if events is None:
+        events = <ask the API>   # view can't answer this range exactly
+
+list_page(calendar_id, params) must return one events.list response page for
+those params; errors with a .resp.status of 410 (sync token expired) make the
+view start over with a full sync.
+"""
+import os
+import threading
+
+from calendar_store import CalendarEventStore
+
+# Off by default: when on, the first read of each calendar pays for a full
+# sync of its window on the request path
+AGENDA_VIEW_ENABLED = os.getenv("AGENDA_VIEW_ENABLED", "false").lower() in ("1", "true", "yes")
+# Reads never see a view older than this many seconds
+AGENDA_MAX_STALENESS = float(os.getenv("AGENDA_MAX_STALENESS", "60"))
+# Background refresh interval (only while the refresh thread runs)
+AGENDA_REFRESH_SECONDS = float(os.getenv("AGENDA_REFRESH_SECONDS", "30"))
+# The window covers the tools' default ranges (finder: a week back and 30 days
+# ahead) with room to spare until the next full resync rolls it forward
+AGENDA_DAYS_BACK = int(os.getenv("AGENDA_DAYS_BACK", "8"))
+AGENDA_DAYS_AHEAD = int(os.getenv("AGENDA_DAYS_AHEAD", "31"))
+AGENDA_FULL_RESYNC_SECONDS = float(os.getenv("AGENDA_FULL_RESYNC_SECONDS", str(6 * 3600)))
+AGENDA_MAX_CALENDARS = int(os.getenv("AGENDA_MAX_CALENDARS", "20"))
+
+
+class _View:
+    def __init__(self, store):
+        self.store = store
+        self.lock = threading.Lock()  # CalendarEventStore isn't thread-safe
+        self.stale = False  # set by a write; forces a sync on the next read
+
+
+class AgendaViews:
+    """One CalendarEventStore per calendar, created when the calendar is first asked about"""
+
+    def __init__(self, list_page, max_staleness: float = AGENDA_MAX_STALENESS,
+                 refresh_seconds: float = AGENDA_REFRESH_SECONDS, days_back: int = AGENDA_DAYS_BACK,
+                 days_ahead: int = AGENDA_DAYS_AHEAD, full_resync_seconds: float = AGENDA_FULL_RESYNC_SECONDS,
+                 max_calendars: int = AGENDA_MAX_CALENDARS):
+        self.list_page = list_page
+        self.max_staleness = max_staleness
+        self.refresh_seconds = refresh_seconds
+        self.days_back = days_back
+        self.days_ahead = days_ahead
+        self.full_resync_seconds = full_resync_seconds
+        self.max_calendars = max_calendars
+        self._views = {}  # calendar id -> _View
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self.hits = 0       # reads answered from a view
+        self.fallbacks = 0  # reads the view couldn't answer
+        self.syncs = 0
+        self.sync_errors = 0
+
+    def _count(self, counter: str):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def _view(self, calendar_id):
+        with self._lock:
+            view = self._views.get(calendar_id)
+            if view is None and len(self._views) < self.max_calendars:
+                view = self._views[calendar_id] = _View(CalendarEventStore(
+                    days_back=self.days_back,
+                    days_ahead=self.days_ahead,
+                    full_resync_seconds=self.full_resync_seconds
+                ))
+            return view
+
+    def _sync(self, calendar_id, view):
+        """One sync of a view; the caller holds view.lock"""
+        store = view.store
+        view.stale = False
+        params = store.start_sync()
+        while params is not None:
+            try:
+                page = self.list_page(calendar_id, params)
+            except Exception as e:
+                # 410 Gone = the sync token expired; throw the copy away and resync
+                if getattr(getattr(e, "resp", None), "status", None) != 410:
+                    view.stale = True
+                    raise
+                print(f"Sync token for {calendar_id} expired, starting a full resync")
+                store.reset()
+                params = store.start_sync()
+                continue
+            params = store.apply_page(page)  # also takes the calendar's time zone from the page
+        self._count("syncs")
+
+    def _fresh(self, calendar_id, view, max_age):
+        age = view.store.seconds_since_sync()
+        if view.stale or age is None or age > max_age:
+            self._sync(calendar_id, view)
+
+    def list_events(self, calendar_id: str, time_min: str, time_max: str = None, max_results: int = None):
+        """Events overlapping [time_min, time_max), ordered by start, at most max_results (None: all)
+
+        Returns None when the view can't answer exactly (too many calendars,
+        range outside the window, or the sync failed); ask the API instead.
+        """
+        view = self._view(calendar_id)
+        if view is None:
+            self._count("fallbacks")
+            return None
+        with view.lock:
+            try:
+                self._fresh(calendar_id, view, self.max_staleness)
+            except Exception as e:
+                print(f"ERROR syncing agenda for {calendar_id}: {e}")
+                self._count("sync_errors")
+                self._count("fallbacks")
+                return None
+            limit = max_results if max_results is not None else len(view.store) + 1
+            try:
+                events = view.store.list_events(time_min, time_max, max_results=limit)
+            except ValueError:
+                events = None  # not an RFC3339 time; let the API report it
+        self._count("hits" if events is not None else "fallbacks")
+        return events
+
+    def timezone(self, calendar_id: str):
+        """The calendar's time zone, as reported by its last sync"""
+        with self._lock:
+            view = self._views.get(calendar_id)
+        if view is None:
+            return "UTC"
+        with view.lock:
+            return view.store.timezone
+
+    def invalidate(self, calendar_id: str = None, event: dict = None):
+        """After a write: every view syncs before its next read
+
+        All views, because a moved meeting also moves on its attendees'
+        calendars. If event is given it is applied to calendar_id's view right
+        away, so even a read that can't wait for a sync sees the write.
+        """
+        with self._lock:
+            views = list(self._views.items())
+        for view_calendar_id, view in views:
+            if event is not None and view_calendar_id == calendar_id:
+                with view.lock:
+                    view.store.apply_event(event)
+            view.stale = True
+
+    def refresh_all(self):
+        """Sync every view older than refresh_seconds"""
+        with self._lock:
+            views = list(self._views.items())
+        for calendar_id, view in views:
+            with view.lock:
+                try:
+                    self._fresh(calendar_id, view, self.refresh_seconds)
+                except Exception as e:
+                    print(f"ERROR refreshing agenda for {calendar_id}: {e}")
+                    self._count("sync_errors")
+
+    def _run(self):
+        while not self._stop.wait(self.refresh_seconds):
+            self.refresh_all()
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="agenda-refresh", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+
+    def stats(self):
+        with self._lock:
+            views = list(self._views.items())
+        return {
+            "hits": self.hits,
+            "fallbacks": self.fallbacks,
+            "syncs": self.syncs,
+            "sync_errors": self.sync_errors,
+            "max_staleness_seconds": self.max_staleness,
+            "calendars": {
+                calendar_id: {
+                    "events": len(view.store),
+                    "seconds_since_sync": (
+                        round(view.store.seconds_since_sync(), 1) if view.store.is_synced else None
+                    )
+                }
+                for calendar_id, view in views
+            }
+        }
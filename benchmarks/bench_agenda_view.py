@@ -0,0 +1,155 @@
+"""
+Benchmark: calendar reads through events.list vs the agenda view.
+
+A fake events.list serves a synthetic calendar of --sizes events spread over
+the agenda window, answering each call after --api-ms (the round trip to
+Google). The reads next_meeting, meeting_finder and the conflicts detector
+make are replayed --calls times, mixed evenly:
+- next meeting: from now, first event only
+- finder range: a week back to 30 days ahead
+- conflicts range: now to 7 days ahead
+and answered either by one events.list call each (all pages, as the tools
+do) or by agenda_view.AgendaViews. Every --write-every reads a meeting is
+moved, which invalidates the view the way meeting_rescheduler does, so the
+view pays for an incremental sync on the following read.
+
+Run from the repo root:
+    uv run python -m benchmarks.bench_agenda_view
+"""
+import argparse
+import random
+import time
+from datetime import datetime, timedelta, timezone
+
+import agenda_view
+from benchmarks.stub_server import percentile
+from calendar_store import parse_event_time, parse_rfc3339
+
+PAGE_SIZE = 2500
+
+
+def iso(moment):
+    return moment.isoformat().replace("+00:00", "Z")
+
+
+def make_events(count, seed=5):
+    rng = random.Random(seed)
+    now = datetime.now(timezone.utc)
+    events = []
+    for i in range(count):
+        start = now + timedelta(minutes=rng.randrange(-7 * 24 * 60, 30 * 24 * 60))
+        end = start + timedelta(minutes=rng.choice((15, 30, 45, 60)))
+        events.append({"id": f"e{i}", "summary": f"Meeting {i}",
+                       "start": {"dateTime": iso(start)}, "end": {"dateTime": iso(end)}})
+    return events
+
+
+class FakeEventsApi:
+    """events.list over an in-memory calendar, with a fixed round trip per call"""
+
+    def __init__(self, events, api_seconds):
+        self.events = {event["id"]: event for event in events}
+        self.api_seconds = api_seconds
+        self.changed = []
+        self.calls = 0
+
+    def list_page(self, calendar_id, params):
+        self.calls += 1
+        time.sleep(self.api_seconds)
+        if "syncToken" in params:
+            changed, self.changed = self.changed, []
+            return {"items": changed, "nextSyncToken": "next", "timeZone": "UTC"}
+        lower = parse_rfc3339(params["timeMin"])
+        upper = parse_rfc3339(params["timeMax"]) if params.get("timeMax") else None
+        matching = sorted(
+            (event for event in self.events.values()
+             if parse_event_time(event["end"]) > lower
+             and (upper is None or parse_event_time(event["start"]) < upper)),
+            key=lambda event: parse_event_time(event["start"])
+        )
+        offset = int(params.get("pageToken") or 0)
+        size = min(params.get("maxResults", PAGE_SIZE), PAGE_SIZE)
+        page = {"items": matching[offset:offset + size], "timeZone": "UTC"}
+        if offset + size < len(matching):
+            page["nextPageToken"] = str(offset + size)
+        elif "timeMin" in params and params.get("maxResults") == PAGE_SIZE:
+            page["nextSyncToken"] = "first"
+        return page
+
+    def move(self, event_id, minutes):
+        event = dict(self.events[event_id])
+        for key in ("start", "end"):
+            moment = datetime.fromtimestamp(parse_event_time(event[key]), timezone.utc)
+            event[key] = {"dateTime": iso(moment + timedelta(minutes=minutes))}
+        self.events[event_id] = event
+        self.changed.append(event)
+        return event
+
+
+def reads():
+    now = datetime.now(timezone.utc)
+    return [
+        (iso(now), None, 1),
+        (iso(now - timedelta(days=7)), iso(now + timedelta(days=30)), None),
+        (iso(now), iso(now + timedelta(days=7)), None),
+    ]
+
+
+def read_from_api(api, time_min, time_max, max_results):
+    params = {"timeMin": time_min, "singleEvents": True, "orderBy": "startTime",
+              "maxResults": max_results or PAGE_SIZE}
+    if time_max:
+        params["timeMax"] = time_max
+    events = []
+    while True:
+        page = api.list_page("primary", params)
+        events.extend(page["items"])
+        if max_results or not page.get("nextPageToken"):
+            return events
+        params = {**params, "pageToken": page["nextPageToken"]}
+
+
+def replay(read, api, calls, write_every, invalidate=None):
+    samples = []
+    event_ids = list(api.events)
+    queries = reads()
+    for i in range(calls):
+        if write_every and i and i % write_every == 0:
+            moved = api.move(random.choice(event_ids), 30)
+            if invalidate:
+                invalidate("primary", moved)
+        start = time.perf_counter()
+        read(*queries[i % len(queries)])
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def run(sizes, calls, api_seconds, write_every):
+    print(f"{calls} reads, {api_seconds * 1000:g} ms per events.list call, a meeting moved every {write_every} reads")
+    print(f"{'events':>8}{'mode':>8}{'API calls':>11}{'p50 ms':>9}{'p99 ms':>9}{'total s':>9}")
+    for size in sizes:
+        events = make_events(size)
+
+        api = FakeEventsApi(events, api_seconds)
+        samples = replay(lambda *query: read_from_api(api, *query), api, calls, write_every)
+        print(f"{size:>8}{'API':>8}{api.calls:>11}{percentile(samples, 50):>9.2f}"
+              f"{percentile(samples, 99):>9.2f}{sum(samples) / 1000:>9.2f}")
+
+        api = FakeEventsApi(events, api_seconds)
+        views = agenda_view.AgendaViews(api.list_page, max_calendars=1)
+        samples = replay(lambda *query: views.list_events("primary", *query), api, calls, write_every,
+                         invalidate=views.invalidate)
+        stats = views.stats()
+        assert stats["fallbacks"] == 0, stats
+        print(f"{size:>8}{'view':>8}{api.calls:>11}{percentile(samples, 50):>9.2f}"
+              f"{percentile(samples, 99):>9.2f}{sum(samples) / 1000:>9.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1_000, 10_000])
+    parser.add_argument("--calls", type=int, default=300)
+    parser.add_argument("--api-ms", type=float, default=80)
+    parser.add_argument("--write-every", type=int, default=50)
+    args = parser.parse_args()
+    run(args.sizes, args.calls, args.api_ms / 1000, args.write_every)
@@ -0,0 +1,106 @@
+"""
+Benchmark: one-request-per-event tools vs the batch-backed bulk tools.
+
+The stub understands both the regular events endpoints and the multipart
+batch endpoint, and every HTTP request pays a simulated network round trip.
+
+Run from the repo root:
+    uv run python -m benchmarks.bench_bulk_mutations
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import logging
+import time
+
+import google_auth
+import google_rate_limit
+import simple_calendar
+from calendar_batch import build_batch_response, parse_batch_request
+from benchmarks.stub_server import StubServer, json_response
+
+
+class CalendarBackend:
+    def __init__(self, round_trip_ms):
+        self.round_trip = round_trip_ms / 1000
+        self.events = {}
+        self.ids = itertools.count()
+
+    def call(self, method, path, body):
+        """Apply one API call and return (status, body)"""
+        if method == "POST":
+            event = dict(body, id=f"event{next(self.ids)}", etag='"1"')
+            self.events[event["id"]] = event
+            return 200, event
+        event_id = path.rsplit("/", 1)[-1]
+        if event_id not in self.events:
+            return 404, {"error": {"code": 404, "message": "Not Found"}}
+        if method == "DELETE":
+            del self.events[event_id]
+            return 204, None
+        self.events[event_id].update(body)
+        return 200, self.events[event_id]
+
+    def handle(self, method, path, headers, body):
+        time.sleep(self.round_trip)
+        if path.startswith("/batch/"):
+            operations = parse_batch_request(headers["Content-Type"], body)
+            results = [(op["index"], *self.call(op["method"], op["path"], op["body"])) for op in operations]
+            content_type, payload = build_batch_response(results)
+            return 200, {"Content-Type": content_type}, payload
+        status, payload = self.call(method, path, json.loads(body) if body else None)
+        if payload is None:
+            return status, {}, b""
+        return json_response(payload, status=status)
+
+
+def new_events(count):
+    return [
+        {"title": f"Event {i}", "start_time": "2026-01-15T10:00:00Z", "end_time": "2026-01-15T11:00:00Z"}
+        for i in range(count)
+    ]
+
+
+async def one_at_a_time(count):
+    ids = []
+    for event in new_events(count):
+        created = await simple_calendar.firstname_lastname_create_calendar_event(None, **event)
+        ids.append(created["id"])
+    for event_id in ids:
+        await simple_calendar.firstname_lastname_delete_calendar_event(None, event_id)
+
+
+async def bulk(count):
+    created = await simple_calendar.firstname_lastname_bulk_create_calendar_events(None, new_events(count))
+    ids = [result["event"]["id"] for result in created["results"] if result["success"]]
+    deleted = await simple_calendar.firstname_lastname_bulk_delete_calendar_events(None, ids)
+    assert created["failed"] == 0 and deleted["failed"] == 0
+
+
+async def run(count, round_trip_ms):
+    backend = CalendarBackend(round_trip_ms)
+    with StubServer(backend.handle) as server:
+        simple_calendar.CALENDAR_API_BASE = f"{server.url}/calendar/v3"
+        simple_calendar.CALENDAR_BATCH_URL = f"{server.url}/batch/calendar/v3"
+        simple_calendar._token_provider = google_auth.AccessTokenProvider(google_auth.StaticTokenSource("token"), token="token")
+        async with simple_calendar.http_client_lifespan():
+            print(f"{'mode':<18}{'requests':>10}{'seconds':>10}{'events/s':>12}")
+            for name, run_mode in [("one at a time", one_at_a_time), ("bulk (batch)", bulk)]:
+                requests_before = server.request_count
+                start = time.perf_counter()
+                await run_mode(count)
+                elapsed = time.perf_counter() - start
+                requests = server.request_count - requests_before
+                print(f"{name:<18}{requests:>10}{elapsed:>10.2f}{2 * count / elapsed:>12.0f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, default=500)
+    parser.add_argument("--round-trip-ms", type=float, default=20)
+    args = parser.parse_args()
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    # Measure the transport, not the client-side quota
+    google_rate_limit.configure(rate_per_second=1e9, burst=10**9)
+    asyncio.run(run(args.events, args.round_trip_ms))
@@ -0,0 +1,92 @@
+"""
+Benchmark: concurrent identical list_calendar_events calls, with and without coalescing.
+
+Simulates bursts of agent turns: each burst fires --concurrency list calls at
+once, drawn from only --distinct different queries, against a stub with a
+simulated round trip. Reports requests that reached the stub and latency, with
+coalescing bypassed, with coalescing, and with coalescing plus a short TTL.
+
+Run from the repo root:
+    uv run python -m benchmarks.bench_coalescing
+"""
+import argparse
+import asyncio
+import logging
+import time
+
+import google_auth
+import google_rate_limit
+import simple_calendar
+from benchmarks.stub_server import StubServer, json_response, percentile
+from singleflight import AsyncSingleFlight
+
+EVENTS_PAGE = {
+    "items": [
+        {"id": f"event{i}", "summary": f"Meeting {i}", "start": {"dateTime": "2026-01-15T10:00:00Z"}}
+        for i in range(25)
+    ]
+}
+
+
+class NoCoalescing:
+    """Stand-in for AsyncSingleFlight that always calls through"""
+
+    async def do(self, key, fn):
+        return await fn()
+
+    def clear(self):
+        pass
+
+
+async def run_bursts(bursts, concurrency, distinct, pause):
+    samples = []
+
+    async def one_call(index):
+        start = time.perf_counter()
+        await simple_calendar.firstname_lastname_list_calendar_events(
+            None, max_results=25, search_query=f"standup {index % distinct}"
+        )
+        samples.append((time.perf_counter() - start) * 1000)
+
+    for _ in range(bursts):
+        await asyncio.gather(*(one_call(i) for i in range(concurrency)))
+        await asyncio.sleep(pause)
+    return samples
+
+
+async def run(bursts, concurrency, distinct, round_trip_ms):
+    def handle_request(method, path, headers, body):
+        time.sleep(round_trip_ms / 1000)
+        return json_response(EVENTS_PAGE)
+
+    modes = [
+        ("no coalescing", NoCoalescing()),
+        ("singleflight", AsyncSingleFlight()),
+        ("singleflight+1s", AsyncSingleFlight(ttl=1.0)),
+    ]
+    with StubServer(handle_request) as server:
+        simple_calendar.CALENDAR_API_BASE = server.url
+        simple_calendar._token_provider = google_auth.AccessTokenProvider(google_auth.StaticTokenSource("token"), token="token")
+        simple_calendar._event_store = None  # Always ask the API
+        async with simple_calendar.http_client_lifespan():
+            print(f"{bursts} bursts x {concurrency} calls, {distinct} distinct queries, {round_trip_ms:.0f} ms round trip")
+            print(f"{'mode':<18}{'requests':>10}{'p50 ms':>10}{'p99 ms':>10}")
+            for name, flight in modes:
+                simple_calendar._read_flight = flight
+                requests_before = server.request_count
+                samples = await run_bursts(bursts, concurrency, distinct, pause=round_trip_ms / 1000)
+                requests = server.request_count - requests_before
+                print(f"{name:<18}{requests:>10}{percentile(samples, 50):>10.2f}{percentile(samples, 99):>10.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--bursts", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--distinct", type=int, default=3)
+    parser.add_argument("--round-trip-ms", type=float, default=30)
+    args = parser.parse_args()
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    # Measure the transport, not the client-side quota
+    google_rate_limit.configure(rate_per_second=1e9, burst=10**9)
+    asyncio.run(run(args.bursts, args.concurrency, args.distinct, args.round_trip_ms))
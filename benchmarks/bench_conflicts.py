@@ -0,0 +1,98 @@
+"""
+Benchmark: conflict detection, pairwise comparison vs the sweep line.
+
+Generates --sizes synthetic timed events (15-90 minutes, starting on a
+15-minute grid, dense enough that some overlap and many are
+back-to-back) and times, from raw event dicts to the lists of pairs:
+- pairwise: the old detector's loop, comparing every pair of events and
+  parsing timestamps inside the inner loop (only run up to --pairwise-max)
+- sweep: calendar_scheduling.event_interval + find_conflicts
+Where both run, the pairs they find are checked to be the same.
+
+Run from the repo root:
+    uv run python -m benchmarks.bench_conflicts
+"""
+import argparse
+import random
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+
+import calendar_scheduling
+
+
+def make_events(count, seed=11):
+    rng = random.Random(seed)
+    base = datetime(2026, 1, 5, tzinfo=timezone.utc)
+    # One event per hour on average, so some overlap and many touch
+    slots = count * 4
+    events = []
+    for i in range(count):
+        start = base + timedelta(minutes=15 * rng.randrange(slots))
+        end = start + timedelta(minutes=15 * rng.randint(1, 6))
+        events.append({
+            "id": f"e{i}",
+            "summary": f"Meeting {i}",
+            "start": {"dateTime": start.isoformat().replace("+00:00", "Z")},
+            "end": {"dateTime": end.isoformat().replace("+00:00", "Z")}
+        })
+    events.sort(key=lambda event: event["start"]["dateTime"])  # orderBy=startTime
+    return events
+
+
+def pairwise(events):
+    # The previous calendar_conflicts_detector loop, minus building the output dicts
+    overlaps, back_to_back = [], []
+    for i in range(len(events)):
+        event1 = events[i]
+        event1_start = datetime.fromisoformat(event1['start']['dateTime'].replace('Z', '+00:00'))
+        event1_end = datetime.fromisoformat(event1['end']['dateTime'].replace('Z', '+00:00'))
+        for j in range(i + 1, len(events)):
+            event2 = events[j]
+            event2_start = datetime.fromisoformat(event2['start']['dateTime'].replace('Z', '+00:00'))
+            event2_end = datetime.fromisoformat(event2['end']['dateTime'].replace('Z', '+00:00'))
+            if event1_start < event2_end and event2_start < event1_end:
+                overlaps.append((event1["id"], event2["id"]))
+            if event1_end == event2_start:
+                back_to_back.append((event1["id"], event2["id"]))
+    return overlaps, back_to_back
+
+
+def sweep(events):
+    intervals = [calendar_scheduling.event_interval(event) for event in events]
+    overlaps, back_to_back = calendar_scheduling.find_conflicts(intervals)
+    return (
+        [(first["id"], second["id"]) for first, second in overlaps],
+        [(first["id"], second["id"]) for first, second in back_to_back]
+    )
+
+
+def same_pairs(a, b):
+    # Events starting together may be reported in either order
+    return Counter(map(frozenset, a)) == Counter(map(frozenset, b))
+
+
+def run(sizes, pairwise_max):
+    print(f"{'events':>9}{'overlaps':>11}{'back2back':>11}{'pairwise s':>12}{'sweep s':>10}")
+    for size in sizes:
+        events = make_events(size)
+        start = time.perf_counter()
+        overlaps, back_to_back = sweep(events)
+        sweep_seconds = time.perf_counter() - start
+
+        pairwise_column = "-"
+        if size <= pairwise_max:
+            start = time.perf_counter()
+            expected = pairwise(events)
+            pairwise_column = f"{time.perf_counter() - start:.2f}"
+            assert same_pairs(overlaps, expected[0]) and same_pairs(back_to_back, expected[1])
+        print(f"{size:>9}{len(overlaps):>11}{len(back_to_back):>11}{pairwise_column:>12}{sweep_seconds:>10.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="1000,10000,100000,1000000",
+                        help="Comma-separated event counts")
+    parser.add_argument("--pairwise-max", type=int, default=10000)
+    args = parser.parse_args()
+    run([int(size) for size in args.sizes.split(",")], args.pairwise_max)
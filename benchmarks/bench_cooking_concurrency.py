@@ -0,0 +1,176 @@
+"""
+Benchmark: aubrey_next_meeting latency while recording summaries are running.
+
+cooking.py is imported against a throwaway token.pkl and its Google clients
+are swapped for fakes whose calls just sleep, as do the Drive download, ffmpeg
+and Speech-to-Text steps of aubrey_drive_meeting_summarizer. With --summaries
+summaries in progress, next_meeting is called every --interval-ms and its
+latency measured from when the call was due (time spent waiting for a blocked
+event loop counts, as it does for a client):
+- blocking: the tool bodies called directly on the event loop, which is how
+  the previous synchronous tools ran
+- thread pools: the async tools, with bodies on the light/heavy pools
+
+Run from the repo root:
+    uv run python -m benchmarks.bench_cooking_concurrency
+"""
+import argparse
+import asyncio
+import itertools
+import os
+import pickle
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+from google.oauth2.credentials import Credentials
+
+import google_rate_limit
+from benchmarks.stub_server import percentile
+
+RECORDING_IDS = itertools.count()
+SETTINGS = {"api_s": 0.02, "download_s": 0.5, "ffmpeg_s": 1.0, "speech_s": 2.0}
+
+
+class FakeRequest:
+    def __init__(self, delay, result):
+        self.delay = delay
+        self.result = result
+
+    def execute(self, **kwargs):
+        time.sleep(self.delay)
+        return self.result
+
+
+class FakeEvents:
+    def list(self, **kwargs):
+        start = (datetime.now(timezone.utc) + timedelta(hours=1)).isoformat().replace("+00:00", "Z")
+        event = {"id": "next", "summary": "Weekly sync", "start": {"dateTime": start}}
+        return FakeRequest(SETTINGS["api_s"], {"items": [event]})
+
+
+class FakeCalendarService:
+    def events(self):
+        return FakeEvents()
+
+
+class FakeFiles:
+    def list(self, q="", **kwargs):
+        if "Meet Recordings" in q:
+            return FakeRequest(SETTINGS["api_s"], {"files": [{"id": "folder", "name": "Meet Recordings"}]})
+        # A new recording every time, so summaries aren't answered from the transcript cache
+        recording = {"id": f"rec{next(RECORDING_IDS)}", "name": "Weekly sync.mp4", "mimeType": "video/mp4",
+                     "createdTime": "2026-01-15T10:00:00Z", "md5Checksum": "0"}
+        return FakeRequest(SETTINGS["api_s"], {"files": [recording]})
+
+
+class FakeDriveService:
+    def files(self):
+        return FakeFiles()
+
+
+def fake_decode(drive_service, file_id, mime_type="", chunk_size=None):
+    # Stands in for the Drive download and ffmpeg
+    time.sleep(SETTINGS["download_s"] + SETTINGS["ffmpeg_s"])
+    yield b"\0" * 32000
+
+
+class FakeBackend:
+    def __init__(self, credentials):
+        pass
+
+    def transcribe(self, pcm):
+        time.sleep(SETTINGS["speech_s"])
+        return "We decided to ship on Friday. Alex will write the notes."
+
+
+def write_token(workdir):
+    """Save credentials that are valid for a day (but can't reach Google) as workdir/token.pkl"""
+    creds = Credentials(
+        token="bench-token",
+        refresh_token="bench-refresh",
+        token_uri="https://oauth2.googleapis.com/token",
+        client_id="bench",
+        client_secret="bench",
+        expiry=datetime.now(timezone.utc).replace(tzinfo=None) + timedelta(days=1)
+    )
+    with open(os.path.join(workdir, "token.pkl"), "wb") as token_file:
+        pickle.dump(creds, token_file)
+
+
+def load_cooking():
+    """Import cooking.py with a valid throwaway token.pkl and fake Google clients"""
+    workdir = tempfile.mkdtemp()
+    write_token(workdir)
+    os.chdir(workdir)  # cooking.py reads token.pkl from the working directory
+    import cooking
+
+    calendar_service, drive_service = FakeCalendarService(), FakeDriveService()
+    cooking._calendar_service = lambda: calendar_service
+    cooking._drive_service = lambda: drive_service
+    cooking.meeting_audio.decode_drive_file = fake_decode
+    cooking.transcription.SpeechToTextBackend = FakeBackend
+    return cooking
+
+
+async def poll_next_meeting(next_meeting, duration, interval):
+    samples = []
+    start = time.perf_counter()
+    due = start
+    while due < start + duration:
+        await asyncio.sleep(max(0, due - time.perf_counter()))
+        result = await next_meeting()
+        assert "title" in result, result
+        samples.append((time.perf_counter() - due) * 1000)
+        due = max(due + interval, time.perf_counter())
+    return samples
+
+
+async def measure(next_meeting, summarize, summaries, duration, interval):
+    idle = await poll_next_meeting(next_meeting, 1, interval)
+
+    async def summarize_later(delay):
+        await asyncio.sleep(delay)
+        return await summarize()
+
+    # Summary requests arrive spread over the first half of the window
+    running = [asyncio.ensure_future(summarize_later(i * duration / 2 / summaries)) for i in range(summaries)]
+    busy = await poll_next_meeting(next_meeting, duration, interval)
+    results = await asyncio.gather(*running)
+    assert all("insights" in result for result in results), results
+    return idle, busy
+
+
+async def run(summaries, duration, interval):
+    cooking = load_cooking()
+    print(f"next_meeting latency with {summaries} summaries running "
+          f"(heavy pool: {cooking.HEAVY_TOOL_WORKERS} workers)")
+    print(f"{'mode':<14}{'idle p50':>10}{'idle p99':>10}{'busy p50':>10}{'busy p99':>10}{'busy max':>10}")
+
+    async def blocking_next_meeting():
+        return cooking.next_meeting.blocking()
+
+    async def blocking_summarize():
+        return cooking.drive_meeting_summarizer.blocking(date="2026-01-15")
+
+    modes = [
+        ("blocking", blocking_next_meeting, blocking_summarize),
+        ("thread pools", cooking.next_meeting, lambda: cooking.drive_meeting_summarizer(date="2026-01-15")),
+    ]
+    for name, next_meeting, summarize in modes:
+        idle, busy = await measure(next_meeting, summarize, summaries, duration, interval)
+        print(f"{name:<14}{percentile(idle, 50):>10.1f}{percentile(idle, 99):>10.1f}"
+              f"{percentile(busy, 50):>10.1f}{percentile(busy, 99):>10.1f}{max(busy):>10.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--summaries", type=int, default=4)
+    parser.add_argument("--duration", type=float, default=8)
+    parser.add_argument("--interval-ms", type=float, default=50)
+    args = parser.parse_args()
+    sys.path.insert(0, os.getcwd())  # cooking.py is imported after changing directory
+    # Measure the event loop, not the client-side quota
+    google_rate_limit.configure(rate_per_second=1e9, burst=10**9)
+    asyncio.run(run(args.summaries, args.duration, args.interval_ms / 1000))
@@ -0,0 +1,73 @@
+"""
+Benchmark: cooking.py cold start, from import to the first tool response.
+
+Each run starts a fresh Python process in a directory holding a valid
+throwaway token.pkl, imports cooking and calls aubrey_next_meeting once.
+Google's answer is canned (the request is still built with the real
+googleapiclient Calendar service), so the numbers are startup work only:
+- lazy: credentials and API clients are created by the first tool call,
+  which is how cooking.py starts now
+- eager: credentials are loaded and both services built right after the
+  import, before the server could bind its port, as cooking.py used to
+
+"ready" is when the server could bind its port; "first response" is when the
+first tool call returned. Medians over --runs runs.
+
+Run from the repo root:
+    uv run python -m benchmarks.bench_cooking_startup
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+from benchmarks.bench_cooking_concurrency import write_token
+
+CHILD = """
+import time
+start = time.perf_counter()
+import asyncio, json, sys
+import cooking
+imported = time.perf_counter()
+if sys.argv[1] == "eager":
+    import google_auth_oauthlib.flow
+    cooking._get_creds()
+    cooking._calendar_service()
+    cooking._drive_service()
+ready = time.perf_counter()
+cooking._execute = lambda request, api: {"items": [], "timeZone": "UTC"}
+result = asyncio.run(cooking.next_meeting())
+assert "error" not in result, result
+done = time.perf_counter()
+cooking.token_provider.stop()
+print(json.dumps({"import": imported - start, "ready": ready - start, "first response": done - start}))
+"""
+
+
+def run_once(mode, workdir):
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [os.getcwd(), os.getenv("PYTHONPATH")])))
+    output = subprocess.run(
+        [sys.executable, "-W", "ignore", "-c", CHILD, mode],
+        cwd=workdir, env=env, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def run(runs):
+    workdir = tempfile.mkdtemp()
+    write_token(workdir)
+    print(f"{'':<8}{'import':>10}{'ready':>10}{'first response':>16}   (ms, median of {runs})")
+    for mode in ("lazy", "eager"):
+        samples = [run_once(mode, workdir) for _ in range(runs)]
+        medians = {key: statistics.median(sample[key] for sample in samples) * 1000 for key in samples[0]}
+        print(f"{mode:<8}{medians['import']:>10.0f}{medians['ready']:>10.0f}{medians['first response']:>16.0f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+    run(args.runs)
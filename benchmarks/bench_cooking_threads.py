@@ -0,0 +1,95 @@
+"""
+Stress test: many concurrent cooking.py tool calls through googleapiclient.
+
+cooking.py runs its tool bodies on thread pools, and googleapiclient's
+httplib2 transport isn't thread-safe. --calls aubrey_next_meeting calls, each
+for a different calendar, are made --concurrency at a time against a local
+stub of the Calendar API. The stub names every event after the calendar it
+was listed from, so a response delivered to the wrong call is caught:
+- per thread: cooking._get_service, a service and transport per worker thread
+- shared: one Calendar service (and one httplib2 transport) for every
+  thread, as cooking.py used to have (run second: it leaves broken
+  connections behind)
+
+Real googleapiclient services are used throughout; only their endpoint is
+pointed at the stub.
+
+Run from the repo root:
+    uv run python -m benchmarks.bench_cooking_threads
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import os
+import socket
+import sys
+import tempfile
+import threading
+
+import googleapiclient.discovery
+
+import google_rate_limit
+from benchmarks.bench_cooking_concurrency import write_token
+from benchmarks.stub_server import StubServer, percentile
+from tests.cooking_stress import handler, stress
+
+
+def point_at(url):
+    """Make every googleapiclient service built from now on talk to url"""
+    build = googleapiclient.discovery.build
+
+    def build_for_stub(*args, **kwargs):
+        return build(*args, client_options={"api_endpoint": url + "/"}, **kwargs)
+    googleapiclient.discovery.build = build_for_stub
+
+
+def run(calls, concurrency):
+    workdir = tempfile.mkdtemp()
+    write_token(workdir)
+    os.chdir(workdir)  # cooking.py reads token.pkl from the working directory
+    with StubServer(handler) as stub:
+        point_at(stub.url)
+        import cooking
+        # Keep each call's output to the summary below
+        cooking.print = lambda *args, **kwargs: None
+
+        get_service = cooking._get_service
+        shared = {}
+        lock = threading.Lock()
+
+        def shared_service(name, version):
+            with lock:
+                if (name, version) not in shared:
+                    shared[(name, version)] = googleapiclient.discovery.build(
+                        name, version, credentials=cooking._get_creds(), static_discovery=True, cache_discovery=False
+                    )
+            return shared[(name, version)]
+
+        print(f"{calls} calls, {concurrency} at a time, {cooking.LIGHT_TOOL_WORKERS} worker threads")
+        print(f"{'':<12}{'calls/s':>9}{'p50 ms':>9}{'p99 ms':>9}{'errors':>8}{'wrong':>7}")
+        for name, service in (("per thread", get_service), ("shared", shared_service)):
+            cooking._get_service = service
+            # The tools print a traceback for every failed call
+            with contextlib.redirect_stderr(io.StringIO()):
+                seconds, latencies, errors, wrong = asyncio.run(stress(cooking, calls, concurrency))
+            print(f"{name:<12}{calls / seconds:>9.0f}{percentile(latencies, 50):>9.1f}"
+                  f"{percentile(latencies, 99):>9.1f}{len(errors):>8}{wrong:>7}")
+            for error in sorted(set(errors))[:3]:
+                print(f"    e.g. {error[:100]}")
+        print(f"per-thread services built: {cooking._service_stats['built']}")
+        cooking.token_provider.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    args = parser.parse_args()
+    sys.path.insert(0, os.getcwd())  # cooking.py is imported after changing directory
+    # Measure the transport, not the client-side quota
+    google_rate_limit.configure(rate_per_second=1e9, burst=10**9)
+    # googleapiclient's default is 60 s; a shared transport that lost track of
+    # its responses would otherwise hang that long per call
+    socket.setdefaulttimeout(2)
+    run(args.calls, args.concurrency)
@@ -0,0 +1,101 @@
+"""
+Benchmark: update_calendar_event via GET+PUT vs PATCH with If-Match.
+
+The stub event has a large attendee list, and every request pays a simulated
+network round trip, so the difference in round trips and request size shows
+up the way it would against Google.
+
+Run from the repo root:
+    uv run python -m benchmarks.bench_event_update
+"""
+import argparse
+import asyncio
+import json
+import logging
+import time
+
+import google_auth
+import google_rate_limit
+import simple_calendar
+from benchmarks.stub_server import StubServer, json_response, percentile
+
+
+class EventBackend:
+    """Holds one event and answers GET/PUT/PATCH the way the Calendar API does"""
+
+    def __init__(self, attendees, round_trip_ms):
+        self.round_trip = round_trip_ms / 1000
+        self.version = 1
+        self.bytes_received = 0
+        self.event = {
+            "id": "bench-event",
+            "etag": '"1"',
+            "summary": "All hands",
+            "start": {"dateTime": "2026-01-15T10:00:00Z"},
+            "end": {"dateTime": "2026-01-15T11:00:00Z"},
+            "attendees": [
+                {"email": f"person{i}@example.com", "responseStatus": "accepted"}
+                for i in range(attendees)
+            ]
+        }
+
+    def handle(self, method, path, headers, body):
+        time.sleep(self.round_trip)
+        self.bytes_received += len(body)
+        if method == "GET":
+            return json_response(self.event)
+        if_match = headers.get("If-Match")
+        if if_match and if_match != self.event["etag"]:
+            return json_response({"error": {"code": 412}}, status=412)
+        changes = json.loads(body)
+        if method == "PUT":
+            self.event = changes
+        else:
+            self.event.update(changes)
+        self.version += 1
+        self.event["etag"] = f'"{self.version}"'
+        return json_response(self.event)
+
+
+async def measure(backend, updates, use_patch, warm_cache):
+    samples = []
+    bytes_before = backend.bytes_received
+    for i in range(updates):
+        if not warm_cache:
+            simple_calendar._event_cache.invalidate("bench-event")
+        start = time.perf_counter()
+        await simple_calendar.firstname_lastname_update_calendar_event(
+            None, "bench-event", title=f"All hands #{i}", use_patch=use_patch
+        )
+        samples.append((time.perf_counter() - start) * 1000)
+    sent_kb = (backend.bytes_received - bytes_before) / updates / 1024
+    return samples, sent_kb
+
+
+async def run(updates, attendees, round_trip_ms):
+    backend = EventBackend(attendees, round_trip_ms)
+    with StubServer(backend.handle) as server:
+        simple_calendar.CALENDAR_API_BASE = server.url
+        simple_calendar._token_provider = google_auth.AccessTokenProvider(google_auth.StaticTokenSource("token"), token="token")
+        candidates = [
+            ("GET + PUT", False, False),
+            ("PATCH, no ETag", True, False),
+            ("PATCH, known ETag", True, True),
+        ]
+        async with simple_calendar.http_client_lifespan():
+            print(f"{'flow':<20}{'p50 ms':>10}{'p99 ms':>10}{'KB sent':>10}")
+            for name, use_patch, warm_cache in candidates:
+                samples, sent_kb = await measure(backend, updates, use_patch, warm_cache)
+                print(f"{name:<20}{percentile(samples, 50):>10.2f}{percentile(samples, 99):>10.2f}{sent_kb:>10.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--updates", type=int, default=100)
+    parser.add_argument("--attendees", type=int, default=500)
+    parser.add_argument("--round-trip-ms", type=float, default=20)
+    args = parser.parse_args()
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    # Measure the transport, not the client-side quota
+    google_rate_limit.configure(rate_per_second=1e9, burst=10**9)
+    asyncio.run(run(args.updates, args.attendees, args.round_trip_ms))
@@ -0,0 +1,124 @@
+"""
+Benchmark: listing many calendars, one call per calendar vs the fan-out merge.
+
+The stub serves --calendars calendars of --events-per-calendar events each,
+ordered by start time and paginated like events.list, with a simulated round
+trip per request. Every mode returns the first --max-results events across all
+calendars; the result is checked against a full sort of every event.
+
+Run from the repo root:
+    uv run python -m benchmarks.bench_fanout
+"""
+import argparse
+import asyncio
+import logging
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from urllib.parse import parse_qs, unquote, urlsplit
+
+import google_auth
+import google_rate_limit
+import simple_calendar
+from benchmarks.stub_server import StubServer, json_response
+
+
+class CalendarsBackend:
+    def __init__(self, calendars, events_per_calendar, round_trip_ms):
+        self.round_trip = round_trip_ms / 1000
+        self.items_sent = 0
+        base = datetime(2026, 1, 1, tzinfo=timezone.utc)
+        rng = random.Random(7)
+        self.calendars = {}
+        for c in range(calendars):
+            starts = sorted(base + timedelta(minutes=rng.randrange(60 * 24 * 90)) for _ in range(events_per_calendar))
+            self.calendars[f"team{c}@group.calendar.google.com"] = [
+                {
+                    "id": f"c{c}e{i}",
+                    "iCalUID": f"c{c}e{i}@google.com",
+                    "summary": f"Calendar {c} event {i}",
+                    "start": {"dateTime": start.isoformat().replace("+00:00", "Z")},
+                    "end": {"dateTime": (start + timedelta(minutes=30)).isoformat().replace("+00:00", "Z")}
+                }
+                for i, start in enumerate(starts)
+            ]
+
+    def handle(self, method, path, headers, body):
+        time.sleep(self.round_trip)
+        parts = urlsplit(path)
+        query = parse_qs(parts.query)
+        calendar_id = unquote(parts.path.split("/calendars/", 1)[1].rsplit("/events", 1)[0])
+        events = self.calendars[calendar_id]
+        offset = int(query.get("pageToken", ["0"])[0])
+        size = int(query.get("maxResults", ["250"])[0])
+        page = {"items": events[offset:offset + size]}
+        if offset + size < len(events):
+            page["nextPageToken"] = str(offset + size)
+        self.items_sent += len(page["items"])
+        return json_response(page)
+
+
+async def one_call_per_calendar(backend, max_results):
+    # What an agent does today: list each calendar separately, then sort everything
+    events = []
+    for calendar_id in backend.calendars:
+        page = await simple_calendar._get_calendar_data(
+            "token", simple_calendar._calendar_events_url(calendar_id), params={"maxResults": max_results}
+        )
+        events.extend(page["items"])
+    events.sort(key=lambda event: simple_calendar.parse_event_time(event["start"]))
+    return [event["id"] for event in events[:max_results]]
+
+
+async def fan_out(backend, max_results):
+    result = await simple_calendar.firstname_lastname_list_events_across_calendars(
+        None, calendar_ids=list(backend.calendars), max_results=max_results, profile="ids-only"
+    )
+    return [event["id"] for event in result["events"]]
+
+
+async def run(calendars, events_per_calendar, max_results, round_trip_ms):
+    backend = CalendarsBackend(calendars, events_per_calendar, round_trip_ms)
+    everything = sorted(
+        (event for events in backend.calendars.values() for event in events),
+        key=lambda event: (simple_calendar.parse_event_time(event["start"]))
+    )
+    expected_starts = [simple_calendar.parse_event_time(event["start"]) for event in everything[:max_results]]
+    starts_by_id = {event["id"]: simple_calendar.parse_event_time(event["start"]) for event in everything}
+
+    with StubServer(backend.handle) as server:
+        simple_calendar.CALENDAR_API_BASE = server.url
+        simple_calendar._token_provider = google_auth.AccessTokenProvider(google_auth.StaticTokenSource("token"), token="token")
+        modes = [
+            ("one per calendar", one_call_per_calendar, None),
+            ("fan-out x1", fan_out, 1),
+            ("fan-out x8", fan_out, 8),
+            ("fan-out x32", fan_out, 32),
+        ]
+        print(f"{calendars} calendars x {events_per_calendar} events, first {max_results}, {round_trip_ms:.0f} ms round trip")
+        print(f"{'mode':<18}{'requests':>10}{'items':>9}{'seconds':>9}")
+        async with simple_calendar.http_client_lifespan():
+            for name, list_events, concurrency in modes:
+                if concurrency:
+                    simple_calendar.FANOUT_CONCURRENCY = concurrency
+                requests_before, items_before = server.request_count, backend.items_sent
+                start = time.perf_counter()
+                ids = await list_events(backend, max_results)
+                elapsed = time.perf_counter() - start
+                # Ties may come out in any order, so compare start times
+                assert [starts_by_id[event_id] for event_id in ids] == expected_starts
+                print(f"{name:<18}{server.request_count - requests_before:>10}"
+                      f"{backend.items_sent - items_before:>9}{elapsed:>9.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calendars", type=int, default=30)
+    parser.add_argument("--events-per-calendar", type=int, default=2000)
+    parser.add_argument("--max-results", type=int, default=100)
+    parser.add_argument("--round-trip-ms", type=float, default=40)
+    args = parser.parse_args()
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    # Measure the transport, not the client-side quota
+    google_rate_limit.configure(rate_per_second=1e9, burst=10**9)
+    asyncio.run(run(args.calendars, args.events_per_calendar, args.max_results, args.round_trip_ms))
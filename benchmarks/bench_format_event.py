@@ -0,0 +1,135 @@
+"""
+Microbenchmark: format_event_to_document profiles over large events.
+
+Synthetic events carry a 500-attendee list plus conference data. For each
+profile it measures JSON parsing of the payload Google would send for that
+profile's fields= mask, then rendering, and compares against the previous
+string-concatenation renderer on the full payload.
+
+Run from the repo root:
+    uv run python -m benchmarks.bench_format_event
+"""
+import argparse
+import json
+import time
+
+import simple_calendar
+
+
+def make_event(index, attendees):
+    return {
+        "kind": "calendar#event",
+        "etag": f'"{index}"',
+        "id": f"event{index}",
+        "status": "confirmed",
+        "htmlLink": f"https://www.google.com/calendar/event?eid=event{index}",
+        "summary": f"Quarterly planning {index}",
+        "description": "Agenda: roadmap, staffing, budget. " * 20,
+        "location": "Main auditorium",
+        "start": {"dateTime": "2026-01-15T10:00:00Z"},
+        "end": {"dateTime": "2026-01-15T11:00:00Z"},
+        "attendees": [
+            {
+                "email": f"person{i}@example.com",
+                "displayName": f"Person {i}",
+                "responseStatus": "accepted",
+                "organizer": i == 0
+            }
+            for i in range(attendees)
+        ],
+        "conferenceData": {
+            "entryPoints": [
+                {"entryPointType": "phone", "uri": "tel:+1-555-0100"},
+                {"entryPointType": "video", "uri": "https://meet.google.com/abc-defg-hij"}
+            ]
+        }
+    }
+
+
+def legacy_format_event_to_document(event):
+    # The renderer before output profiles, kept here as the baseline
+    summary = event.get("summary", "(No title)")
+    description = event.get("description", "")
+    location = event.get("location", "")
+    html_link = event.get("htmlLink", "")
+    start = event.get("start", {})
+    end = event.get("end", {})
+    start_time = start.get("dateTime", start.get("date", "Not specified"))
+    end_time = end.get("dateTime", end.get("date", "Not specified"))
+    attendees = event.get("attendees", [])
+    attendees_formatted = []
+    for attendee in attendees:
+        name = attendee.get("displayName", attendee.get("email", "Unknown"))
+        status = attendee.get("responseStatus", "needsAction")
+        organizer = " (Organizer)" if attendee.get("organizer") else ""
+        attendees_formatted.append(f"{name} - {status}{organizer}")
+    conference_link = ""
+    conference_data = event.get("conferenceData", {})
+    if conference_data:
+        for entry in conference_data.get("entryPoints", []):
+            if entry.get("entryPointType") == "video":
+                conference_link = entry.get("uri", "")
+                break
+    content = f"# {summary}\n\n"
+    if description:
+        content += f"**Description:** {description}\n\n"
+    content += f"**Start:** {start_time}\n"
+    content += f"**End:** {end_time}\n\n"
+    if location:
+        content += f"**Location:** {location}\n\n"
+    if attendees_formatted:
+        content += f"**Attendees ({len(attendees_formatted)}):**\n"
+        for attendee in attendees_formatted:
+            content += f"  - {attendee}\n"
+        content += "\n"
+    if conference_link:
+        content += f"**Video Conference:** {conference_link}\n\n"
+    content += f"**Status:** {event.get('status', 'confirmed')}\n"
+    if html_link:
+        content += f"**Link:** {html_link}\n"
+    return {"id": event.get("id"), "content": content.strip()}
+
+
+def project(event, profile):
+    """What Google would return for the profile's fields= mask"""
+    mask = simple_calendar.event_fields_mask(profile)
+    if mask is None:
+        return event
+    return {field: event[field] for field in mask.split(",") if field in event}
+
+
+def bench(label, payloads, render):
+    start = time.perf_counter()
+    events = [json.loads(payload) for payload in payloads]
+    parsed = time.perf_counter()
+    for event in events:
+        render(event)
+    rendered = time.perf_counter()
+    parse_us = (parsed - start) / len(payloads) * 1e6
+    render_us = (rendered - parsed) / len(payloads) * 1e6
+    size_kb = sum(len(payload) for payload in payloads) / len(payloads) / 1024
+    print(f"{label:<14}{size_kb:>12.1f}{parse_us:>12.1f}{render_us:>12.1f}{parse_us + render_us:>12.1f}")
+
+
+def run(events, attendees):
+    synthetic = [make_event(i, attendees) for i in range(events)]
+
+    # The new full profile must render exactly what the old renderer did
+    assert (simple_calendar.format_event_to_document(synthetic[0])["content"]
+            == legacy_format_event_to_document(synthetic[0])["content"])
+
+    print(f"{events} events x {attendees} attendees")
+    print(f"{'renderer':<14}{'payload KB':>12}{'parse us':>12}{'render us':>12}{'total us':>12}")
+    full_payloads = [json.dumps(event) for event in synthetic]
+    bench("legacy (+=)", full_payloads, legacy_format_event_to_document)
+    for profile in simple_calendar.EVENT_PROFILES:
+        payloads = [json.dumps(project(event, profile)) for event in synthetic]
+        bench(profile, payloads, lambda event: simple_calendar.format_event_to_document(event, profile))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, default=2000)
+    parser.add_argument("--attendees", type=int, default=500)
+    args = parser.parse_args()
+    run(args.events, args.attendees)
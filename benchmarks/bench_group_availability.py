@@ -0,0 +1,103 @@
+"""
+Benchmark: group availability for many attendees, interval loops vs bitmaps.
+
+Generates --attendees calendars with 1-4 meetings a day over
+--days days and asks for the best --duration-minutes slots where at least
+--quorum of them are free, inside 9-17 working hours, starting on a
+--granularity-minute grid:
+- intervals: for every candidate start and every attendee, binary search
+  that attendee's sorted busy list (the natural pure-Python approach)
+- bitmaps: group_availability.busy_bitmap + quorum_slots
+Both approaches must return the same slots.
+
+Run from the repo root:
+    uv run python -m benchmarks.bench_group_availability
+"""
+import argparse
+import bisect
+import random
+import time
+from datetime import datetime, timezone
+
+import calendar_scheduling
+import group_availability
+
+WINDOW_START = datetime(2026, 1, 5, tzinfo=timezone.utc).timestamp()
+
+
+def make_busy(attendees, days, seed=5):
+    rng = random.Random(seed)
+    busy_by_attendee = []
+    for _ in range(attendees):
+        busy = []
+        for day in range(days):
+            for _ in range(rng.randint(1, 4)):
+                start = WINDOW_START + day * 86400 + 8 * 3600 + 15 * 60 * rng.randrange(40)
+                busy.append((start, start + 15 * 60 * rng.randint(2, 8)))
+        busy_by_attendee.append(busy)
+    return busy_by_attendee
+
+
+def interval_quorum_slots(busy_by_attendee, allowed, duration, quorum, granularity, max_slots):
+    merged = [calendar_scheduling.merge_intervals(busy) for busy in busy_by_attendee]
+    ends = [[end for _, end in intervals] for intervals in merged]
+    scored = []
+    for start_minute in range(0, len(allowed) - duration + 1, granularity):
+        if not all(allowed[start_minute:start_minute + duration]):
+            continue
+        start = WINDOW_START + start_minute * 60
+        end = start + duration * 60
+        free = 0
+        for intervals, interval_ends in zip(merged, ends):
+            index = bisect.bisect_right(interval_ends, start)
+            if index == len(intervals) or intervals[index][0] >= end:
+                free += 1
+        if free >= quorum:
+            scored.append((-free, start_minute))
+    scored.sort()
+    slots = []
+    for negative_free, start_minute in scored:
+        if all(start_minute + duration <= other or other + duration <= start_minute for other, _ in slots):
+            slots.append((start_minute, -negative_free))
+            if len(slots) == max_slots:
+                break
+    return slots
+
+
+def run(attendees, days, duration, quorum, granularity, max_slots):
+    busy_by_attendee = make_busy(attendees, days)
+    window_end = WINDOW_START + days * 86400
+    allowed = group_availability.working_minutes(WINDOW_START, window_end)
+    print(f"{attendees} attendees, {days} days, {sum(map(len, busy_by_attendee))} busy blocks, "
+          f"{duration}-minute slots every {granularity} minutes with at least {quorum} free")
+
+    start = time.perf_counter()
+    expected = interval_quorum_slots(busy_by_attendee, allowed.tolist(), duration, quorum, granularity, max_slots)
+    interval_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    busy = group_availability.busy_bitmap(busy_by_attendee, WINDOW_START, window_end)
+    raster_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    slots = group_availability.quorum_slots(
+        busy, allowed, duration, quorum, granularity=granularity, max_slots=max_slots
+    )
+    quorum_seconds = time.perf_counter() - start
+    assert slots == expected, (slots, expected)
+
+    print(f"{'intervals':<22}{interval_seconds:>8.3f} s")
+    print(f"{'bitmaps: rasterize':<22}{raster_seconds:>8.3f} s  ({busy.nbytes / 1e6:.0f} MB)")
+    print(f"{'bitmaps: quorum':<22}{quorum_seconds:>8.3f} s")
+    print(f"best slots (minute, free): {slots}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--attendees", type=int, default=500)
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--duration-minutes", type=int, default=60)
+    parser.add_argument("--quorum", type=int, default=250)
+    parser.add_argument("--granularity", type=int, default=15)
+    parser.add_argument("--max-slots", type=int, default=5)
+    args = parser.parse_args()
+    run(args.attendees, args.days, args.duration_minutes, args.quorum, args.granularity, args.max_slots)
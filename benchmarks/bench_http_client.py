@@ -0,0 +1,87 @@
+"""
+Benchmark: shared pooled HTTP client vs a new httpx.AsyncClient per call.
+
+Runs the simple_calendar GET helper against a local stub server and reports
+latency percentiles (sequential calls) and throughput (concurrent calls).
+
+Run from the repo root:
+    uv run python -m benchmarks.bench_http_client
+"""
+import argparse
+import asyncio
+import logging
+import time
+
+import httpx
+
+import google_rate_limit
+import simple_calendar
+from benchmarks.stub_server import StubServer, json_response, percentile
+
+EVENTS_PAGE = {
+    "items": [
+        {"id": f"event{i}", "summary": f"Meeting {i}", "start": {"dateTime": "2026-01-15T10:00:00Z"}}
+        for i in range(10)
+    ]
+}
+
+
+def handle_request(method, path, headers, body):
+    return json_response(EVENTS_PAGE)
+
+
+async def fetch_with_per_call_client(access_token, url, params=None):
+    # The previous behaviour of _fetch_calendar_data: one client per call
+    headers = {"Authorization": f"Bearer {access_token}"}
+    async with httpx.AsyncClient() as client:
+        response = await client.get(url, headers=headers, params=params)
+        response.raise_for_status()
+        return response.json()
+
+
+async def measure_latency(fetch, url, requests):
+    samples = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        await fetch("token", url)
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+async def measure_throughput(fetch, url, requests, concurrency):
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one_call():
+        async with semaphore:
+            await fetch("token", url)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one_call() for _ in range(requests)))
+    return requests / (time.perf_counter() - start)
+
+
+async def run(requests, concurrency):
+    with StubServer(handle_request) as server:
+        url = f"{server.url}/calendar/v3/calendars/primary/events"
+        candidates = [
+            ("per-call client", fetch_with_per_call_client),
+            ("shared client", simple_calendar._get_calendar_data),  # Uncoalesced GET
+        ]
+        async with simple_calendar.http_client_lifespan():
+            print(f"{'client':<18}{'p50 ms':>10}{'p99 ms':>10}{'req/s':>12}")
+            for name, fetch in candidates:
+                await measure_latency(fetch, url, 10)  # Warm up
+                samples = await measure_latency(fetch, url, requests)
+                throughput = await measure_throughput(fetch, url, requests, concurrency)
+                print(f"{name:<18}{percentile(samples, 50):>10.2f}{percentile(samples, 99):>10.2f}{throughput:>12.0f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=20)
+    args = parser.parse_args()
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    # Measure the transport, not the client-side quota
+    google_rate_limit.configure(rate_per_second=1e9, burst=10**9)
+    asyncio.run(run(args.requests, args.concurrency))
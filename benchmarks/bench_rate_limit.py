@@ -0,0 +1,92 @@
+"""
+Benchmark: a burst of calendar calls against a stub that enforces a quota.
+
+The stub plays Google's per-user quota: it allows --quota requests per second
+and answers the rest with 429 + Retry-After, and fails a fraction of requests
+with 503. The same burst of concurrent GETs runs through simple_calendar's
+helper with the limiter effectively off (no retries, unlimited rate) and with
+the shared token bucket + backoff, reporting failed calls, requests that reached
+the stub, 429s received, and time spent throttled or backing off.
+
+Run from the repo root:
+    uv run python -m benchmarks.bench_rate_limit
+"""
+import argparse
+import asyncio
+import logging
+import random
+import threading
+import time
+
+import httpx
+
+import google_rate_limit
+import simple_calendar
+from benchmarks.stub_server import StubServer, json_response
+
+
+class QuotaBackend:
+    def __init__(self, quota_per_second, error_rate):
+        self.quota = quota_per_second
+        self.error_rate = error_rate
+        self.window_start = time.monotonic()
+        self.window_count = 0
+        self.rejected = 0
+        self._lock = threading.Lock()
+
+    def handle(self, method, path, headers, body):
+        with self._lock:
+            now = time.monotonic()
+            if now - self.window_start >= 1:
+                self.window_start, self.window_count = now, 0
+            self.window_count += 1
+            over_quota = self.window_count > self.quota
+            if over_quota:
+                self.rejected += 1
+        if over_quota:
+            error = {"error": {"code": 429, "message": "Rate Limit Exceeded"}}
+            return json_response(error, status=429, headers={"Retry-After": "1"})
+        if random.random() < self.error_rate:
+            return json_response({"error": {"code": 503, "message": "Backend Error"}}, status=503)
+        return json_response({"items": []})
+
+
+async def burst(url, calls):
+    async def one_call():
+        try:
+            await simple_calendar._get_calendar_data("token", url)  # Uncoalesced, so every call is sent
+            return True
+        except httpx.HTTPStatusError:
+            return False
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*(one_call() for _ in range(calls)))
+    return results.count(False), time.perf_counter() - start
+
+
+async def run(calls, quota, error_rate):
+    print(f"{calls} concurrent calls, stub quota {quota}/s, {error_rate:.0%} injected 503s")
+    print(f"{'client':<16}{'failed':>8}{'sent':>8}{'429s':>8}{'seconds':>9}{'throttled s':>13}{'backoff s':>11}")
+    modes = [
+        ("no limiter", dict(rate_per_second=1e9, burst=10**9, max_retries=0)),
+        ("token bucket", dict(rate_per_second=quota * 0.9, burst=quota // 2, max_retries=5)),
+    ]
+    for name, settings in modes:
+        backend = QuotaBackend(quota, error_rate)
+        google_rate_limit.configure(**settings)
+        with StubServer(backend.handle) as server:
+            async with simple_calendar.http_client_lifespan():
+                failed, elapsed = await burst(f"{server.url}/calendar/v3/calendars/primary/events", calls)
+        counters = next(iter(google_rate_limit.stats().values()))
+        print(f"{name:<16}{failed:>8}{server.request_count:>8}{backend.rejected:>8}{elapsed:>9.2f}"
+              f"{counters['throttled_seconds']:>13.1f}{counters['backoff_seconds']:>11.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--quota", type=int, default=50)
+    parser.add_argument("--error-rate", type=float, default=0.02)
+    args = parser.parse_args()
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    asyncio.run(run(args.calls, args.quota, args.error_rate))
@@ -0,0 +1,113 @@
+"""
+Benchmark: refresh-ahead token provider vs refreshing on the request path.
+
+A local fake OAuth token endpoint issues short-lived tokens (--lifetime
+seconds) and takes --refresh-ms to answer. --callers threads ask for a token in
+a loop for --duration seconds, spanning several expiries. Reports how many
+refreshes hit the endpoint, how many token lookups had to wait for one, and
+lookup latency, for:
+- on demand: refresh when the token has expired, every caller on its own
+- provider: AccessTokenProvider with background refresh-ahead
+
+Run from the repo root:
+    uv run python -m benchmarks.bench_token_refresh
+"""
+import argparse
+import itertools
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from urllib.parse import parse_qs
+
+import google_auth
+from benchmarks.stub_server import StubServer, json_response, percentile
+
+
+class FakeTokenEndpoint:
+    def __init__(self, lifetime, refresh_ms):
+        self.lifetime = lifetime
+        self.delay = refresh_ms / 1000
+        self.counter = itertools.count(1)
+
+    def handle(self, method, path, headers, body):
+        form = parse_qs(body.decode())
+        if form.get("grant_type") != ["refresh_token"] or form.get("refresh_token") != ["refresh"]:
+            return json_response({"error": "invalid_grant"}, status=400)
+        time.sleep(self.delay)
+        return json_response({"access_token": f"token-{next(self.counter)}", "expires_in": self.lifetime})
+
+
+class OnDemand:
+    """The old pattern: whoever notices the token expired refreshes it, inline"""
+
+    def __init__(self, source):
+        self.source = source
+        self.token = None
+        self.expiry = datetime.now(timezone.utc)
+        self.blocking_refreshes = 0
+
+    def get_token(self):
+        if datetime.now(timezone.utc) >= self.expiry - timedelta(seconds=google_auth.EXPIRY_SKEW):
+            self.blocking_refreshes += 1
+            self.token, self.expiry = self.source.fetch()
+        return self.token
+
+
+def hammer(provider, callers, duration):
+    samples = []
+    lock = threading.Lock()
+    deadline = time.monotonic() + duration
+
+    def caller():
+        local = []
+        while time.monotonic() < deadline:
+            start = time.perf_counter()
+            assert provider.get_token()
+            local.append((time.perf_counter() - start) * 1000)
+            time.sleep(0.005)
+        with lock:
+            samples.extend(local)
+
+    threads = [threading.Thread(target=caller) for _ in range(callers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return samples
+
+
+def run(callers, duration, lifetime, refresh_ms, margin):
+    # EXPIRY_SKEW is meant for hour-long tokens; scale it to the short test lifetime
+    google_auth.EXPIRY_SKEW = lifetime / 10
+    endpoint = FakeTokenEndpoint(lifetime, refresh_ms)
+    with StubServer(endpoint.handle) as server:
+        def make_source():
+            return google_auth.RefreshTokenSource("client", "secret", "refresh", token_uri=f"{server.url}/token")
+
+        print(f"{callers} callers for {duration}s, tokens live {lifetime}s, endpoint takes {refresh_ms:.0f} ms")
+        print(f"{'mode':<14}{'refreshes':>11}{'waited':>8}{'p50 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+        modes = [
+            ("on demand", OnDemand(make_source())),
+            ("provider", google_auth.AccessTokenProvider(make_source(), refresh_margin=margin)),
+        ]
+        for name, provider in modes:
+            provider.get_token()  # First token, so both start from a valid one
+            provider.blocking_refreshes = 0
+            requests_before = server.request_count
+            samples = hammer(provider, callers, duration)
+            refreshes = server.request_count - requests_before
+            print(f"{name:<14}{refreshes:>11}{provider.blocking_refreshes:>8}{percentile(samples, 50):>10.3f}"
+                  f"{percentile(samples, 99):>10.3f}{max(samples):>10.1f}")
+            if hasattr(provider, "stop"):
+                provider.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--callers", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=6)
+    parser.add_argument("--lifetime", type=int, default=2)
+    parser.add_argument("--refresh-ms", type=float, default=150)
+    parser.add_argument("--margin", type=float, default=0.8)
+    args = parser.parse_args()
+    run(args.callers, args.duration, args.lifetime, args.refresh_ms, args.margin)
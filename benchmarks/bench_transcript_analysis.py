@@ -0,0 +1,164 @@
+"""
+Benchmark: transcript analysis, the old six-pass loop vs transcript_analysis.
+
+Generates synthetic meeting transcripts of --sizes words, with the usual mix
+of small talk, decisions, questions, action items and opinions, and times:
+- six passes: the old drive_meeting_summarizer analysis, one loop over the
+  sentences per insight, uncompiled patterns, and sentiment counted with
+  substring checks on the whole transcript
+- single pass: transcript_analysis.analyze
+
+The outputs aren't expected to match exactly: both count each sentiment
+keyword once if it appears anywhere, but the old check also found keywords
+inside other words ("no" in "know", "yes" in "yesterday"), while the engine
+only matches whole words and their inflections. The sentiment counts of
+both are printed for comparison.
+
+Run from the repo root:
+    uv run python -m benchmarks.bench_transcript_analysis
+"""
+import argparse
+import random
+import re
+import time
+
+import transcript_analysis
+
+SENTENCES = [
+    "I think the rollout went well overall",
+    "We decided to move the launch to the first week of March",
+    "Priya will update the migration guide before Friday",
+    "Does anyone know when the vendor contract expires?",
+    "The main concern is the latency on the search page",
+    "Let's revisit the hiring plan next sprint",
+    "Action item: send the budget summary to finance",
+    "Honestly I don't know if the numbers are right",
+    "It is important that we keep the old endpoint running for now",
+    "Marco needs to check the monitoring alerts with the platform team",
+    "That sounds great, I agree with the proposal",
+    "There was a problem with the staging deploy yesterday",
+    "Can we get the design review on the calendar?",
+    "Decision: freeze the API until the audit is done",
+    "The new dashboard looks good and people like it",
+    "Sam is going to draft the announcement for the all hands",
+]
+
+
+def make_transcript(words, seed=3):
+    rng = random.Random(seed)
+    sentences = []
+    count = 0
+    while count < words:
+        sentence = rng.choice(SENTENCES)
+        sentences.append(sentence)
+        count += len(sentence.split())
+    # Speech-to-Text punctuation: questions end in "?", which the old code
+    # and the engine both keep inside the sentence
+    return ". ".join(sentences) + "."
+
+
+def six_passes(transcript):
+    # The previous analysis in cooking.py, unchanged
+    sentences = transcript.split(".")
+
+    summary_sentences = [s.strip() for s in sentences[:5] if s.strip()]
+    summary = ". ".join(summary_sentences)
+    if summary:
+        summary += "."
+
+    key_points = []
+    important_keywords = ['important', 'critical', 'key', 'priority', 'must', 'need to', 'decided', 'agreed']
+    for sentence in sentences:
+        sentence = sentence.strip()
+        if any(keyword in sentence.lower() for keyword in important_keywords) and len(sentence) > 20:
+            key_points.append(sentence)
+
+    decisions = []
+    decision_patterns = [
+        r"(?:we|I|they)\s+(?:decided|agreed|concluded|determined)\s+(?:to|that)\s+(.+?)(?:\.|,|$)",
+        r"(?:decision|conclusion):\s*(.+?)(?:\.|$)",
+        r"(?:let's|we'll|we will|we're going to)\s+(.+?)(?:\.|,|$)"
+    ]
+    for sentence in sentences:
+        for pattern in decision_patterns:
+            for match in re.finditer(pattern, sentence, re.IGNORECASE):
+                decision_text = match.group(1).strip() if match.groups() else sentence.strip()
+                if len(decision_text) > 10 and len(decision_text) < 150:
+                    decisions.append(decision_text)
+
+    questions = []
+    for sentence in sentences:
+        if '?' in sentence:
+            question = sentence.split('?')[0].strip() + '?'
+            if len(question) > 10:
+                questions.append(question)
+
+    action_items = []
+    action_patterns = [
+        r"(\w+)\s+(?:will|should|needs to|has to|must)\s+(.+?)(?:\.|,|$)",
+        r"(?:TODO|Action item|Action|Task):\s*(.+?)(?:\.|$)",
+        r"(\w+)\s+(?:to|going to)\s+(.+?)(?:\.|,|$)"
+    ]
+    for sentence in sentences:
+        sentence = sentence.strip()
+        for pattern in action_patterns:
+            for match in re.finditer(pattern, sentence, re.IGNORECASE):
+                if len(match.groups()) == 2:
+                    person = match.group(1).strip()
+                    task = match.group(2).strip()
+                else:
+                    person = "Unassigned"
+                    task = match.group(1).strip()
+                if len(task) > 10 and len(task) < 200:
+                    action_items.append({"assignee": person.capitalize(), "task": task})
+
+    unique_actions = []
+    seen_tasks = set()
+    for item in action_items:
+        task_key = item['task'].lower()[:50]
+        if task_key not in seen_tasks:
+            seen_tasks.add(task_key)
+            unique_actions.append(item)
+
+    positive_words = ['great', 'good', 'excellent', 'awesome', 'perfect', 'agree', 'yes', 'love', 'like']
+    negative_words = ['bad', 'wrong', 'issue', 'problem', 'concern', 'worried', 'no', 'disagree', 'difficult']
+    positive_count = sum(1 for word in positive_words if word in transcript.lower())
+    negative_count = sum(1 for word in negative_words if word in transcript.lower())
+
+    return {
+        "summary": summary,
+        "insights": {
+            "key_discussion_points": key_points[:5],
+            "decisions_made": list(set(decisions))[:5],
+            "questions_raised": questions[:5],
+            "action_items": unique_actions[:10],
+            "positive_indicators": positive_count,
+            "concerns_raised": negative_count
+        }
+    }
+
+
+def timed(fn, transcript):
+    start = time.perf_counter()
+    result = fn(transcript)
+    return time.perf_counter() - start, result
+
+
+def run(sizes):
+    print(f"{'words':>10}{'six passes':>13}{'single pass':>13}{'speedup':>9}   sentiment (+/-) old vs new")
+    for words in sizes:
+        transcript = make_transcript(words)
+        old_seconds, old = timed(six_passes, transcript)
+        new_seconds, new = timed(transcript_analysis.analyze, transcript)
+        assert new["summary"] == old["summary"]
+        old_insights, new_insights = old["insights"], new["insights"]
+        print(f"{words:>10}{old_seconds:>11.3f} s{new_seconds:>11.3f} s{old_seconds / new_seconds:>8.0f}x   "
+              f"{old_insights['positive_indicators']}/{old_insights['concerns_raised']} vs "
+              f"{new_insights['positive_indicators']}/{new_insights['concerns_raised']}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    args = parser.parse_args()
+    run(args.sizes)
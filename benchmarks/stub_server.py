@@ -0,0 +1,14 @@
+"""
+Helpers shared by the benchmarks.
+
+The local stand-in for googleapis.com lives with the tests (tests/stub_server.py)
+and is re-exported here, so benchmarks and tests run against the same server.
+"""
+from tests.stub_server import StubServer, json_response  # noqa: F401
+
+
+def percentile(samples, pct):
+    """Nearest-rank percentile of a list of numbers"""
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
@@ -0,0 +1,144 @@
+"""
+Helpers for Google's HTTP batch endpoint.
+
+A batch request packs many API calls into one multipart/mixed HTTP request.
+Each part is a complete HTTP request (method, path, headers, body) tagged with
+a Content-ID; Google answers with a multipart/mixed response whose parts are
+the individual HTTP responses, tagged with matching "response-" Content-IDs.
+
+    operations = [
+        {"method": "POST", "path": "/calendar/v3/calendars/primary/events", "body": {...}},
+        {"method": "DELETE", "path": "/calendar/v3/calendars/primary/events/abc123"},
+    ]
+    content_type, body = build_batch_request(operations)
+    # POST body to https://www.googleapis.com/batch/calendar/v3
+    results = parse_batch_response(response_content_type, response_body)
+"""
+import json
+import uuid
+from email.parser import BytesParser
+from email.policy import HTTP
+
+# Calendar API limit on calls per batch request
+MAX_BATCH_SIZE = 50
+
+
+def build_batch_request(operations: list, boundary: str = None):
+    """Encode operations as a multipart/mixed batch body
+
+    Returns (content_type, body bytes). Operation i gets Content-ID <item-i>.
+    """
+    boundary = boundary or f"batch_{uuid.uuid4().hex}"
+    lines = []
+    for index, operation in enumerate(operations):
+        lines.append(f"--{boundary}")
+        lines.append("Content-Type: application/http")
+        lines.append(f"Content-ID: <item-{index}>")
+        lines.append("")
+        lines.append(f"{operation['method']} {operation['path']} HTTP/1.1")
+        for name, value in operation.get("headers", {}).items():
+            lines.append(f"{name}: {value}")
+        if operation.get("body") is not None:
+            lines.append("Content-Type: application/json")
+            lines.append("")
+            lines.append(json.dumps(operation["body"]))
+        else:
+            lines.append("")
+        lines.append("")
+    lines.append(f"--{boundary}--")
+    lines.append("")
+    return f"multipart/mixed; boundary={boundary}", "\r\n".join(lines).encode()
+
+
+def _parse_http_message(text: str):
+    """Split an embedded HTTP message into (start line, headers dict, body)"""
+    text = text.replace("\r\n", "\n").lstrip("\n")
+    head, _, body = text.partition("\n\n")
+    start_line, *header_lines = head.split("\n")
+    headers = {}
+    for line in header_lines:
+        name, _, value = line.partition(":")
+        headers[name.strip().lower()] = value.strip()
+    return start_line, headers, body.strip()
+
+
+def _content_index(content_id: str):
+    # "<response-item-3>" -> 3
+    return int(content_id.strip("<> ").rsplit("-", 1)[-1])
+
+
+def _iter_parts(content_type: str, body: bytes):
+    message = BytesParser(policy=HTTP).parsebytes(
+        f"Content-Type: {content_type}\r\n\r\n".encode() + body
+    )
+    for part in message.iter_parts():
+        payload = part.get_payload(decode=True) or b""
+        yield part.get("Content-ID", ""), payload.decode("utf-8", errors="replace")
+
+
+def parse_batch_response(content_type: str, body: bytes):
+    """Decode a multipart/mixed batch response
+
+    Returns one dict per part, sorted back into request order:
+        {"index": 0, "status": 200, "headers": {...}, "body": <parsed JSON or None>}
+    """
+    results = []
+    for content_id, payload in _iter_parts(content_type, body):
+        status_line, headers, raw_body = _parse_http_message(payload)
+        status = int(status_line.split(" ")[1])
+        try:
+            parsed_body = json.loads(raw_body) if raw_body else None
+        except ValueError:
+            parsed_body = {"raw": raw_body}
+        results.append({
+            "index": _content_index(content_id),
+            "status": status,
+            "headers": headers,
+            "body": parsed_body
+        })
+    results.sort(key=lambda result: result["index"])
+    return results
+
+
+def parse_batch_request(content_type: str, body: bytes):
+    """Decode a batch request into operations (the inverse of build_batch_request)
+
+    Not needed to talk to Google; it lets local stub servers answer batches.
+    """
+    operations = []
+    for content_id, payload in _iter_parts(content_type, body):
+        request_line, headers, raw_body = _parse_http_message(payload)
+        method, path, _ = request_line.split(" ", 2)
+        operations.append({
+            "index": _content_index(content_id),
+            "method": method,
+            "path": path,
+            "headers": headers,
+            "body": json.loads(raw_body) if raw_body else None
+        })
+    return operations
+
+
+def build_batch_response(results: list, boundary: str = None):
+    """Encode (content_id_index, status, body dict or None) tuples as a batch response
+
+    Also only meant for local stub servers.
+    """
+    boundary = boundary or f"batch_{uuid.uuid4().hex}"
+    lines = []
+    for index, status, payload in results:
+        lines.append(f"--{boundary}")
+        lines.append("Content-Type: application/http")
+        lines.append(f"Content-ID: <response-item-{index}>")
+        lines.append("")
+        lines.append(f"HTTP/1.1 {status} {'OK' if status < 400 else 'Error'}")
+        if payload is not None:
+            lines.append("Content-Type: application/json; charset=UTF-8")
+            lines.append("")
+            lines.append(json.dumps(payload))
+        else:
+            lines.append("")
+        lines.append("")
+    lines.append(f"--{boundary}--")
+    lines.append("")
+    return f"multipart/mixed; boundary={boundary}", "\r\n".join(lines).encode()
@@ -0,0 +1,140 @@
+"""
+Scheduling algorithms over calendar events, with no I/O of their own.
+
+Conflict detection is a sweep line: events are parsed once into (start, end)
+timestamps, sorted by start, and swept left to right while a heap holds the
+events still running. Every event still on the heap when the next one starts
+overlaps it, and a map from end time to events finds back-to-back pairs, so a
+week or a year of calendar costs O(n log n + k) for k reported pairs instead
+of comparing every pair of events.
+
+    intervals = [event_interval(event, "Europe/Paris") for event in events]
+    overlaps, back_to_back = find_conflicts([i for i in intervals if i])
+
+Free-slot search merges the busy intervals once and walks the gaps between
+them, day by day inside working hours in the calendar's timezone, so looking
+90 days ahead costs about as much as reading the busy list:
+
+    slots = free_slots(busy, now, now + 90 * 86400, duration=3600,
+                       timezone_name="America/New_York", max_slots=5)
+"""
+import heapq
+from datetime import date, datetime, time, timedelta
+from zoneinfo import ZoneInfo
+
+
+def _day_start(value: str, tz: ZoneInfo):
+    day = date.fromisoformat(value)
+    return datetime(day.year, day.month, day.day, tzinfo=tz).timestamp()
+
+
+def event_interval(event: dict, timezone_name: str = "UTC", include_all_day: bool = False, item=None):
+    """Turn an event into a (start, end, item) triple of UTC timestamps
+
+    All-day events ({"date": ...}) run from midnight to midnight in the
+    calendar's timezone; they are skipped (None is returned) unless
+    include_all_day is set. item defaults to the event itself and is what the
+    conflict functions hand back.
+    """
+    start, end = event.get("start", {}), event.get("end", {})
+    item = event if item is None else item
+    if "dateTime" in start and "dateTime" in end:
+        return (
+            datetime.fromisoformat(start["dateTime"].replace("Z", "+00:00")).timestamp(),
+            datetime.fromisoformat(end["dateTime"].replace("Z", "+00:00")).timestamp(),
+            item
+        )
+    if include_all_day and "date" in start and "date" in end:
+        tz = ZoneInfo(timezone_name or "UTC")
+        return _day_start(start["date"], tz), _day_start(end["date"], tz), item
+    return None
+
+
+def find_conflicts(intervals):
+    """Find every overlapping and back-to-back pair among (start, end, item) triples
+
+    Two events overlap when each starts before the other ends, so an event that
+    ends exactly when another starts is back-to-back, not a conflict.
+
+    Returns (overlaps, back_to_back): lists of (first, second) item pairs where
+    first starts no later than second, ordered by when second starts.
+    """
+    ordered = sorted(intervals, key=lambda interval: (interval[0], interval[1]))
+    overlaps = []
+    back_to_back = []
+    running = []   # heap of (end, position, item) for events not yet over
+    ends_at = {}   # end timestamp -> items ending then, for back-to-back pairs
+
+    for position, (start, end, item) in enumerate(ordered):
+        # Events that ended by now can't overlap this or any later event
+        while running and running[0][0] <= start:
+            heapq.heappop(running)
+        for _, _, other in running:
+            overlaps.append((other, item))
+        for other in ends_at.get(start, ()):
+            back_to_back.append((other, item))
+
+        heapq.heappush(running, (end, position, item))
+        ends_at.setdefault(end, []).append(item)
+
+    return overlaps, back_to_back
+
+
+def merge_intervals(intervals):
+    """Sort (start, end) pairs and merge the ones that overlap or touch"""
+    merged = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1][1] = end
+        else:
+            merged.append([start, end])
+    return [(start, end) for start, end in merged]
+
+
+def free_slots(busy, window_start: float, window_end: float, duration: float,
+               timezone_name: str = "UTC", day_start: time = time(9), day_end: time = time(17),
+               weekdays=(0, 1, 2, 3, 4), granularity: float = 30 * 60, max_slots: int = 1):
+    """First max_slots free slots of duration seconds between window_start and window_end
+
+    Args:
+        busy: (start, end) timestamps, in any order and possibly overlapping
+        timezone_name: Timezone that day_start/day_end and weekdays refer to
+        day_start, day_end: Working hours; slots never cross them
+        weekdays: Days slots may fall on (Monday is 0)
+        granularity: Slots start on multiples of this many seconds after day_start
+        max_slots: Stop after this many slots
+
+    Returns:
+        List of (start, end) timestamps in time order. Slots don't overlap each
+        other: the next candidate after a slot starts where that slot ends.
+    """
+    merged = merge_intervals(busy)
+    tz = ZoneInfo(timezone_name or "UTC")
+    slots = []
+    index = 0  # First busy interval that may still matter; only moves forward
+    day = datetime.fromtimestamp(window_start, tz).date()
+
+    while len(slots) < max_slots:
+        opens = datetime.combine(day, day_start, tzinfo=tz).timestamp()
+        if opens >= window_end:
+            break
+        if day.weekday() in weekdays:
+            closes = min(datetime.combine(day, day_end, tzinfo=tz).timestamp(), window_end)
+            candidate = max(opens, window_start)
+            while len(slots) < max_slots:
+                # Round up to the next slot boundary
+                steps = -(-(candidate - opens) // granularity)
+                candidate = opens + steps * granularity
+                if candidate + duration > closes:
+                    break
+                while index < len(merged) and merged[index][1] <= candidate:
+                    index += 1
+                if index < len(merged) and merged[index][0] < candidate + duration:
+                    candidate = merged[index][1]  # Jump past the whole busy block
+                    continue
+                slots.append((candidate, candidate + duration))
+                candidate += duration
+        day += timedelta(days=1)
+
+    return slots
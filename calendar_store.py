@@ -0,0 +1,308 @@
+"""
+Local copy of a Google Calendar kept up to date with incremental sync.
+
+The first sync downloads every event inside a rolling window (for example 30
+days back to 90 days ahead). Google ends that download with a nextSyncToken;
+passing it back on the next sync returns only the events that changed since,
+including cancelled ones, so keeping the copy fresh costs one small request.
+
+The store itself does no I/O. A server drives it like this:
+
+    params = store.start_sync()
+    while params is not None:
+        page = <GET /calendars/{id}/events with params>
+        params = store.apply_page(page)
+
+If Google answers 410 Gone the sync token has expired: call store.reset() and
+start again, which falls back to a full sync.
+"""
+import bisect
+import time
+from datetime import date, datetime, timedelta, timezone
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+
+def parse_event_time(value: dict, tz=timezone.utc):
+    """Convert an event's start/end dict to a UTC timestamp (seconds)
+
+    Timed events carry {"dateTime": "2026-01-15T10:00:00-05:00"} and all-day
+    events carry {"date": "2026-01-15"}; an all-day date starts at midnight in
+    tz, the calendar's time zone, which is how Google filters them.
+    """
+    if "dateTime" in value:
+        return datetime.fromisoformat(value["dateTime"].replace("Z", "+00:00")).timestamp()
+    if "date" in value:
+        day = date.fromisoformat(value["date"])
+        return datetime(day.year, day.month, day.day, tzinfo=tz).timestamp()
+    return None
+
+
+def parse_rfc3339(value: str):
+    """Convert an RFC3339 string such as "2026-01-15T00:00:00Z" to a UTC timestamp"""
+    return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+
+
+def _searchable_text(event):
+    # Roughly the fields Google's free text search (q=) looks at
+    parts = [event.get("summary", ""), event.get("description", ""), event.get("location", "")]
+    for attendee in event.get("attendees", []):
+        parts.append(attendee.get("displayName", ""))
+        parts.append(attendee.get("email", ""))
+    parts.append(event.get("organizer", {}).get("email", ""))
+    return " ".join(parts).lower()
+
+
+class CalendarEventStore:
+    """
+    In-memory, time-ordered copy of one calendar's events
+
+    Args:
+        days_back: How far into the past the window reaches
+        days_ahead: How far into the future the window reaches
+        max_events: Upper bound on stored events; the furthest-out events are
+            dropped first and the window shrinks to match
+        full_resync_seconds: How often the window is rolled forward with a fresh
+            full sync (incremental syncs don't bring in events that only now
+            entered the window)
+    """
+
+    def __init__(self, days_back: int = 30, days_ahead: int = 90, max_events: int = 10000,
+                 full_resync_seconds: float = 24 * 3600):
+        self.days_back = days_back
+        self.days_ahead = days_ahead
+        self.max_events = max_events
+        self.full_resync_seconds = full_resync_seconds
+        # The calendar's time zone (events.list reports it); all-day events start at its midnight
+        self.timezone = "UTC"
+        self._tz = timezone.utc
+        self.reset()
+
+    def reset(self):
+        """Forget the sync token and all events; the next sync will be a full one"""
+        self._events = {}       # event id -> raw event
+        self._bounds = {}       # event id -> (start, end) timestamps
+        self._index = []        # sorted (start, event id) pairs for range scans
+        self._max_duration = 0  # longest event seen, bounds the scan for ongoing events
+        self._staging = None    # events collected during a full sync in progress
+        self._pending_window = None
+        self._sync_params = None
+        self.sync_token = None
+        self.window_start = None
+        self.window_end = None
+        self.last_synced = None
+        self.last_full_sync = None
+
+    def __len__(self):
+        return len(self._events)
+
+    @property
+    def is_synced(self):
+        return self.sync_token is not None
+
+    def set_timezone(self, name: str):
+        """Place all-day events by midnight in this time zone from now on"""
+        if not name or name == self.timezone:
+            return
+        try:
+            tz = ZoneInfo(name)
+        except (ZoneInfoNotFoundError, ValueError):
+            print(f"Unknown calendar time zone {name!r}; all-day events are taken as UTC")
+            return
+        self.timezone, self._tz = name, tz
+        if self.window_start is not None:
+            # Move the all-day events already stored to the new midnight
+            self._replace_all(dict(self._events), self.window_start, self.window_end)
+
+    def seconds_since_sync(self):
+        if self.last_synced is None:
+            return None
+        return time.monotonic() - self.last_synced
+
+    # ---------------------------
+    # Sync protocol
+    # ---------------------------
+
+    def start_sync(self):
+        """Return query params for the first request of the next sync"""
+        full_sync_due = (
+            self.last_full_sync is None
+            or time.monotonic() - self.last_full_sync >= self.full_resync_seconds
+        )
+        if self.sync_token and not full_sync_due:
+            # Incremental sync: Google rejects timeMin/timeMax/orderBy/q together
+            # with syncToken; everything else must match the full sync request
+            self._sync_params = {
+                "syncToken": self.sync_token,
+                "singleEvents": True,
+                "maxResults": 2500
+            }
+            return dict(self._sync_params)
+
+        # Full sync into a staging area, so reads keep being answered from the
+        # current data until the new download is complete
+        now = datetime.now(timezone.utc)
+        self._pending_window = (
+            (now - timedelta(days=self.days_back)).timestamp(),
+            (now + timedelta(days=self.days_ahead)).timestamp()
+        )
+        self._staging = {}
+        self._sync_params = {
+            "timeMin": (now - timedelta(days=self.days_back)).isoformat().replace("+00:00", "Z"),
+            "timeMax": (now + timedelta(days=self.days_ahead)).isoformat().replace("+00:00", "Z"),
+            "singleEvents": True,
+            "maxResults": 2500
+        }
+        return dict(self._sync_params)
+
+    def apply_page(self, page: dict):
+        """Ingest one page of a sync response
+
+        Returns the params for the next page, or None once the sync is complete.
+        """
+        self.set_timezone(page.get("timeZone"))
+        if self._staging is not None:
+            for event in page.get("items", []):
+                if event.get("status") == "cancelled":
+                    self._staging.pop(event["id"], None)
+                else:
+                    self._staging[event["id"]] = event
+        else:
+            for event in page.get("items", []):
+                self.apply_event(event)
+
+        if page.get("nextPageToken"):
+            return {**self._sync_params, "pageToken": page["nextPageToken"]}
+
+        if self._staging is not None:
+            self._replace_all(self._staging, *self._pending_window)
+            self._staging = None
+            self.last_full_sync = time.monotonic()
+        self.sync_token = page.get("nextSyncToken")
+        self.last_synced = time.monotonic()
+        self._enforce_max_events()
+        return None
+
+    def apply_event(self, event: dict):
+        """Insert, update or remove a single event
+
+        Used for sync deltas and also by the tools after a successful write, so
+        a read right after a create/update/delete sees the change immediately.
+        """
+        event_id = event.get("id")
+        if event_id is None or self.window_start is None:
+            return  # Nothing to update before the first full sync has landed
+        self._remove(event_id)
+        if event.get("status") == "cancelled":
+            return  # Deleted events come back from the delta feed as "cancelled"
+        bounds = self._event_bounds(event)
+        if bounds is None or not self._in_window(*bounds):
+            return
+        self._insert(event, bounds)
+        self._enforce_max_events()
+
+    def remove_event(self, event_id: str):
+        self._remove(event_id)
+
+    # ---------------------------
+    # Queries
+    # ---------------------------
+
+    def get_event(self, event_id: str):
+        """Return the stored event, or None if it isn't in the store"""
+        return self._events.get(event_id)
+
+    def list_events(self, time_min: str = None, time_max: str = None, query: str = None, max_results: int = 10):
+        """Answer an events.list query (singleEvents, ordered by start) locally
+
+        Mirrors Google's filtering: time_min is compared against event end and
+        time_max against event start. Returns None when the store can't answer
+        exactly - not synced yet, or the requested range leaves the window - so
+        the caller knows to fall back to the API. The free text query is a
+        simple case-insensitive match of every word against the title,
+        description, location and attendees.
+        """
+        if not self.is_synced or time_min is None:
+            return None
+        lower = parse_rfc3339(time_min)
+        upper = parse_rfc3339(time_max) if time_max else None
+        if lower < self.window_start:
+            return None
+        terms = query.lower().split() if query else []
+
+        # Events that started up to max_duration before time_min may still be running
+        position = bisect.bisect_left(self._index, (lower - self._max_duration,))
+        results = []
+        for start, event_id in self._index[position:]:
+            if upper is not None and start >= upper:
+                break
+            if len(results) >= max_results:
+                break
+            if self._bounds[event_id][1] <= lower:
+                continue
+            event = self._events[event_id]
+            if terms:
+                text = _searchable_text(event)
+                if not all(term in text for term in terms):
+                    continue
+            results.append(event)
+
+        # Fewer results than asked for only proves there are no more events if
+        # the requested range ends inside the window
+        if len(results) < max_results and (upper is None or upper > self.window_end):
+            return None
+        return results
+
+    # ---------------------------
+    # Internals
+    # ---------------------------
+
+    def _event_bounds(self, event):
+        start = parse_event_time(event.get("start", {}), self._tz)
+        end = parse_event_time(event.get("end", {}), self._tz)
+        if start is None:
+            return None
+        return start, end if end is not None else start
+
+    def _in_window(self, start, end):
+        return end > self.window_start and start < self.window_end
+
+    def _insert(self, event, bounds):
+        event_id = event["id"]
+        self._events[event_id] = event
+        self._bounds[event_id] = bounds
+        bisect.insort(self._index, (bounds[0], event_id))
+        self._max_duration = max(self._max_duration, bounds[1] - bounds[0])
+
+    def _remove(self, event_id):
+        if event_id not in self._events:
+            return
+        del self._events[event_id]
+        start, _ = self._bounds.pop(event_id)
+        position = bisect.bisect_left(self._index, (start, event_id))
+        del self._index[position]
+
+    def _replace_all(self, events, window_start, window_end):
+        self._events = {}
+        self._bounds = {}
+        self._max_duration = 0
+        entries = []
+        for event_id, event in events.items():
+            bounds = self._event_bounds(event)
+            if bounds is None:
+                continue
+            self._events[event_id] = event
+            self._bounds[event_id] = bounds
+            self._max_duration = max(self._max_duration, bounds[1] - bounds[0])
+            entries.append((bounds[0], event_id))
+        entries.sort()
+        self._index = entries
+        self.window_start = window_start
+        self.window_end = window_end
+
+    def _enforce_max_events(self):
+        # Drop the furthest-out events and pull the window end in to match, so
+        # list_events never claims to cover a range it no longer holds
+        while len(self._index) > self.max_events:
+            start, event_id = self._index[-1]
+            self._remove(event_id)
+            self.window_end = min(self.window_end, start)
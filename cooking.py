@@ -1,11 +1,30 @@
 from north_mcp_python_sdk import NorthMCPServer
+import asyncio
+import contextvars
+import copy
+import functools
+import json
+import os
 import pickle
-from datetime import datetime, timezone, timedelta
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone, timedelta, time as dt_time
 from zoneinfo import ZoneInfo
-from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
-from googleapiclient.http import MediaIoBaseDownload
-from google.auth.transport.requests import Request
+from mcp.server.fastmcp import Context
+
+import agenda_view
+import calendar_scheduling
+import google_auth
+import google_rate_limit
+import group_availability
+import meeting_audio
+import pretranscriber
+import tool_metrics
+import transcript_analysis
+import transcription
+from calendar_store import parse_rfc3339
+from singleflight import SingleFlight
+from transcript_cache import TranscriptCache, file_version
 
 _default_port = 3001
 
@@ -13,6 +32,9 @@ mcp = NorthMCPServer(
     "AUBREY MCP SERVER", host="0.0.0.0", port=_default_port
 )
 
+# Time every tool registered below and serve Prometheus metrics at /metrics
+tool_metrics.instrument_server(mcp)
+
 # ---------------------------
 # Google Calendar Authentication
 # ---------------------------
@@ -26,29 +48,238 @@ SCOPES = [
 # ---- FILL IN THE PATH TO YOUR DOWNLOADED CREDENTIALS ----
 CREDENTIALS_FILE = 'credentials.json'  # <-- replace if different
 
-# Try to load saved token
-try:
-    with open('token.pkl', 'rb') as token_file:
-        creds = pickle.load(token_file)
-except FileNotFoundError:
-    creds = None
-
-# Check if credentials are invalid or expired
-if not creds or not creds.valid:
-    if creds and creds.expired and creds.refresh_token:
-        creds.refresh(Request())
-    else:
-        flow = InstalledAppFlow.from_client_secrets_file(CREDENTIALS_FILE, SCOPES)
-        creds = flow.run_local_server(port=0)
-    # Save the refreshed/new token
+# Credentials and API clients are created on first use, not at import, so the
+# server binds its port right away: a restart doesn't wait on token.pkl, a
+# token refresh or the OAuth consent screen, and nothing is built that the
+# first requests don't need.
+creds = None
+token_provider = None
+_auth_lock = threading.Lock()
+_services = threading.local()  # .by_name: (name, version) -> googleapiclient service, per thread
+_services_lock = threading.Lock()
+_service_stats = {'built': 0}
+
+def _save_credentials():
     with open('token.pkl', 'wb') as token_file:
         pickle.dump(creds, token_file)
 
-# Build the Calendar service
-calendar_service = build('calendar', 'v3', credentials=creds)
+def _get_creds():
+    """The OAuth credentials, loaded from token.pkl (or obtained) on first use"""
+    global creds, token_provider
+    if token_provider is not None:
+        return creds
+    with _auth_lock:
+        if token_provider is not None:
+            return creds
 
-# Build the Drive service
-drive_service = build('drive', 'v3', credentials=creds)
+        # Try to load saved token
+        try:
+            with open('token.pkl', 'rb') as token_file:
+                creds = pickle.load(token_file)
+        except FileNotFoundError:
+            creds = None
+
+        # Check if credentials are invalid or expired
+        if not creds or not creds.valid:
+            if creds and creds.expired and creds.refresh_token:
+                from google.auth.transport.requests import Request
+                creds.refresh(Request())
+            else:
+                from google_auth_oauthlib.flow import InstalledAppFlow
+                flow = InstalledAppFlow.from_client_secrets_file(CREDENTIALS_FILE, SCOPES)
+                creds = flow.run_local_server(port=0)
+            # Save the refreshed/new token
+            _save_credentials()
+
+        # Refresh creds in the background a few minutes before they expire, so a long
+        # running server keeps working and no tool call pays for the refresh. Every
+        # client below shares this one creds object, so they all see the new token.
+        provider = google_auth.AccessTokenProvider(
+            google_auth.CredentialsSource(creds),
+            token=creds.token,
+            expiry=creds.expiry,
+            on_refresh=_save_credentials
+        )
+        provider.start()
+        token_provider = provider
+    return creds
+
+def _get_service(name, version):
+    """A googleapiclient service for the calling thread, built on its first use there
+
+    httplib2 transports aren't thread-safe: two threads sending on one
+    connection get each other's responses, or SSL errors. Each tool worker
+    thread therefore gets its own service and transport (a bounded number,
+    since the threads come from fixed-size pools), which keeps its
+    connections alive between calls. They all wrap the one shared creds
+    object, so a token refreshed by token_provider is seen by every thread.
+    """
+    services = getattr(_services, 'by_name', None)
+    if services is None:
+        services = _services.by_name = {}
+    service = services.get((name, version))
+    if service is None:
+        credentials = _get_creds()
+        import google_auth_httplib2
+        from googleapiclient.discovery import build
+        from googleapiclient.http import build_http
+        http = google_auth_httplib2.AuthorizedHttp(credentials, http=build_http())
+        # The discovery document bundled with googleapiclient: no fetch from
+        # Google, and no discovery cache to look up
+        service = build(name, version, http=http, static_discovery=True, cache_discovery=False)
+        services[(name, version)] = service
+        with _services_lock:
+            _service_stats['built'] += 1
+    return service
+
+def _calendar_service():
+    return _get_service('calendar', 'v3')
+
+def _drive_service():
+    return _get_service('drive', 'v3')
+
+# Every Google API call goes through the shared rate limiter: a token bucket per
+# API smooths out bursts of tool calls, and 429/5xx responses are retried with
+# jittered backoff (honouring Retry-After) instead of failing the whole tool.
+def _execute(request, api):
+    _get_creds()  # Loads token_provider on the first call
+    return google_rate_limit.execute(request, api, user=token_provider.identity)
+
+# Identical events.list queries running at the same time (e.g. several agents
+# polling aubrey_next_meeting) share one call to Google. EVENTS_LIST_TTL seconds
+# (0 = off) also answers repeats of a recent query without calling Google.
+_events_list_flight = SingleFlight(ttl=float(os.getenv("EVENTS_LIST_TTL", "0")))
+
+def _list_events(**kwargs):
+    """events().list(**kwargs).execute(), coalesced; don't mutate the result"""
+    key = json.dumps(kwargs, sort_keys=True, default=str)
+    return _events_list_flight.do(
+        key, lambda: _execute(_calendar_service().events().list(**kwargs), 'calendar')
+    )
+
+def _list_all_events(**kwargs):
+    """Every page of an events().list query
+
+    Returns (events, calendar timezone). Pages are requested at the API's
+    maximum size, so even a busy calendar takes only a few calls.
+    """
+    events = []
+    page_token = None
+    while True:
+        page = _list_events(maxResults=2500, pageToken=page_token, **kwargs)
+        events.extend(page.get('items', []))
+        page_token = page.get('nextPageToken')
+        if not page_token:
+            return events, page.get('timeZone', 'UTC')
+
+# Upcoming events of the calendars the tools are asked about, kept in memory
+# and synced incrementally (see agenda_view.py), so next_meeting, meeting_finder
+# and the conflicts detector answer without an events.list call each.
+# Off unless AGENDA_VIEW_ENABLED=true; AGENDA_MAX_STALENESS bounds how old an
+# answer can be.
+def _agenda_page(calendar_id, params):
+    return _execute(_calendar_service().events().list(calendarId=calendar_id, **params), 'calendar')
+
+_agenda = agenda_view.AgendaViews(_agenda_page) if agenda_view.AGENDA_VIEW_ENABLED else None
+
+def _agenda_events(calendar_id, time_min, time_max=None, max_results=None):
+    """Events from the agenda view, or None when it can't answer and the API has to"""
+    if _agenda is None:
+        return None
+    return _agenda.list_events(calendar_id, time_min, time_max, max_results)
+
+# FreeBusy is asked about at most this many days and calendars per query;
+# longer horizons and attendee lists are split into several queries
+FREEBUSY_CHUNK_DAYS = 30
+FREEBUSY_MAX_CALENDARS = 50
+
+def _freebusy(calendar_ids, time_min, time_max):
+    """Busy blocks per calendar between two datetimes
+
+    Returns ({calendar_id: [(start, end) timestamps]}, {calendar_id: errors}).
+    Calendars FreeBusy can't read (e.g. outside your organization) show up in
+    the errors dict instead of failing the whole query.
+    """
+    busy = {calendar_id: [] for calendar_id in calendar_ids}
+    errors = {}
+    chunk_start = time_min
+    while chunk_start < time_max:
+        chunk_end = min(chunk_start + timedelta(days=FREEBUSY_CHUNK_DAYS), time_max)
+        for first in range(0, len(calendar_ids), FREEBUSY_MAX_CALENDARS):
+            batch = calendar_ids[first:first + FREEBUSY_MAX_CALENDARS]
+            body = {
+                "timeMin": chunk_start.isoformat().replace('+00:00', 'Z'),
+                "timeMax": chunk_end.isoformat().replace('+00:00', 'Z'),
+                "items": [{"id": calendar_id} for calendar_id in batch]
+            }
+            freebusy_result = _execute(_calendar_service().freebusy().query(body=body), 'calendar')
+            for calendar_id in batch:
+                calendar = freebusy_result['calendars'].get(calendar_id, {})
+                if calendar.get('errors'):
+                    errors[calendar_id] = calendar['errors']
+                for block in calendar.get('busy', []):
+                    busy[calendar_id].append((parse_rfc3339(block['start']), parse_rfc3339(block['end'])))
+        chunk_start = chunk_end
+    return busy, errors
+
+def _find_free_slots(calendar_ids, time_min, days_ahead, duration_minutes, timezone_name,
+                     max_slots=1, day_start=dt_time(9), day_end=dt_time(17), weekdays=(0, 1, 2, 3, 4)):
+    """First max_slots free slots on calendar_ids, as (start, end) timestamps
+
+    FreeBusy is queried one chunk of the horizon at a time and the search stops
+    as soon as enough slots are found, so a 90-day horizon usually costs one
+    query. Each search reruns from time_min so slots spanning a chunk edge
+    aren't missed.
+    """
+    time_max = time_min + timedelta(days=days_ahead)
+    busy = []
+    slots = []
+    chunk_start = time_min
+    while chunk_start < time_max and len(slots) < max_slots:
+        chunk_end = min(chunk_start + timedelta(days=FREEBUSY_CHUNK_DAYS), time_max)
+        busy_by_calendar, errors = _freebusy(calendar_ids, chunk_start, chunk_end)
+        if errors:
+            raise ValueError(f"FreeBusy failed for {', '.join(errors)}: {errors}")
+        for calendar_busy in busy_by_calendar.values():
+            busy.extend(calendar_busy)
+        slots = calendar_scheduling.free_slots(
+            busy, time_min.timestamp(), chunk_end.timestamp(), duration_minutes * 60,
+            timezone_name=timezone_name, day_start=day_start, day_end=day_end,
+            weekdays=weekdays, max_slots=max_slots
+        )
+        chunk_start = chunk_end
+    return slots
+
+# The tool bodies below are blocking (googleapiclient, ffmpeg, Speech-to-Text).
+# Each tool is registered as an async tool that runs its body on a thread pool,
+# so the server's event loop keeps answering other requests meanwhile. Slow
+# recording analysis gets its own small pool so a few long summaries can never
+# take up the threads that quick calendar lookups need.
+LIGHT_TOOL_WORKERS = int(os.getenv("LIGHT_TOOL_WORKERS", "16"))
+HEAVY_TOOL_WORKERS = int(os.getenv("HEAVY_TOOL_WORKERS", "2"))
+_light_pool = ThreadPoolExecutor(LIGHT_TOOL_WORKERS, thread_name_prefix="light-tool")
+_heavy_pool = ThreadPoolExecutor(HEAVY_TOOL_WORKERS, thread_name_prefix="heavy-tool")
+
+def _runs_on(pool):
+    """Turn a blocking tool function into an async one that runs on pool
+
+    The original function stays available as .blocking, for calling one tool
+    from inside another without going through a pool again.
+    """
+    def decorator(fn):
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            return await _in_pool(pool, fn, *args, **kwargs)
+        wrapper.blocking = fn
+        return wrapper
+    return decorator
+
+def _in_pool(pool, fn, *args, **kwargs):
+    """Run a blocking call on pool; returns an awaitable future"""
+    # copy_context carries the current tool name into the worker thread,
+    # so metrics spans recorded there are attributed to this tool
+    call = functools.partial(contextvars.copy_context().run, fn, *args, **kwargs)
+    return asyncio.get_running_loop().run_in_executor(pool, call)
 
 # Helper function for flexible date parsing
 def parse_flexible_date(date_str):
@@ -92,6 +323,7 @@ def parse_flexible_date(date_str):
         raise ValueError(f"Invalid date format: '{date_str}'. Use YYYY-MM-DD, 'today', 'yesterday', or 'last Monday'")
 
 @mcp.tool("aubrey_meeting_finder")
+@_runs_on(_light_pool)
 def meeting_finder(
     calendar_id: str = 'primary',
     start_date: str = '',
@@ -116,14 +348,16 @@ def meeting_finder(
 
         print(f"Fetching events from {start_date} to {end_date}")
 
-        events_result = calendar_service.events().list(
-            calendarId=calendar_id,
-            timeMin=start_date,
-            timeMax=end_date,
-            singleEvents=True,
-            orderBy='startTime'
-        ).execute()
-        events = events_result.get('items', [])
+        events = _agenda_events(calendar_id, start_date, end_date)
+        if events is None:
+            events_result = _list_events(
+                calendarId=calendar_id,
+                timeMin=start_date,
+                timeMax=end_date,
+                singleEvents=True,
+                orderBy='startTime'
+            )
+            events = events_result.get('items', [])
 
         print(f"Found {len(events)} total events")
 
@@ -155,6 +389,7 @@ def meeting_finder(
         return {"error": str(e)}
 
 @mcp.tool("aubrey_next_meeting")
+@_runs_on(_light_pool)
 def next_meeting(calendar_id: str = 'primary'):
     """
     Shows your next upcoming meeting on Google Calendar.
@@ -170,15 +405,16 @@ def next_meeting(calendar_id: str = 'primary'):
 
         print(f"Fetching next meeting after {now}")
 
-        events_result = calendar_service.events().list(
-            calendarId=calendar_id,
-            timeMin=now,
-            maxResults=1,
-            singleEvents=True,
-            orderBy='startTime'
-        ).execute()
-
-        events = events_result.get('items', [])
+        events = _agenda_events(calendar_id, now, max_results=1)
+        if events is None:
+            events_result = _list_events(
+                calendarId=calendar_id,
+                timeMin=now,
+                maxResults=1,
+                singleEvents=True,
+                orderBy='startTime'
+            )
+            events = events_result.get('items', [])
 
         if not events:
             return {
@@ -203,13 +439,15 @@ def next_meeting(calendar_id: str = 'primary'):
         return {"error": str(e)}
 
 @mcp.tool("aubrey_meeting_rescheduler")
+@_runs_on(_light_pool)
 def meeting_rescheduler(
     meeting_title: str = '',
     event_id: str = '',
     new_date: str = '',
     new_time: str = '',
     duration_minutes: int = 60,
-    calendar_id: str = 'primary'
+    calendar_id: str = 'primary',
+    search_days_ahead: int = 7
 ):
     """
     Reschedules a meeting to a new date/time or finds the next available slot.
@@ -221,6 +459,7 @@ def meeting_rescheduler(
         new_time: New time in HH:MM format in YOUR local timezone (leave empty to auto-find next available)
         duration_minutes: Meeting duration in minutes (default: 60)
         calendar_id: Calendar ID (default: 'primary')
+        search_days_ahead: How far ahead to look when auto-finding a slot (default: 7)
 
     Returns:
         Updated meeting details with new time. If conflicts exist, includes warning and conflicting events.
@@ -236,36 +475,37 @@ def meeting_rescheduler(
         if not event_id and meeting_title:
             now = datetime.now(timezone.utc).isoformat().replace('+00:00', 'Z')
 
-            events_result = calendar_service.events().list(
+            events_result = _list_events(
                 calendarId=calendar_id,
                 timeMin=now,
                 q=meeting_title,
                 maxResults=5,
                 singleEvents=True,
                 orderBy='startTime'
-            ).execute()
+            )
 
             events = events_result.get('items', [])
 
             if not events:
                 return {"error": f"No meeting found with title '{meeting_title}'"}
 
-            # Use the first matching event
-            event = events[0]
+            # Use the first matching event. The listing is shared with other
+            # callers (and may be cached), so edit a copy of it
+            event = copy.deepcopy(events[0])
             event_id = event['id']
             print(f"Found meeting: {event.get('summary')} at {event['start'].get('dateTime')}")
         elif event_id:
             # Get event details
-            event = calendar_service.events().get(
+            event = _execute(_calendar_service().events().get(
                 calendarId=calendar_id,
                 eventId=event_id
-            ).execute()
+            ), 'calendar')
             print(f"Found event: {event.get('summary')}")
         else:
             return {"error": "Must provide either meeting_title or event_id"}
 
         # Get calendar timezone
-        calendar_info = calendar_service.calendars().get(calendarId=calendar_id).execute()
+        calendar_info = _execute(_calendar_service().calendars().get(calendarId=calendar_id), 'calendar')
         calendar_timezone = calendar_info.get('timeZone', 'UTC')
         print(f"Calendar timezone: {calendar_timezone}")
 
@@ -273,58 +513,18 @@ def meeting_rescheduler(
         if not new_date or not new_time:
             print("Finding next available time slot...")
 
-            # Get busy times for the next 7 days
-            now = datetime.now(timezone.utc)
-            time_min = now.isoformat().replace('+00:00', 'Z')
-            time_max = (now + timedelta(days=7)).isoformat().replace('+00:00', 'Z')
-
-            body = {
-                "timeMin": time_min,
-                "timeMax": time_max,
-                "items": [{"id": calendar_id}]
-            }
-
-            freebusy_result = calendar_service.freebusy().query(body=body).execute()
-            busy_times = freebusy_result['calendars'][calendar_id]['busy']
-
-            # Find first available slot (9 AM - 5 PM, weekdays)
-            current = now
-            found_slot = False
-
-            while not found_slot and current < now + timedelta(days=7):
-                # Skip to next business hour
-                if current.hour < 9:
-                    current = current.replace(hour=9, minute=0, second=0)
-                elif current.hour >= 17:
-                    current = (current + timedelta(days=1)).replace(hour=9, minute=0, second=0)
-
-                # Skip weekends
-                if current.weekday() >= 5:
-                    current = (current + timedelta(days=1)).replace(hour=9, minute=0, second=0)
-                    continue
-
-                # Check if slot is free
-                slot_end = current + timedelta(minutes=duration_minutes)
-
-                is_busy = False
-                for busy in busy_times:
-                    busy_start = datetime.fromisoformat(busy['start'].replace('Z', '+00:00'))
-                    busy_end = datetime.fromisoformat(busy['end'].replace('Z', '+00:00'))
-
-                    if not (slot_end <= busy_start or current >= busy_end):
-                        is_busy = True
-                        break
-
-                if not is_busy:
-                    new_date = current.strftime('%Y-%m-%d')
-                    new_time = current.strftime('%H:%M')
-                    found_slot = True
-                    print(f"Found available slot: {new_date} at {new_time}")
-                else:
-                    current += timedelta(minutes=30)  # Try next 30-minute slot
+            slots = _find_free_slots(
+                [calendar_id], datetime.now(timezone.utc), search_days_ahead, duration_minutes, calendar_timezone
+            )
+            if not slots:
+                return {"error": f"No available time slots found in the next {search_days_ahead} days"}
 
-            if not found_slot:
-                return {"error": "No available time slots found in the next 7 days"}
+            # Slots are found in the calendar's timezone, which is how new_date
+            # and new_time are read below
+            slot_start = datetime.fromtimestamp(slots[0][0], ZoneInfo(calendar_timezone))
+            new_date = slot_start.strftime('%Y-%m-%d')
+            new_time = slot_start.strftime('%H:%M')
+            print(f"Found available slot: {new_date} at {new_time}")
 
         # Parse new date/time in calendar's timezone
         new_datetime = datetime.strptime(f"{new_date} {new_time}", "%Y-%m-%d %H:%M")
@@ -347,7 +547,7 @@ def meeting_rescheduler(
             "items": [{"id": calendar_id}]
         }
 
-        freebusy_result = calendar_service.freebusy().query(body=body).execute()
+        freebusy_result = _execute(_calendar_service().freebusy().query(body=body), 'calendar')
         busy_times = freebusy_result['calendars'][calendar_id]['busy']
 
         # Find conflicting events if any
@@ -355,12 +555,12 @@ def meeting_rescheduler(
             print(f"⚠️ Conflict detected at {new_date} {new_time} {calendar_timezone}")
 
             # Get details of conflicting events
-            events_at_time = calendar_service.events().list(
+            events_at_time = _list_events(
                 calendarId=calendar_id,
                 timeMin=new_datetime_utc.isoformat().replace('+00:00', 'Z'),
                 timeMax=new_end_utc.isoformat().replace('+00:00', 'Z'),
                 singleEvents=True
-            ).execute()
+            )
 
             for conflicting_event in events_at_time.get('items', []):
                 # Skip the event being rescheduled
@@ -385,11 +585,15 @@ def meeting_rescheduler(
             'timeZone': calendar_timezone
         }
 
-        updated_event = calendar_service.events().update(
+        updated_event = _execute(_calendar_service().events().update(
             calendarId=calendar_id,
             eventId=event_id,
             body=event
-        ).execute()
+        ), 'calendar')
+        # Listings fetched before the move are now stale
+        _events_list_flight.clear()
+        if _agenda:
+            _agenda.invalidate(calendar_id, updated_event)
 
         print(f"Meeting rescheduled successfully!")
 
@@ -417,7 +621,249 @@ def meeting_rescheduler(
         traceback.print_exc()
         return {"error": str(e)}
 
+@mcp.tool("aubrey_find_free_slots")
+@_runs_on(_light_pool)
+def find_free_slots(
+    duration_minutes: int = 60,
+    days_ahead: int = 7,
+    max_slots: int = 5,
+    calendar_id: str = 'primary',
+    working_hours_start: str = '09:00',
+    working_hours_end: str = '17:00',
+    include_weekends: bool = False,
+    timezone_name: str = ''
+):
+    """
+    Finds the next free time slots in your calendar, within working hours.
+
+    Args:
+        duration_minutes: Length of each slot in minutes (default: 60)
+        days_ahead: How far ahead to search, e.g. 90 for the next quarter (default: 7)
+        max_slots: How many slots to return (default: 5)
+        calendar_id: Calendar ID (default: 'primary')
+        working_hours_start: Start of the working day, HH:MM (default: '09:00')
+        working_hours_end: End of the working day, HH:MM (default: '17:00')
+        include_weekends: Also offer Saturday and Sunday slots (default: False)
+        timezone_name: IANA timezone for working hours, e.g. 'Europe/London'
+            (default: the calendar's own timezone)
+
+    Returns:
+        Free slots in time order, with start and end in the chosen timezone
+
+    Example:
+        duration_minutes = 30, max_slots = 3
+        Returns: The next three free half hours between 9:00 and 17:00
+    """
+    try:
+        if not timezone_name:
+            calendar_info = _execute(_calendar_service().calendars().get(calendarId=calendar_id), 'calendar')
+            timezone_name = calendar_info.get('timeZone', 'UTC')
+        tz = ZoneInfo(timezone_name)
+
+        slots = _find_free_slots(
+            [calendar_id],
+            datetime.now(timezone.utc),
+            days_ahead,
+            duration_minutes,
+            timezone_name,
+            max_slots=max_slots,
+            day_start=datetime.strptime(working_hours_start, '%H:%M').time(),
+            day_end=datetime.strptime(working_hours_end, '%H:%M').time(),
+            weekdays=range(7) if include_weekends else (0, 1, 2, 3, 4)
+        )
+
+        free = []
+        for start, end in slots:
+            slot_start = datetime.fromtimestamp(start, tz)
+            free.append({
+                "date": slot_start.strftime('%Y-%m-%d'),
+                "time": slot_start.strftime('%H:%M'),
+                "start": slot_start.isoformat(),
+                "end": datetime.fromtimestamp(end, tz).isoformat()
+            })
+
+        return {
+            "timezone": timezone_name,
+            "slots": free,
+            "count": len(free),
+            "message": f"Found {len(free)} free {duration_minutes}-minute slot(s) in the next {days_ahead} days"
+        }
+
+    except Exception as e:
+        print(f"ERROR in find_free_slots: {e}")
+        import traceback
+        traceback.print_exc()
+        return {"error": str(e)}
+
+@mcp.tool("aubrey_group_availability")
+@_runs_on(_light_pool)
+def find_group_availability(
+    attendee_emails: list[str],
+    duration_minutes: int = 60,
+    days_ahead: int = 7,
+    min_attendees: int = 0,
+    required_attendees: list[str] = None,
+    max_slots: int = 5,
+    working_hours_start: str = '09:00',
+    working_hours_end: str = '17:00',
+    include_weekends: bool = False,
+    timezone_name: str = ''
+):
+    """
+    Finds the best times to meet with a group of people, even hundreds of them.
+
+    Args:
+        attendee_emails: Email addresses (calendar IDs) of everyone to invite
+        duration_minutes: Meeting length in minutes (default: 60)
+        days_ahead: How far ahead to search (default: 7)
+        min_attendees: Accept slots where at least this many attendees are free
+            for the whole meeting (default: 0 = everyone must be free)
+        required_attendees: Attendees who must be free in every suggested slot
+        max_slots: How many slots to suggest (default: 5)
+        working_hours_start: Start of the working day, HH:MM (default: '09:00')
+        working_hours_end: End of the working day, HH:MM (default: '17:00')
+        include_weekends: Also consider Saturday and Sunday (default: False)
+        timezone_name: IANA timezone for working hours (default: your primary
+            calendar's timezone)
+
+    Returns:
+        Suggested slots, most attendees free first, with who can't make each one
+
+    Example:
+        attendee_emails = ["ana@example.com", "ben@example.com", ...], min_attendees = 35
+        Returns: Hour-long slots this week where at least 35 people are free
+    """
+    try:
+        if not timezone_name:
+            calendar_info = _execute(_calendar_service().calendars().get(calendarId='primary'), 'calendar')
+            timezone_name = calendar_info.get('timeZone', 'UTC')
+        tz = ZoneInfo(timezone_name)
+        attendee_emails = list(dict.fromkeys(attendee_emails))
+        print(f"Checking availability of {len(attendee_emails)} attendees over {days_ahead} days")
+
+        # Start the minute grid on a whole hour so slots land on :00 and :30
+        now = datetime.now(timezone.utc)
+        window_start = now.replace(minute=0, second=0, microsecond=0)
+        window_end = window_start + timedelta(days=days_ahead)
+        busy_by_calendar, errors = _freebusy(attendee_emails, window_start, window_end)
+
+        # Attendees whose calendars can't be read are left out of the search
+        attendees = [email for email in attendee_emails if email not in errors]
+        if not attendees:
+            return {"error": "Could not read the availability of any attendee", "unknown_availability": list(errors)}
+        row_of = {email: row for row, email in enumerate(attendees)}
+        missing_required = [email for email in required_attendees or [] if email not in row_of]
+        if missing_required:
+            return {"error": f"Could not read the availability of required attendees: {', '.join(missing_required)}"}
+
+        busy = group_availability.busy_bitmap(
+            [busy_by_calendar[email] for email in attendees], window_start.timestamp(), window_end.timestamp()
+        )
+        allowed = group_availability.working_minutes(
+            window_start.timestamp(), window_end.timestamp(), timezone_name,
+            day_start=datetime.strptime(working_hours_start, '%H:%M').time(),
+            day_end=datetime.strptime(working_hours_end, '%H:%M').time(),
+            weekdays=range(7) if include_weekends else (0, 1, 2, 3, 4)
+        )
+        allowed[:int((now - window_start).total_seconds() // 60) + 1] = False  # Not in the past
+
+        quorum = min(min_attendees, len(attendees)) if min_attendees else len(attendees)
+        slots = group_availability.quorum_slots(
+            busy, allowed, duration_minutes, quorum,
+            required=[row_of[email] for email in required_attendees or []],
+            max_slots=max_slots
+        )
+
+        suggestions = []
+        for start_minute, free in slots:
+            slot_start = (window_start + timedelta(minutes=start_minute)).astimezone(tz)
+            unavailable = [attendees[row] for row in group_availability.busy_attendees(busy, start_minute, duration_minutes)]
+            suggestions.append({
+                "date": slot_start.strftime('%Y-%m-%d'),
+                "time": slot_start.strftime('%H:%M'),
+                "start": slot_start.isoformat(),
+                "end": (slot_start + timedelta(minutes=duration_minutes)).isoformat(),
+                "attendees_free": free,
+                "attendees_busy": unavailable[:25],
+                "attendees_busy_count": len(unavailable)
+            })
+
+        result = {
+            "timezone": timezone_name,
+            "attendees": len(attendee_emails),
+            "min_attendees": quorum,
+            "slots": suggestions,
+            "count": len(suggestions),
+            "message": f"Found {len(suggestions)} slot(s) where at least {quorum} of {len(attendees)} attendees are free"
+        }
+        if errors:
+            result["unknown_availability"] = list(errors)
+        return result
+
+    except Exception as e:
+        print(f"ERROR in find_group_availability: {e}")
+        import traceback
+        traceback.print_exc()
+        return {"error": str(e)}
+
+# Transcripts and analysis of recordings already processed, keyed by Drive
+# file id and content checksum. Concurrent requests for the same recording
+# (e.g. a summary and a prep request) share one transcription.
+_transcript_cache = TranscriptCache()
+_recording_flight = SingleFlight()
+
+def _analyze_recording(file):
+    """Transcript and analysis of a Drive recording, from the cache if the file hasn't changed
+
+    file is Drive metadata with id, mimeType and md5Checksum/modifiedTime.
+    Raises meeting_audio.FFmpegNotFound if ffmpeg isn't installed.
+    """
+    version = file_version(file)
+    cached = _transcript_cache.get(file['id'], version)
+    if cached is not None:
+        print(f"Using cached transcript of {file.get('name', file['id'])}")
+        return cached
+
+    def analyze():
+        # Stream the recording through ffmpeg, cut it into segments of a few
+        # minutes at pauses and transcribe the segments in parallel, so the
+        # whole meeting gets transcribed, quickly
+        backend = transcription.SpeechToTextBackend(_get_creds())
+        audio = transcription.transcribe_drive_file(_drive_service(), file['id'], file['mimeType'], backend)
+        transcript = audio["transcript"]
+        print(f"Transcribed {len(transcript)} characters from {audio['audio_seconds'] / 60:.1f} minutes of audio")
+
+        result = {"transcript": transcript, "audio_minutes": round(audio["audio_seconds"] / 60, 1)}
+        if transcript:
+            # COMPREHENSIVE ANALYSIS
+            with tool_metrics.span("analysis"):
+                result.update(transcript_analysis.analyze(transcript))
+            print(f"Generated comprehensive analysis")
+        _transcript_cache.put(file['id'], version, result)
+        return result
+
+    return _recording_flight.do(f"{file['id']}:{version}", analyze)
+
+def _recordings_folder_id():
+    query = "name='Meet Recordings' and mimeType='application/vnd.google-apps.folder'"
+    folders = _execute(_drive_service().files().list(q=query, fields='files(id, name)'), 'drive').get('files', [])
+    return folders[0]['id'] if folders else None
+
+# Optional: transcribe new recordings in the background as soon as they show
+# up in Drive (PRETRANSCRIBE_RECORDINGS=1), so summaries are cache hits.
+# Started in __main__ below.
+_pretranscriber = None
+if pretranscriber.PRETRANSCRIBE_RECORDINGS:
+    _pretranscriber = pretranscriber.Pretranscriber(
+        pretranscriber.DriveChangesSource(_drive_service, lambda request: _execute(request, 'drive')),
+        analyze=_analyze_recording,
+        is_cached=lambda file: _transcript_cache.contains(file['id'], file_version(file)),
+        folder_id=_recordings_folder_id,
+        token_store=pretranscriber.PageTokenStore(_transcript_cache.path)
+    )
+
 @mcp.tool("aubrey_drive_meeting_summarizer")
+@_runs_on(_heavy_pool)
 def drive_meeting_summarizer(date: str = '', time: str = '', meeting_title: str = ''):
     """
     🤖 COMPREHENSIVE MEETING ANALYSIS - Your AI meeting assistant!
@@ -444,10 +890,6 @@ def drive_meeting_summarizer(date: str = '', time: str = '', meeting_title: str
         Returns: Full analysis of yesterday's meeting with AI-extracted insights
     """
     try:
-        from google.cloud import speech_v1
-        import tempfile
-        import os
-
         # Parse flexible date format
         if not date:
             date = 'today'
@@ -468,7 +910,7 @@ def drive_meeting_summarizer(date: str = '', time: str = '', meeting_title: str
 
         # Search for Meet Recordings folder
         query = "name='Meet Recordings' and mimeType='application/vnd.google-apps.folder'"
-        results = drive_service.files().list(q=query, fields='files(id, name)').execute()
+        results = _execute(_drive_service().files().list(q=query, fields='files(id, name)'), 'drive')
         folders = results.get('files', [])
 
         folder_id = None
@@ -482,7 +924,7 @@ def drive_meeting_summarizer(date: str = '', time: str = '', meeting_title: str
                 'name': 'Meet Recordings',
                 'mimeType': 'application/vnd.google-apps.folder'
             }
-            folder = drive_service.files().create(body=folder_metadata, fields='id').execute()
+            folder = _execute(_drive_service().files().create(body=folder_metadata, fields='id'), 'drive')
             folder_id = folder.get('id')
             print(f"Created Meet Recordings folder: {folder_id}")
 
@@ -499,12 +941,12 @@ def drive_meeting_summarizer(date: str = '', time: str = '', meeting_title: str
         print(f"Search query: {search_query}")
 
         # Search for recording files
-        results = drive_service.files().list(
+        results = _execute(_drive_service().files().list(
             q=search_query,
             orderBy='createdTime desc',
-            fields='files(id, name, mimeType, createdTime)',
+            fields='files(id, name, mimeType, createdTime, modifiedTime, md5Checksum)',
             pageSize=10
-        ).execute()
+        ), 'drive')
 
         files = results.get('files', [])
 
@@ -545,243 +987,107 @@ def drive_meeting_summarizer(date: str = '', time: str = '', meeting_title: str
 
         print(f"Using recording: {file_name}")
 
-        # Download the file
-        request = drive_service.files().get_media(fileId=file_id)
-
-        # Save to temporary file
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.mp4') as temp_file:
-            temp_path = temp_file.name
-            downloader = MediaIoBaseDownload(temp_file, request)
-            done = False
-            while not done:
-                status, done = downloader.next_chunk()
-                if status:
-                    print(f"Download {int(status.progress() * 100)}% complete")
-
-        print(f"File downloaded to {temp_path}")
-
-        # Extract audio from video using ffmpeg
-        audio_path = temp_path.replace('.mp4', '.wav')
-        print(f"Extracting audio to {audio_path}")
-
-        import subprocess
         try:
-            # Extract audio as WAV format
-            subprocess.run([
-                'ffmpeg', '-i', temp_path,
-                '-vn',  # No video
-                '-acodec', 'pcm_s16le',  # Linear PCM 16-bit
-                '-ar', '16000',  # 16kHz sample rate
-                '-ac', '1',  # Mono
-                audio_path
-            ], check=True, capture_output=True)
-
-            print(f"Audio extracted successfully")
-
-            # Read audio file
-            with open(audio_path, 'rb') as audio_file:
-                audio_content = audio_file.read()
-
-            # Transcribe using Google Speech-to-Text
-            print("Transcribing audio with Speech-to-Text API...")
-            client = speech_v1.SpeechClient(credentials=creds)
-
-            # Check file size - if > 10MB, transcribe first 10MB as partial transcript
-            file_size_mb = len(audio_content) / (1024 * 1024)
-            print(f"Audio file size: {file_size_mb:.2f} MB")
-
-            partial_transcript = False
-            if file_size_mb > 10:
-                print(f"File exceeds 10MB limit. Transcribing first 10MB as partial transcript...")
-                # Truncate to first 10MB
-                audio_content = audio_content[:10 * 1024 * 1024]
-                partial_transcript = True
-
-            # Use synchronous recognize for audio
-            audio = speech_v1.RecognitionAudio(content=audio_content)
-            config = speech_v1.RecognitionConfig(
-                encoding=speech_v1.RecognitionConfig.AudioEncoding.LINEAR16,
-                sample_rate_hertz=16000,
-                language_code="en-US",
-                enable_automatic_punctuation=True,
-            )
-
-            print("Starting transcription...")
-            response = client.recognize(config=config, audio=audio)
-
-            # Check if we got any results
-            if not response.results:
-                os.unlink(temp_path)
-                os.unlink(audio_path)
-                result = {
-                    "file_id": file_id,
-                    "file_name": file_name,
-                    "transcript": "",
-                    "summary": "No speech detected in recording.",
-                    "transcript_length": 0
-                }
-                if partial_transcript:
-                    result["note"] = f"Only first 10MB of {file_size_mb:.2f}MB file was processed (partial transcript)"
-                return result
-
-            # Combine all transcripts
-            transcript = " ".join([result.alternatives[0].transcript for result in response.results])
-
-            # Clean up temp files
-            os.unlink(temp_path)
-            os.unlink(audio_path)
-
-            print(f"Transcribed {len(transcript)} characters")
-
-            # COMPREHENSIVE ANALYSIS
-            import re
-            sentences = transcript.split(".")
-
-            # 1. Simple summary: first 5 sentences
-            summary_sentences = [s.strip() for s in sentences[:5] if s.strip()]
-            summary = ". ".join(summary_sentences)
-            if summary:
-                summary += "."
-
-            # 2. Extract key discussion points
-            key_points = []
-            important_keywords = ['important', 'critical', 'key', 'priority', 'must', 'need to', 'decided', 'agreed']
-            for sentence in sentences:
-                sentence = sentence.strip()
-                if any(keyword in sentence.lower() for keyword in important_keywords) and len(sentence) > 20:
-                    key_points.append(sentence)
-
-            # 3. Extract decisions made
-            decisions = []
-            decision_patterns = [
-                r"(?:we|I|they)\s+(?:decided|agreed|concluded|determined)\s+(?:to|that)\s+(.+?)(?:\.|,|$)",
-                r"(?:decision|conclusion):\s*(.+?)(?:\.|$)",
-                r"(?:let's|we'll|we will|we're going to)\s+(.+?)(?:\.|,|$)"
-            ]
-            for sentence in sentences:
-                for pattern in decision_patterns:
-                    matches = re.finditer(pattern, sentence, re.IGNORECASE)
-                    for match in matches:
-                        decision_text = match.group(1).strip() if match.groups() else sentence.strip()
-                        if len(decision_text) > 10 and len(decision_text) < 150:
-                            decisions.append(decision_text)
-
-            # 4. Extract questions raised
-            questions = []
-            for sentence in sentences:
-                if '?' in sentence:
-                    question = sentence.split('?')[0].strip() + '?'
-                    if len(question) > 10:
-                        questions.append(question)
-
-            # 5. Extract action items
-            action_items = []
-            action_patterns = [
-                r"(\w+)\s+(?:will|should|needs to|has to|must)\s+(.+?)(?:\.|,|$)",
-                r"(?:TODO|Action item|Action|Task):\s*(.+?)(?:\.|$)",
-                r"(\w+)\s+(?:to|going to)\s+(.+?)(?:\.|,|$)"
-            ]
-            for sentence in sentences:
-                sentence = sentence.strip()
-                for pattern in action_patterns:
-                    matches = re.finditer(pattern, sentence, re.IGNORECASE)
-                    for match in matches:
-                        if len(match.groups()) == 2:
-                            person = match.group(1).strip()
-                            task = match.group(2).strip()
-                        else:
-                            person = "Unassigned"
-                            task = match.group(1).strip()
-                        if len(task) > 10 and len(task) < 200:
-                            action_items.append({
-                                "assignee": person.capitalize(),
-                                "task": task
-                            })
-
-            # Remove duplicate action items
-            unique_actions = []
-            seen_tasks = set()
-            for item in action_items:
-                task_key = item['task'].lower()[:50]
-                if task_key not in seen_tasks:
-                    seen_tasks.add(task_key)
-                    unique_actions.append(item)
-
-            # 6. Sentiment analysis
-            positive_words = ['great', 'good', 'excellent', 'awesome', 'perfect', 'agree', 'yes', 'love', 'like']
-            negative_words = ['bad', 'wrong', 'issue', 'problem', 'concern', 'worried', 'no', 'disagree', 'difficult']
-            positive_count = sum(1 for word in positive_words if word in transcript.lower())
-            negative_count = sum(1 for word in negative_words if word in transcript.lower())
-
-            if positive_count > negative_count * 1.5:
-                sentiment = "Positive - Collaborative and productive discussion"
-            elif negative_count > positive_count * 1.5:
-                sentiment = "Challenging - Several concerns or issues raised"
-            else:
-                sentiment = "Neutral - Balanced discussion"
-
-            print(f"Generated comprehensive analysis")
-
-            result = {
+            analysis = _analyze_recording(files[0])
+        except meeting_audio.FFmpegNotFound:
+            return {
                 "file_id": file_id,
                 "file_name": file_name,
-                "date": date,
-                "time": time,
-                "transcript": transcript,
-                "transcript_length": len(transcript),
-                "summary": summary,
-                "insights": {
-                    "key_discussion_points": key_points[:5],
-                    "decisions_made": list(set(decisions))[:5],
-                    "questions_raised": questions[:5],
-                    "action_items": unique_actions[:10],
-                    "sentiment": sentiment,
-                    "positive_indicators": positive_count,
-                    "concerns_raised": negative_count
-                }
+                "error": "ffmpeg not installed. Please run: brew install ffmpeg",
+                "note": "Audio extraction from video requires ffmpeg"
             }
 
-            if partial_transcript:
-                result["note"] = f"⚠️ Partial transcript: Only first 10MB of {file_size_mb:.2f}MB file was processed. Full meeting may have additional content."
-
-            return result
-
-        except subprocess.CalledProcessError as e:
-            # Clean up temp file
-            os.unlink(temp_path)
-            if os.path.exists(audio_path):
-                os.unlink(audio_path)
-
+        transcript = analysis["transcript"]
+        if not transcript:
             return {
                 "file_id": file_id,
                 "file_name": file_name,
-                "error": "ffmpeg not installed. Please run: brew install ffmpeg",
-                "note": "Audio extraction from video requires ffmpeg"
+                "transcript": "",
+                "summary": "No speech detected in recording.",
+                "transcript_length": 0
             }
 
+        return {
+            "file_id": file_id,
+            "file_name": file_name,
+            "date": date,
+            "time": time,
+            "transcript": transcript,
+            "transcript_length": len(transcript),
+            "audio_minutes": analysis["audio_minutes"],
+            "summary": analysis["summary"],
+            "insights": analysis["insights"]
+        }
+
     except Exception as e:
         print(f"ERROR in drive_meeting_summarizer: {e}")
         import traceback
         traceback.print_exc()
         return {"error": str(e)}
 
+# Past meetings the prep assistant analyzes at the same time. The pool is
+# shared by all prep requests; transcription itself is further bounded by
+# TRANSCRIPTION_WORKERS.
+PREP_WORKERS = int(os.getenv("PREP_ASSISTANT_WORKERS", "4"))
+PREP_DEADLINE_SECONDS = float(os.getenv("PREP_ASSISTANT_DEADLINE_SECONDS", "240"))
+_prep_pool = ThreadPoolExecutor(PREP_WORKERS, thread_name_prefix="prep")
+
+def _meeting_info(event):
+    return {
+        "title": event.get('summary', 'No title'),
+        "date": event['start'].get('dateTime', event['start'].get('date')),
+        "attendees": [a.get('email', 'Unknown') for a in event.get('attendees', [])]
+    }
+
+def _prep_meeting(event):
+    """Prep entry for one past meeting, with the analysis of its recording if there is one"""
+    meeting_info = _meeting_info(event)
+    try:
+        event_date = meeting_info['date'].split('T')[0]
+        summary_result = drive_meeting_summarizer.blocking(date=event_date, meeting_title=event.get('summary', ''))
+
+        if 'transcript' in summary_result and 'insights' in summary_result:
+            meeting_info['had_recording'] = True
+            meeting_info['summary'] = summary_result.get('summary', '')
+            meeting_info['insights'] = {
+                "key_points": summary_result['insights'].get('key_discussion_points', [])[:3],
+                "decisions": summary_result['insights'].get('decisions_made', [])[:3],
+                "action_items": summary_result['insights'].get('action_items', [])[:5],
+                "sentiment": summary_result['insights'].get('sentiment', 'Unknown')
+            }
+        else:
+            meeting_info['had_recording'] = False
+            meeting_info['note'] = "No recording available"
+    except Exception:
+        meeting_info['had_recording'] = False
+        meeting_info['note'] = "Could not fetch recording"
+    return meeting_info
+
 @mcp.tool("aubrey_meeting_prep_assistant")
-def meeting_prep_assistant(
+async def meeting_prep_assistant(
+    ctx: Context,
     meeting_title: str = '',
     attendee_email: str = '',
     lookback_days: int = 90,
     include_transcripts: bool = True,
-    max_results: int = 5
+    max_results: int = 5,
+    deadline_seconds: float = PREP_DEADLINE_SECONDS
 ):
     """
     Prepares you for an upcoming meeting by finding context from previous similar meetings.
 
+    Recordings of the previous meetings are analyzed several at a time. If the
+    client asked for progress, each meeting is sent as a progress message as
+    soon as its analysis is done.
+
     Args:
         meeting_title: Title of the upcoming meeting (e.g., "Weekly Sync")
         attendee_email: Email of key attendee to find previous meetings with
         lookback_days: How many days back to search (default: 90)
         include_transcripts: Whether to fetch full analysis from recordings (default: True, slower but more detailed)
         max_results: Maximum number of previous meetings to return (default: 5)
+        deadline_seconds: Return with whatever is ready after this long (default: 240). Recordings
+            still being analyzed keep going in the background and are cached for the next request
 
     Returns:
         Context from previous meetings including summaries, action items, and key decisions
@@ -790,6 +1096,7 @@ def meeting_prep_assistant(
         meeting_title = "Weekly Sync", lookback_days = 30
         Returns: Last 5 Weekly Sync meetings from past 30 days with full analysis
     """
+    running = {}
     try:
         # Validate inputs
         if not meeting_title and not attendee_email:
@@ -798,11 +1105,15 @@ def meeting_prep_assistant(
                 "suggestion": "Example: meeting_title='Team Standup' or attendee_email='boss@company.com'"
             }
 
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + deadline_seconds
+
         # Search for previous meetings with same title or attendee
         start_date = (datetime.now(timezone.utc) - timedelta(days=lookback_days)).isoformat().replace('+00:00', 'Z')
         end_date = datetime.now(timezone.utc).isoformat().replace('+00:00', 'Z')
 
-        events_result = calendar_service.events().list(
+        events_result = await _in_pool(
+            _light_pool, _list_events,
             calendarId='primary',
             timeMin=start_date,
             timeMax=end_date,
@@ -810,9 +1121,9 @@ def meeting_prep_assistant(
             singleEvents=True,
             orderBy='startTime',
             maxResults=max_results * 2  # Get extra in case some don't have recordings
-        ).execute()
+        )
 
-        events = events_result.get('items', [])
+        events = events_result.get('items', [])[:max_results * 2]
 
         if not events:
             return {
@@ -820,48 +1131,71 @@ def meeting_prep_assistant(
                 "suggestion": "Try increasing lookback_days or checking the meeting title spelling"
             }
 
-        previous_meetings = []
-        meetings_with_recordings = 0
-
-        for event in events[:max_results * 2]:  # Process more to find recordings
-            meeting_date = event['start'].get('dateTime', event['start'].get('date'))
-            meeting_info = {
-                "title": event.get('summary', 'No title'),
-                "date": meeting_date,
-                "attendees": [a.get('email', 'Unknown') for a in event.get('attendees', [])]
-            }
-
-            # Try to get full analysis if requested
-            if include_transcripts:
-                try:
-                    event_date = meeting_date.split('T')[0]
-                    summary_result = drive_meeting_summarizer(date=event_date, meeting_title=event.get('summary', ''))
-
-                    if 'transcript' in summary_result and 'insights' in summary_result:
-                        meeting_info['had_recording'] = True
-                        meeting_info['summary'] = summary_result.get('summary', '')
-                        meeting_info['insights'] = {
-                            "key_points": summary_result['insights'].get('key_discussion_points', [])[:3],
-                            "decisions": summary_result['insights'].get('decisions_made', [])[:3],
-                            "action_items": summary_result['insights'].get('action_items', [])[:5],
-                            "sentiment": summary_result['insights'].get('sentiment', 'Unknown')
-                        }
-                        meetings_with_recordings += 1
-                    else:
-                        meeting_info['had_recording'] = False
-                        meeting_info['note'] = "No recording available"
-                except:
-                    meeting_info['had_recording'] = False
-                    meeting_info['note'] = "Could not fetch recording"
-            else:
+        if not include_transcripts:
+            previous_meetings = []
+            for event in events[:max_results]:
+                meeting_info = _meeting_info(event)
                 meeting_info['had_recording'] = False
                 meeting_info['note'] = "Transcripts not requested (set include_transcripts=True)"
+                previous_meetings.append(meeting_info)
+            return {
+                "upcoming_meeting": meeting_title or f"Meeting with {attendee_email}",
+                "search_period": f"Last {lookback_days} days",
+                "previous_meetings_count": len(previous_meetings),
+                "meetings_with_recordings": 0,
+                "previous_meetings": previous_meetings,
+                "aggregated_action_items": [],
+                "message": f"Found {len(previous_meetings)} previous meetings (0 with recordings)"
+            }
 
-            previous_meetings.append(meeting_info)
+        # Progress notifications only reach the client if it sent a progressToken
+        meta = ctx.request_context.meta
+        streaming = meta is not None and meta.progressToken is not None
 
-            # Stop if we have enough meetings
-            if len(previous_meetings) >= max_results:
+        # Analyze up to PREP_WORKERS meetings at once, oldest first, until
+        # max_results of them turned out to have recordings
+        finished = {}  # event index -> meeting info
+        meetings_with_recordings = 0
+        next_index = 0
+        timed_out = False
+        while True:
+            while next_index < len(events) and len(running) < PREP_WORKERS and meetings_with_recordings < max_results:
+                running[_in_pool(_prep_pool, _prep_meeting, events[next_index])] = next_index
+                next_index += 1
+            if not running:
                 break
+            done, _ = await asyncio.wait(
+                running, timeout=max(deadline - loop.time(), 0), return_when=asyncio.FIRST_COMPLETED
+            )
+            if not done:
+                timed_out = True
+                break
+            for future in done:
+                index = running.pop(future)
+                meeting_info = finished[index] = future.result()
+                if meeting_info['had_recording']:
+                    meetings_with_recordings += 1
+                if streaming:
+                    await ctx.report_progress(
+                        progress=len(finished),
+                        total=len(events),
+                        message=json.dumps({"meeting": meeting_info})
+                    )
+            if meetings_with_recordings >= max_results:
+                break
+
+        if timed_out:
+            for index in running.values():
+                finished[index] = _meeting_info(events[index])
+                finished[index]['had_recording'] = False
+                finished[index]['note'] = "Analysis didn't finish before the deadline; ask again later to get it from the cache"
+
+        # Meetings with recordings first, topped up with the others, in date order
+        with_recording = [index for index in sorted(finished) if finished[index]['had_recording']][:max_results]
+        without_recording = [index for index in sorted(finished) if not finished[index]['had_recording']]
+        keep = sorted(with_recording + without_recording[:max_results - len(with_recording)])
+        previous_meetings = [finished[index] for index in keep]
+        meetings_with_recordings = len(with_recording)
 
         # Aggregate action items across all meetings
         all_action_items = []
@@ -869,7 +1203,7 @@ def meeting_prep_assistant(
             if meeting.get('had_recording') and 'insights' in meeting:
                 all_action_items.extend(meeting['insights'].get('action_items', []))
 
-        return {
+        result = {
             "upcoming_meeting": meeting_title or f"Meeting with {attendee_email}",
             "search_period": f"Last {lookback_days} days",
             "previous_meetings_count": len(previous_meetings),
@@ -878,21 +1212,39 @@ def meeting_prep_assistant(
             "aggregated_action_items": all_action_items[:10],  # Top 10 action items from all meetings
             "message": f"Found {len(previous_meetings)} previous meetings ({meetings_with_recordings} with recordings)"
         }
+        if timed_out:
+            result["timed_out"] = True
+            result["message"] += f"; {len(running)} still being analyzed after {deadline_seconds:g} seconds"
+        return result
 
     except Exception as e:
         print(f"ERROR in meeting_prep_assistant: {e}")
         import traceback
         traceback.print_exc()
         return {"error": str(e)}
+    finally:
+        # Analyses that haven't started yet aren't needed any more
+        for future in running:
+            future.cancel()
 
 @mcp.tool("aubrey_calendar_conflicts_detector")
-def calendar_conflicts_detector(days_ahead: int = 7, calendar_id: str = 'primary'):
+@_runs_on(_light_pool)
+def calendar_conflicts_detector(
+    days_ahead: int = 7,
+    calendar_id: str = 'primary',
+    calendar_ids: list[str] = None,
+    include_all_day: bool = False
+):
     """
     Detects scheduling conflicts and back-to-back meetings in your calendar.
 
     Args:
         days_ahead: Number of days to check ahead (default: 7)
         calendar_id: Calendar ID to check (default: 'primary')
+        calendar_ids: Several calendar IDs to check together, e.g. your own and a
+            shared team calendar; overrides calendar_id
+        include_all_day: Also count all-day events (out of office, offsites) as
+            conflicts (default: False)
 
     Returns:
         List of conflicts, back-to-back meetings, and scheduling suggestions
@@ -905,16 +1257,37 @@ def calendar_conflicts_detector(days_ahead: int = 7, calendar_id: str = 'primary
         # Get events for the next N days
         start_date = datetime.now(timezone.utc).isoformat().replace('+00:00', 'Z')
         end_date = (datetime.now(timezone.utc) + timedelta(days=days_ahead)).isoformat().replace('+00:00', 'Z')
-
-        events_result = calendar_service.events().list(
-            calendarId=calendar_id,
-            timeMin=start_date,
-            timeMax=end_date,
-            singleEvents=True,
-            orderBy='startTime'
-        ).execute()
-
-        events = events_result.get('items', [])
+        calendar_ids = calendar_ids or [calendar_id]
+
+        # Parse every event's times once; the same meeting can show up on
+        # several of the calendars, so keep one copy of it
+        events = []
+        intervals = []
+        seen = set()
+        for cal_id in calendar_ids:
+            calendar_events = _agenda_events(cal_id, start_date, end_date)
+            if calendar_events is not None:
+                calendar_timezone = _agenda.timezone(cal_id)
+            else:
+                calendar_events, calendar_timezone = _list_all_events(
+                    calendarId=cal_id,
+                    timeMin=start_date,
+                    timeMax=end_date,
+                    singleEvents=True,
+                    orderBy='startTime'
+                )
+            for event in calendar_events:
+                start = event.get('start', {})
+                key = (event.get('iCalUID') or event.get('id'), start.get('dateTime') or start.get('date'))
+                if key in seen:
+                    continue
+                seen.add(key)
+                events.append(event)
+                interval = calendar_scheduling.event_interval(
+                    event, calendar_timezone, include_all_day, item=(event, cal_id)
+                )
+                if interval:
+                    intervals.append(interval)
 
         if not events:
             return {
@@ -923,64 +1296,37 @@ def calendar_conflicts_detector(days_ahead: int = 7, calendar_id: str = 'primary
                 "back_to_back": []
             }
 
-        conflicts = []
-        back_to_back = []
-
-        # Check for overlapping events
-        for i in range(len(events)):
-            event1 = events[i]
-
-            # Skip all-day events
-            if 'dateTime' not in event1['start']:
-                continue
-
-            event1_start = datetime.fromisoformat(event1['start']['dateTime'].replace('Z', '+00:00'))
-            event1_end = datetime.fromisoformat(event1['end']['dateTime'].replace('Z', '+00:00'))
-
-            for j in range(i + 1, len(events)):
-                event2 = events[j]
-
-                # Skip all-day events
-                if 'dateTime' not in event2['start']:
-                    continue
-
-                event2_start = datetime.fromisoformat(event2['start']['dateTime'].replace('Z', '+00:00'))
-                event2_end = datetime.fromisoformat(event2['end']['dateTime'].replace('Z', '+00:00'))
-
-                # Check for overlap
-                if event1_start < event2_end and event2_start < event1_end:
-                    conflicts.append({
-                        "event1": {
-                            "title": event1.get('summary', 'No title'),
-                            "start": event1['start']['dateTime'],
-                            "end": event1['end']['dateTime']
-                        },
-                        "event2": {
-                            "title": event2.get('summary', 'No title'),
-                            "start": event2['start']['dateTime'],
-                            "end": event2['end']['dateTime']
-                        },
-                        "type": "overlap"
-                    })
-
-                # Check for back-to-back (no buffer)
-                if event1_end == event2_start:
-                    back_to_back.append({
-                        "event1": event1.get('summary', 'No title'),
-                        "event2": event2.get('summary', 'No title'),
-                        "time": event1_end.strftime('%Y-%m-%d %H:%M'),
-                        "suggestion": "Consider adding 5-10 min buffer for breaks"
-                    })
-
-        # Calculate total meeting hours
-        total_duration = timedelta(0)
-        for event in events:
-            if 'dateTime' in event['start']:
-                start = datetime.fromisoformat(event['start']['dateTime'].replace('Z', '+00:00'))
-                end = datetime.fromisoformat(event['end']['dateTime'].replace('Z', '+00:00'))
-                total_duration += (end - start)
+        def describe(entry):
+            event, cal_id = entry
+            described = {
+                "title": event.get('summary', 'No title'),
+                "start": event['start'].get('dateTime') or event['start'].get('date'),
+                "end": event['end'].get('dateTime') or event['end'].get('date')
+            }
+            if len(calendar_ids) > 1:
+                described["calendar"] = cal_id
+            return described
+
+        overlaps, adjacent = calendar_scheduling.find_conflicts(intervals)
+        conflicts = [
+            {"event1": describe(first), "event2": describe(second), "type": "overlap"}
+            for first, second in overlaps
+        ]
+        back_to_back = [
+            {
+                "event1": first[0].get('summary', 'No title'),
+                "event2": second[0].get('summary', 'No title'),
+                "time": describe(second)["start"].replace('T', ' ')[:16],
+                "suggestion": "Consider adding 5-10 min buffer for breaks"
+            }
+            for first, second in adjacent
+        ]
 
-        total_hours = total_duration.total_seconds() / 3600
+        # Calculate total meeting hours (timed events only)
+        total_seconds = sum(
+            end - start for start, end, (event, _) in intervals if 'dateTime' in event['start']
+        )
+        total_hours = total_seconds / 3600
 
         return {
             "period": f"Next {days_ahead} days",
@@ -1000,6 +1346,32 @@ def calendar_conflicts_detector(days_ahead: int = 7, calendar_id: str = 'primary
         traceback.print_exc()
         return {"error": str(e)}
 
+@mcp.tool("aubrey_server_stats")
+def server_stats():
+    """
+    Report Google API rate limiting counters for this server
+
+    Returns:
+        Calls, throttled time, retries and 429/5xx counts per Google API, how many
+        event listings were coalesced with an identical query in flight, access
+        token refreshes, Google API clients built (one per worker thread),
+        transcript cache hit rate and size, background pre-transcription
+        progress, and how many calendar reads the agenda view answered
+    """
+    return {
+        "rate_limiter": google_rate_limit.stats(),
+        "events_list_coalescing": _events_list_flight.stats(),
+        "access_token": token_provider.stats() if token_provider else {"has_token": False},
+        "google_services_built": _service_stats['built'],
+        "transcript_cache": _transcript_cache.stats(),
+        "pretranscriber": _pretranscriber.stats() if _pretranscriber else {"running": False},
+        "agenda_view": _agenda.stats() if _agenda else {"enabled": False}
+    }
+
 if __name__ == "__main__":
+    if _pretranscriber:
+        _pretranscriber.start()
+    if _agenda:
+        _agenda.start()
     mcp.run(transport="streamable-http")
 
@@ -0,0 +1,300 @@
+"""
+Access-token provider shared by both servers.
+
+The provider keeps the current Google access token together with its expiry
+and refreshes it in a background thread a few minutes *before* it expires, so
+tool calls just read a valid token and never wait on Google's token endpoint.
+Only when no valid token exists (first call, or every background attempt
+failed) does a caller block, and then concurrent callers share a single
+refresh instead of each starting their own.
+
+Where the tokens come from is pluggable:
+- RefreshTokenSource: OAuth refresh-token grant against a token endpoint
+- CredentialsSource: a google.oauth2 Credentials object (e.g. from token.pkl)
+- StaticTokenSource: a fixed ACCESS_TOKEN, never refreshed
+
+    provider = provider_from_env()
+    token = provider.get_token()               # threads / sync code
+    token = await provider.get_token_async()   # asyncio code
+"""
+import asyncio
+import hashlib
+import os
+import threading
+from datetime import datetime, timedelta, timezone
+
+import httpx
+
+GOOGLE_TOKEN_URI = "https://oauth2.googleapis.com/token"
+
+# Refresh this many seconds before the token expires
+REFRESH_MARGIN = float(os.getenv("GOOGLE_TOKEN_REFRESH_MARGIN", "300"))
+# A token this close to expiry is no longer handed out
+EXPIRY_SKEW = 10
+# Wait between background attempts after a failed refresh
+REFRESH_RETRY_DELAY = 30
+
+
+def _identity(secret: str):
+    # Stable, non-reversible name for whoever the tokens belong to
+    return hashlib.sha256((secret or "").encode()).hexdigest()[:12]
+
+
+class StaticTokenSource:
+    """A fixed access token (the ACCESS_TOKEN env var); it never expires as far as we know"""
+
+    # There is nothing to fetch a new token from, so no background refresher
+    can_refresh = False
+
+    def __init__(self, token: str):
+        self.token = token
+        self.identity = _identity(token)
+
+    def fetch(self):
+        if not self.token:
+            raise ValueError("No Google access token configured: set ACCESS_TOKEN or GOOGLE_REFRESH_TOKEN")
+        return self.token, None
+
+
+class RefreshTokenSource:
+    """Exchange a long-lived refresh token for access tokens at an OAuth token endpoint"""
+
+    can_refresh = True
+
+    def __init__(self, client_id: str, client_secret: str, refresh_token: str,
+                 token_uri: str = GOOGLE_TOKEN_URI, timeout: float = 10):
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.refresh_token = refresh_token
+        self.token_uri = token_uri
+        self.timeout = timeout
+        self.identity = _identity(refresh_token)
+
+    def fetch(self):
+        response = httpx.post(
+            self.token_uri,
+            data={
+                "grant_type": "refresh_token",
+                "client_id": self.client_id,
+                "client_secret": self.client_secret,
+                "refresh_token": self.refresh_token
+            },
+            timeout=self.timeout
+        )
+        response.raise_for_status()
+        payload = response.json()
+        expiry = datetime.now(timezone.utc) + timedelta(seconds=int(payload.get("expires_in", 3600)))
+        return payload["access_token"], expiry
+
+
+class CredentialsSource:
+    """Refresh a google.oauth2 Credentials object in place
+
+    Refreshing the same object that googleapiclient services were built with
+    keeps it valid, so the services never refresh it themselves mid-request.
+    """
+
+    def __init__(self, credentials):
+        from google.auth.transport.requests import Request
+
+        self.credentials = credentials
+        self._request = Request()
+        self.identity = _identity(getattr(credentials, "refresh_token", None) or credentials.token)
+        # Credentials without a refresh token can only be used until they expire
+        self.can_refresh = bool(getattr(credentials, "refresh_token", None))
+
+    def fetch(self):
+        self.credentials.refresh(self._request)
+        return self.credentials.token, _aware(self.credentials.expiry)
+
+
+def _aware(expiry):
+    # google-auth stores expiry as a naive UTC datetime
+    if expiry is not None and expiry.tzinfo is None:
+        expiry = expiry.replace(tzinfo=timezone.utc)
+    return expiry
+
+
+class AccessTokenProvider:
+    """Hand out valid access tokens, refreshing ahead of expiry in the background"""
+
+    def __init__(self, source, token: str = None, expiry: datetime = None,
+                 refresh_margin: float = REFRESH_MARGIN, on_refresh=None):
+        """
+        Args:
+            source: object with fetch() -> (token, expiry or None), an identity
+                attribute and optionally can_refresh (False: fetch() can never
+                produce a new token, so no background refresher is started)
+            token, expiry: an already valid token to start with (optional)
+            refresh_margin: seconds before expiry at which the background refresh runs
+            on_refresh: called with no arguments after every successful refresh
+        """
+        self._source = source
+        self._token = token
+        self._expiry = _aware(expiry)
+        self._refresh_margin = refresh_margin
+        self._on_refresh = on_refresh
+        self._condition = threading.Condition()
+        self._refreshing = False
+        self._last_error = None
+        self._stopped = threading.Event()
+        self._thread = None
+        self.refreshes = 0
+        self.refresh_failures = 0
+        self.blocking_refreshes = 0  # refreshes a caller had to wait for
+
+    @property
+    def identity(self):
+        """Stable id for the token owner (for per-user rate limiting)"""
+        return self._source.identity
+
+    def _valid_token(self):
+        if self._token is None:
+            return None
+        if self._expiry is not None and datetime.now(timezone.utc) >= self._expiry - timedelta(seconds=EXPIRY_SKEW):
+            return None
+        return self._token
+
+    def _seconds_until_refresh(self):
+        if self._token is None:
+            return 0
+        if self._expiry is None:
+            return None  # Nothing to refresh ahead of
+        remaining = (self._expiry - datetime.now(timezone.utc)).total_seconds()
+        return max(0.0, remaining - self._refresh_margin)
+
+    def get_token(self):
+        """Return a valid access token, waiting for a refresh only if there is none"""
+        self.start()
+        with self._condition:
+            token = self._valid_token()
+            if token is None:
+                self.blocking_refreshes += 1
+        if token is not None:
+            return token
+        return self._refresh()
+
+    async def get_token_async(self):
+        """Same as get_token; only hops to a thread when it actually has to wait"""
+        self.start()
+        with self._condition:
+            token = self._valid_token()
+        if token is not None:
+            return token
+        return await asyncio.to_thread(self.get_token)
+
+    def invalidate(self, token: str):
+        """Drop token (e.g. Google answered 401) so the next caller refreshes"""
+        with self._condition:
+            if self._token == token:
+                self._token = None
+        self._wake()
+
+    def _refresh(self):
+        """Fetch a new token, sharing the fetch with anyone already doing it"""
+        with self._condition:
+            if self._refreshing:
+                while self._refreshing:
+                    self._condition.wait()
+                token = self._valid_token()
+                if token is None:
+                    raise self._last_error or RuntimeError("Access token refresh failed")
+                return token
+            # Someone else may have refreshed while we were getting here
+            token = self._valid_token()
+            if token is not None and self._seconds_until_refresh() != 0:
+                return token
+            self._refreshing = True
+
+        try:
+            token, expiry = self._source.fetch()
+        except Exception as e:
+            with self._condition:
+                self._refreshing = False
+                self._last_error = e
+                self.refresh_failures += 1
+                self._condition.notify_all()
+            raise
+
+        with self._condition:
+            self._token = token
+            self._expiry = _aware(expiry)
+            self._refreshing = False
+            self._last_error = None
+            self.refreshes += 1
+            self._condition.notify_all()
+        if self._on_refresh:
+            self._on_refresh()
+        return token
+
+    def start(self):
+        """Start the background refresher (idempotent)
+
+        Not started for sources that can't refresh: the thread would only fail
+        and retry forever. Callers still get fetch()'s error when there is no
+        valid token.
+        """
+        if self._thread is not None or not getattr(self._source, "can_refresh", True):
+            return
+        with self._condition:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="google-token-refresh", daemon=True)
+                self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        self._wake()
+
+    def _wake(self):
+        with self._condition:
+            self._condition.notify_all()
+
+    def _run(self):
+        while not self._stopped.is_set():
+            with self._condition:
+                delay = self._seconds_until_refresh()
+                if delay is None or delay > 0:
+                    # Sleep until refresh time; invalidate()/stop() wake us early
+                    self._condition.wait(delay)
+                    continue
+            try:
+                self._refresh()
+            except Exception as e:
+                # Keep serving the old token while it lasts and try again shortly
+                print(f"Background access token refresh failed: {e}")
+                self._stopped.wait(REFRESH_RETRY_DELAY)
+
+    def stats(self):
+        with self._condition:
+            expires_in = None
+            if self._expiry is not None:
+                expires_in = round((self._expiry - datetime.now(timezone.utc)).total_seconds())
+            return {
+                "has_token": self._token is not None,
+                "expires_in_seconds": expires_in,
+                "refreshes": self.refreshes,
+                "refresh_failures": self.refresh_failures,
+                "blocking_refreshes": self.blocking_refreshes
+            }
+
+
+def provider_from_env():
+    """Build a provider from environment variables
+
+    With GOOGLE_REFRESH_TOKEN, GOOGLE_CLIENT_ID and GOOGLE_CLIENT_SECRET set
+    (and optionally GOOGLE_TOKEN_URI), access tokens are minted and refreshed
+    automatically. Otherwise the static ACCESS_TOKEN is used as before.
+    """
+    refresh_token = os.getenv("GOOGLE_REFRESH_TOKEN")
+    client_id = os.getenv("GOOGLE_CLIENT_ID")
+    client_secret = os.getenv("GOOGLE_CLIENT_SECRET")
+    if refresh_token and client_id and client_secret:
+        source = RefreshTokenSource(
+            client_id,
+            client_secret,
+            refresh_token,
+            token_uri=os.getenv("GOOGLE_TOKEN_URI", GOOGLE_TOKEN_URI)
+        )
+        return AccessTokenProvider(source)
+    access_token = os.getenv("ACCESS_TOKEN")
+    return AccessTokenProvider(StaticTokenSource(access_token), token=access_token)
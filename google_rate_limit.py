@@ -0,0 +1,273 @@
+"""
+Client-side rate limiting and retries for Google API calls.
+
+Every call to Google first takes a token from a bucket kept per (API, user).
+Buckets refill at a steady rate up to a burst size, so a burst of tool calls
+is smoothed out locally instead of tripping Google's quota. When Google still
+answers 429 (or 403 rateLimitExceeded) the call is retried with jittered
+exponential backoff, honouring Retry-After when Google sends it. A transient
+5xx is only retried for idempotent methods (GET, PUT, DELETE): a POST whose
+response was lost may already have created the event, and sending it again
+would create a duplicate. Callers that know better pass retry_server_errors.
+
+Used by both servers:
+- httpx (simple_calendar.py):  response = await call_async("calendar", send)
+- googleapiclient (cooking.py): result = execute(request, "calendar")
+
+Settings can be tuned through environment variables:
+- GOOGLE_API_RATE_PER_SECOND: steady-state calls per second per API and user
+- GOOGLE_API_BURST: calls allowed back-to-back before the rate applies
+- GOOGLE_API_MAX_RETRIES: retries after a throttled or failed call
+- GOOGLE_API_BACKOFF_BASE / GOOGLE_API_BACKOFF_MAX: backoff range in seconds
+"""
+import asyncio
+import os
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+import tool_metrics
+
+RATE_PER_SECOND = float(os.getenv("GOOGLE_API_RATE_PER_SECOND", "10"))
+BURST = int(os.getenv("GOOGLE_API_BURST", "20"))
+MAX_RETRIES = int(os.getenv("GOOGLE_API_MAX_RETRIES", "5"))
+BACKOFF_BASE = float(os.getenv("GOOGLE_API_BACKOFF_BASE", "0.5"))
+BACKOFF_MAX = float(os.getenv("GOOGLE_API_BACKOFF_MAX", "32"))
+
+# 429 = rate limited; 5xx = transient server trouble worth another try
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+# Sending these twice has the same effect as sending them once
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket
+
+    reserve() always takes a token, letting the balance go negative, and
+    returns how long the caller has to wait before using it. Callers therefore
+    queue up in arrival order, and the same bucket serves both threads
+    (googleapiclient) and coroutines (httpx).
+    """
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self, tokens: int = 1):
+        """Take tokens; return the seconds to wait before the call may be sent"""
+        with self._lock:
+            self._refill()
+            self._tokens -= tokens
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    def pause(self, seconds: float):
+        """Hold back every caller for at least seconds (Google sent Retry-After)"""
+        with self._lock:
+            self._refill()
+            self._tokens = min(self._tokens, -seconds * self.rate)
+
+
+class RateLimitStats:
+    """Counters for one (API, user) pair, updated from the event loop and the tool threads"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.throttled_calls = 0       # calls that had to wait for a token
+        self.throttled_seconds = 0.0   # total time spent waiting for tokens
+        self.retries = 0
+        self.backoff_seconds = 0.0     # total time spent sleeping before retries
+        self.rate_limited_responses = 0
+        self.server_errors = 0
+
+    def count(self, counter: str, amount=1):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + amount)
+
+    def as_dict(self):
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "throttled_calls": self.throttled_calls,
+                "throttled_seconds": round(self.throttled_seconds, 3),
+                "retries": self.retries,
+                "backoff_seconds": round(self.backoff_seconds, 3),
+                "rate_limited_responses": self.rate_limited_responses,
+                "server_errors": self.server_errors
+            }
+
+
+_buckets = {}
+_stats = {}
+_registry_lock = threading.Lock()
+
+
+def _limiter(api: str, user: str):
+    key = (api, user)
+    with _registry_lock:
+        if key not in _buckets:
+            _buckets[key] = TokenBucket(RATE_PER_SECOND, BURST)
+            _stats[key] = RateLimitStats()
+        return _buckets[key], _stats[key]
+
+
+def configure(rate_per_second: float = None, burst: int = None, max_retries: int = None,
+              backoff_base: float = None, backoff_max: float = None):
+    """Change the limiter settings at runtime; existing buckets and counters are dropped"""
+    global RATE_PER_SECOND, BURST, MAX_RETRIES, BACKOFF_BASE, BACKOFF_MAX
+    if rate_per_second is not None:
+        RATE_PER_SECOND = rate_per_second
+    if burst is not None:
+        BURST = burst
+    if max_retries is not None:
+        MAX_RETRIES = max_retries
+    if backoff_base is not None:
+        BACKOFF_BASE = backoff_base
+    if backoff_max is not None:
+        BACKOFF_MAX = backoff_max
+    with _registry_lock:
+        _buckets.clear()
+        _stats.clear()
+
+
+def stats():
+    """Counters for every (API, user) pair seen so far"""
+    with _registry_lock:
+        return {f"{api}:{user}": entry.as_dict() for (api, user), entry in _stats.items()}
+
+
+def parse_retry_after(value):
+    """Retry-After is either a number of seconds or an HTTP date"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_delay(attempt: int, retry_after: float = None):
+    """Full-jitter exponential backoff, but never sooner than Retry-After"""
+    delay = random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+    if retry_after is not None:
+        delay = max(delay, retry_after)
+    return delay
+
+
+def is_rate_limited(status, body_text: str = ""):
+    """True for a response saying the call was throttled (and so never run)"""
+    # Calendar and Drive report some quota errors as 403 instead of 429
+    # (reasons rateLimitExceeded and userRateLimitExceeded)
+    if status == 403:
+        return "ratelimitexceeded" in body_text.lower()
+    return status == 429
+
+
+def _is_retryable(status, body_text: str = "", retry_server_errors: bool = True):
+    if status in (403, 429):
+        return is_rate_limited(status, body_text)
+    # A throttled call was never run; a 5xx one may have been
+    return retry_server_errors and status in RETRYABLE_STATUSES
+
+
+def _record_failure(bucket, entry, status, attempt, retry_after):
+    if status in (403, 429):
+        entry.count("rate_limited_responses")
+        if retry_after:
+            bucket.pause(retry_after)
+    else:
+        entry.count("server_errors")
+    delay = backoff_delay(attempt, retry_after)
+    entry.count("retries")
+    entry.count("backoff_seconds", delay)
+    return delay
+
+
+def _wait_for_token(bucket, entry, cost: int = 1):
+    wait = bucket.reserve(cost)
+    entry.count("calls")
+    if wait > 0:
+        entry.count("throttled_calls")
+        entry.count("throttled_seconds", wait)
+    return wait
+
+
+async def call_async(api: str, send, user: str = "default", cost: int = 1, retry_server_errors: bool = None):
+    """Rate-limit and retry an httpx call
+
+    send is a zero-argument function returning a new request coroutine each
+    time, e.g. lambda: client.get(url). cost is the number of API calls the
+    request counts as (a batch request counts every call inside it).
+    retry_server_errors decides whether a 5xx is retried; by default only
+    idempotent methods are. Returns the final httpx.Response; raising for
+    error statuses is left to the caller.
+    """
+    bucket, entry = _limiter(api, user)
+    for attempt in range(MAX_RETRIES + 1):
+        wait = _wait_for_token(bucket, entry, cost)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+        with tool_metrics.upstream_call(api) as call:
+            response = await send()
+            call.failed = response.status_code >= 400
+        status = response.status_code
+        # Only read the body when it can decide whether to retry
+        body_text = response.text if status == 403 else ""
+        retry_5xx = retry_server_errors
+        if retry_5xx is None:
+            retry_5xx = response.request.method in IDEMPOTENT_METHODS
+        if attempt == MAX_RETRIES or not _is_retryable(status, body_text, retry_5xx):
+            return response
+
+        retry_after = parse_retry_after(response.headers.get("Retry-After"))
+        delay = _record_failure(bucket, entry, status, attempt, retry_after)
+        print(f"Google {api} API returned {status}, retrying in {delay:.1f}s")
+        await asyncio.sleep(delay)
+
+
+def execute(request, api: str, user: str = "default", retry_server_errors: bool = None, **kwargs):
+    """Rate-limit and retry a googleapiclient request's .execute()
+
+    As with call_async, a 5xx is only retried for idempotent methods unless
+    retry_server_errors says otherwise.
+    """
+    bucket, entry = _limiter(api, user)
+    if retry_server_errors is None:
+        retry_server_errors = getattr(request, "method", "GET").upper() in IDEMPOTENT_METHODS
+    for attempt in range(MAX_RETRIES + 1):
+        wait = _wait_for_token(bucket, entry)
+        if wait > 0:
+            time.sleep(wait)
+
+        try:
+            with tool_metrics.upstream_call(api):
+                return request.execute(**kwargs)
+        except Exception as e:
+            # googleapiclient.errors.HttpError carries the response as e.resp
+            response = getattr(e, "resp", None)
+            status = getattr(response, "status", None)
+            body_text = getattr(e, "content", b"").decode("utf-8", errors="replace")
+            if attempt == MAX_RETRIES or not _is_retryable(status, body_text, retry_server_errors):
+                raise
+            retry_after = parse_retry_after(response.get("retry-after"))
+            delay = _record_failure(bucket, entry, status, attempt, retry_after)
+            print(f"Google {api} API returned {status}, retrying in {delay:.1f}s")
+            time.sleep(delay)
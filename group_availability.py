@@ -0,0 +1,147 @@
+"""
+Group availability over minute-resolution busy bitmaps.
+
+Every attendee's busy blocks are rasterized into one row of a boolean matrix
+(attendees x minutes in the search window). "When are at least K of N free
+for the whole meeting" then becomes column-wise NumPy operations instead of
+Python loops over people and intervals: per-attendee prefix sums over the
+bitmap make checking every candidate start for every attendee one
+subtraction. "Everyone free" is the same question with K = N.
+
+    busy = busy_bitmap(busy_by_attendee, window_start, window_end)
+    allowed = working_minutes(window_start, window_end, "Europe/Berlin")
+    slots = quorum_slots(busy, allowed, duration_minutes=60, quorum=35)
+
+A 30-day window is 43,200 minutes, so 500 attendees take about 21 MB.
+"""
+import math
+from datetime import datetime, time, timedelta
+from zoneinfo import ZoneInfo
+
+import numpy as np
+
+# Attendees processed at once in quorum_slots; bounds its working memory to a
+# few bytes per minute for ROW_CHUNK attendees
+ROW_CHUNK = 64
+
+
+def busy_bitmap(busy_by_attendee, window_start: float, window_end: float):
+    """Rasterize busy intervals into an (attendees x minutes) boolean matrix
+
+    busy_by_attendee is a list with one list of (start, end) timestamps per
+    attendee. Minute m covers window_start + 60*m; partly busy minutes count
+    as busy.
+    """
+    minutes = int(np.ceil((window_end - window_start) / 60))
+    rows, starts, ends = [], [], []
+    for row, intervals in enumerate(busy_by_attendee):
+        for start, end in intervals:
+            rows.append(row)
+            starts.append(start)
+            ends.append(end)
+
+    # Difference array: +1 where a busy block starts, -1 where it ends; a
+    # running sum along each row is then > 0 exactly on busy minutes
+    counts = np.zeros((len(busy_by_attendee), minutes + 1), dtype=np.int16)
+    if rows:
+        rows = np.asarray(rows)
+        first = np.clip(np.floor((np.asarray(starts) - window_start) / 60), 0, minutes).astype(np.int64)
+        last = np.clip(np.ceil((np.asarray(ends) - window_start) / 60), 0, minutes).astype(np.int64)
+        keep = first < last
+        np.add.at(counts, (rows[keep], first[keep]), 1)
+        np.add.at(counts, (rows[keep], last[keep]), -1)
+    np.cumsum(counts, axis=1, out=counts)
+    return counts[:, :minutes] > 0
+
+
+def working_minutes(window_start: float, window_end: float, timezone_name: str = "UTC",
+                    day_start: time = time(9), day_end: time = time(17), weekdays=(0, 1, 2, 3, 4)):
+    """Boolean mask of the window's minutes that fall inside working hours in timezone_name"""
+    minutes = int(np.ceil((window_end - window_start) / 60))
+    allowed = np.zeros(minutes, dtype=bool)
+    tz = ZoneInfo(timezone_name or "UTC")
+    day = datetime.fromtimestamp(window_start, tz).date()
+    while True:
+        opens = datetime.combine(day, day_start, tzinfo=tz).timestamp()
+        if opens >= window_end:
+            break
+        if day.weekday() in weekdays:
+            closes = datetime.combine(day, day_end, tzinfo=tz).timestamp()
+            first = max(int(np.ceil((opens - window_start) / 60)), 0)
+            last = min(int((closes - window_start) // 60), minutes)
+            if first < last:
+                allowed[first:last] = True
+        day += timedelta(days=1)
+    return allowed
+
+
+def quorum_slots(busy, allowed, duration_minutes: int, quorum: int = None, required=None,
+                 granularity: int = 30, max_slots: int = 5):
+    """Best meeting slots where at least quorum attendees are free for the whole slot
+
+    Args:
+        busy: (attendees x minutes) matrix from busy_bitmap
+        allowed: Minutes a slot may cover (see working_minutes)
+        quorum: Minimum number of attendees free for the whole slot
+            (default: everyone)
+        required: Row indexes of attendees who must be free
+        granularity: Slots start on multiples of this many minutes
+        max_slots: How many slots to return
+
+    Returns:
+        List of (start minute, attendees free) pairs, most attendees first and
+        earliest first among equals; returned slots don't overlap each other.
+    """
+    attendees, minutes = busy.shape
+    quorum = attendees if quorum is None else quorum
+
+    # Work in blocks of gcd(duration, granularity) minutes: every candidate slot
+    # is then a whole number of blocks, and an hour-long slot on a 30-minute
+    # grid checks 2 blocks per attendee instead of 60 minutes
+    block = math.gcd(duration_minutes, granularity)
+    blocks = minutes // block
+    span = duration_minutes // block
+    candidates = np.arange(0, blocks - span + 1, granularity // block)
+
+    # A slot must lie entirely inside working hours
+    allowed_before = np.concatenate(([0], np.cumsum(allowed, dtype=np.int32)))
+    starts = candidates * block
+    candidates = candidates[allowed_before[starts + duration_minutes] - allowed_before[starts] == duration_minutes]
+    if candidates.size == 0:
+        return []
+
+    # Count, per candidate, the attendees with no busy minute in the slot
+    free_count = np.zeros(candidates.size, dtype=np.int32)
+    required_free = np.ones(candidates.size, dtype=bool)
+    required = set(required or ())
+    for first_row in range(0, attendees, ROW_CHUNK):
+        rows = busy[first_row:first_row + ROW_CHUNK, :blocks * block]
+        busy_blocks = rows.reshape(rows.shape[0], blocks, block).any(axis=2)
+        # Running count of busy blocks. uint16 may wrap around on long windows,
+        # but the difference across one slot is still exact in modular
+        # arithmetic, and that is all that gets compared
+        busy_before = np.zeros((rows.shape[0], blocks + 1), dtype=np.uint16)
+        np.cumsum(busy_blocks, axis=1, dtype=np.uint16, out=busy_before[:, 1:])
+        free = busy_before[:, candidates + span] == busy_before[:, candidates]
+        free_count += free.sum(axis=0, dtype=np.int32)
+        for row in required:
+            if first_row <= row < first_row + rows.shape[0]:
+                required_free &= free[row - first_row]
+
+    eligible = np.flatnonzero(required_free & (free_count >= quorum))
+    # Most attendees free first, then earliest
+    order = eligible[np.lexsort((candidates[eligible], -free_count[eligible]))]
+
+    slots = []
+    for index in order.tolist():
+        start = int(candidates[index]) * block
+        if all(start + duration_minutes <= other or other + duration_minutes <= start for other, _ in slots):
+            slots.append((start, int(free_count[index])))
+            if len(slots) == max_slots:
+                break
+    return slots
+
+
+def busy_attendees(busy, start_minute: int, duration_minutes: int):
+    """Row indexes of attendees with a busy minute in the slot"""
+    return np.flatnonzero(busy[:, start_minute:start_minute + duration_minutes].any(axis=1)).tolist()
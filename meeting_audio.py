@@ -0,0 +1,285 @@
+"""
+Streaming decode of meeting recordings stored in Google Drive.
+
+Nothing is written to disk and memory use doesn't grow with the recording:
+
+    Drive --chunks--> ffmpeg stdin   (download thread)
+    ffmpeg stdout --16 kHz mono PCM--> split_at_silence --> segments
+
+Segments are at most SEGMENT_SECONDS long, which keeps each one inside what a
+single Speech-to-Text stream accepts (about 5 minutes). Cuts are placed at the
+quietest moment near the end of each segment, so words are rarely split, and
+each segment repeats the last OVERLAP_SECONDS of the previous one in case a
+cut lands mid-word anyway (see transcription.stitch for removing the repeat).
+
+The one exception to streaming is an MP4 whose index (the "moov" box) comes
+after the media data: ffmpeg has to seek to the end to read such a file,
+which a pipe can't do, so those recordings are spooled to a temporary file
+first (ffmpeg's output is still streamed).
+
+    pcm = decode_drive_file(drive_service, file_id, "video/mp4")
+    for segment in split_at_silence(pcm):
+        segment.index, segment.start_seconds, segment.pcm
+"""
+import os
+import shutil
+import struct
+import subprocess
+import tempfile
+import threading
+from typing import NamedTuple
+
+import numpy as np
+
+SAMPLE_RATE = 16000
+BYTES_PER_SECOND = SAMPLE_RATE * 2  # 16-bit mono
+
+# Streaming recognition rejects streams longer than about 305 seconds
+SEGMENT_SECONDS = int(os.getenv("MEETING_AUDIO_SEGMENT_SECONDS", "280"))
+
+# How far back from the maximum length to look for a quiet place to cut
+SILENCE_SEARCH_SECONDS = 30
+
+# Audio repeated at the start of the next segment
+OVERLAP_SECONDS = 1.0
+
+# Energy is measured over 20 ms frames, averaged over 200 ms to find pauses
+# rather than single quiet frames inside a word
+FRAME_BYTES = BYTES_PER_SECOND // 50
+PAUSE_FRAMES = 10
+
+# PCM read from ffmpeg at a time
+READ_BYTES = 10 * BYTES_PER_SECOND
+
+# Bytes per Drive download request; MediaIoBaseDownload defaults to 100 MB
+DOWNLOAD_CHUNK_SIZE = 4 * 1024 * 1024
+
+# Last bytes of ffmpeg's error output kept for the error message
+STDERR_TAIL_BYTES = 16 * 1024
+
+_MP4_TYPES = ("video/mp4", "audio/mp4", "video/quicktime", "audio/x-m4a")
+
+
+class FFmpegNotFound(RuntimeError):
+    pass
+
+
+class AudioExtractionError(RuntimeError):
+    pass
+
+
+def ffmpeg_command(source: str = "pipe:0"):
+    """ffmpeg arguments that decode source to raw 16 kHz mono PCM on stdout"""
+    command = ["ffmpeg", "-hide_banner", "-loglevel", "error"]
+    if source != "pipe:0":
+        command.append("-nostdin")
+    return command + [
+        "-i", source,
+        "-vn",  # No video
+        "-acodec", "pcm_s16le",  # Linear PCM 16-bit
+        "-ar", str(SAMPLE_RATE),  # 16kHz sample rate
+        "-ac", "1",  # Mono
+        "-f", "s16le", "pipe:1"
+    ]
+
+
+def needs_seek(head: bytes):
+    """True if head starts an MP4 whose media data comes before its moov index
+
+    Walks the top-level boxes in head. Files that aren't MP4, or whose layout
+    can't be told from head alone, are assumed to stream fine.
+    """
+    offset = 0
+    while offset + 8 <= len(head):
+        size, kind = struct.unpack(">I4s", head[offset:offset + 8])
+        if kind == b"moov":
+            return False
+        if kind == b"mdat":
+            return True
+        if size == 1:  # 64-bit size follows the type
+            if offset + 16 > len(head):
+                return False
+            size = struct.unpack(">Q", head[offset + 8:offset + 16])[0]
+        if size < 8:
+            return False
+        offset += size
+    return False
+
+
+class _Sink:
+    """What MediaIoBaseDownload writes to: memory at first, then target once it is set"""
+
+    def __init__(self):
+        self.head = []
+        self.target = None
+        self.bytes = 0
+
+    def write(self, data):
+        self.bytes += len(data)
+        if self.target is None:
+            self.head.append(data)
+        else:
+            self.target.write(data)
+
+
+class _Download:
+    """A Drive file downloaded chunk by chunk"""
+
+    def __init__(self, drive_service, file_id, chunk_size=DOWNLOAD_CHUNK_SIZE):
+        # Imported here so the server starts without loading googleapiclient
+        from googleapiclient.http import MediaIoBaseDownload
+
+        self.sink = _Sink()
+        request = drive_service.files().get_media(fileId=file_id)
+        self.downloader = MediaIoBaseDownload(self.sink, request, chunksize=chunk_size)
+        self.done = False
+
+    def first_chunk(self):
+        """Download the first chunk into memory, to look at the file's layout"""
+        _, self.done = self.downloader.next_chunk()
+        return b"".join(self.sink.head)
+
+    def copy_rest(self, fd):
+        """Download the remaining chunks into fd"""
+        self.sink.target = fd
+        while not self.done:
+            _, self.done = self.downloader.next_chunk()
+
+
+def _feed_stdin(process, download, head, errors):
+    # Runs in its own thread so ffmpeg's stdout can be drained meanwhile;
+    # otherwise both pipes fill up and the two processes wait on each other
+    try:
+        process.stdin.write(head)
+        download.copy_rest(process.stdin)
+    except BrokenPipeError:
+        pass  # ffmpeg exited early; its exit status tells why
+    except Exception as e:
+        errors.append(e)
+    finally:
+        try:
+            process.stdin.close()
+        except BrokenPipeError:
+            pass
+
+
+def _drain_stderr(stream, tail: bytearray):
+    # Runs in its own thread for the same reason: a damaged file can make
+    # ffmpeg log more than the stderr pipe holds, and it would then block
+    # writing its log while we wait for its output. Only the end is kept.
+    for chunk in iter(lambda: stream.read(4096), b""):
+        tail += chunk
+        del tail[:-STDERR_TAIL_BYTES]
+
+
+class Segment(NamedTuple):
+    index: int
+    start_seconds: float
+    pcm: bytes
+
+
+def _quietest_cut(buffer, low: int, high: int):
+    """Byte offset between low and high at the middle of the quietest pause"""
+    low -= low % FRAME_BYTES
+    frames = (high - low) // FRAME_BYTES
+    if frames < PAUSE_FRAMES:
+        return high
+    # Copy the window: a NumPy view would stop the bytearray from being resized
+    samples = np.frombuffer(bytes(buffer[low:low + frames * FRAME_BYTES]), dtype=np.int16)
+    energy = np.square(samples.reshape(frames, -1).astype(np.float32)).mean(axis=1)
+    pauses = np.convolve(energy, np.ones(PAUSE_FRAMES) / PAUSE_FRAMES, mode="valid")
+    quietest = int(np.argmin(pauses)) + PAUSE_FRAMES // 2
+    return low + quietest * FRAME_BYTES
+
+
+def split_at_silence(pcm_chunks, max_seconds: float = None, search_seconds: float = SILENCE_SEARCH_SECONDS,
+                     overlap_seconds: float = OVERLAP_SECONDS):
+    """Cut a stream of PCM chunks into Segments of at most max_seconds
+
+    Each cut is made at the quietest pause within search_seconds of the
+    maximum length, and the next segment starts overlap_seconds before it.
+    Only one segment's worth of audio is held at a time.
+    """
+    max_bytes = int((max_seconds or SEGMENT_SECONDS) * BYTES_PER_SECOND) // 2 * 2
+    search_bytes = min(int(search_seconds * BYTES_PER_SECOND), max_bytes // 2)
+    overlap_bytes = int(overlap_seconds * BYTES_PER_SECOND) // 2 * 2
+    buffer = bytearray()
+    offset = 0  # Position of buffer[0] in the whole stream, in bytes
+    index = 0
+    for chunk in pcm_chunks:
+        buffer += chunk
+        while len(buffer) >= max_bytes:
+            cut = _quietest_cut(buffer, max_bytes - search_bytes, max_bytes)
+            yield Segment(index, offset / BYTES_PER_SECOND, bytes(buffer[:cut]))
+            index += 1
+            keep_from = cut - overlap_bytes if cut > 2 * overlap_bytes else cut
+            del buffer[:keep_from]
+            offset += keep_from
+    # Whatever is left, unless it's only the overlap already sent
+    if len(buffer) > overlap_bytes or (index == 0 and buffer):
+        yield Segment(index, offset / BYTES_PER_SECOND, bytes(buffer))
+
+
+def decode_drive_file(drive_service, file_id: str, mime_type: str = "", chunk_size: int = DOWNLOAD_CHUNK_SIZE):
+    """Yield the recording's audio as chunks of 16 kHz mono 16-bit PCM
+
+    Raises FFmpegNotFound if ffmpeg isn't installed and AudioExtractionError if
+    it can't decode the file.
+    """
+    if shutil.which("ffmpeg") is None:
+        raise FFmpegNotFound("ffmpeg not installed")
+    download = _Download(drive_service, file_id, chunk_size)
+    head = download.first_chunk()
+
+    spool_path = None
+    process = None
+    feeder = None
+    stderr_reader = None
+    stderr_tail = bytearray()
+    errors = []
+    try:
+        if mime_type in _MP4_TYPES and needs_seek(head):
+            print("Recording isn't laid out for streaming; spooling it to a temporary file")
+            with tempfile.NamedTemporaryFile(delete=False, suffix=".mp4") as spool:
+                spool_path = spool.name
+                spool.write(head)
+                download.copy_rest(spool)
+            process = subprocess.Popen(ffmpeg_command(spool_path), stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        else:
+            process = subprocess.Popen(
+                ffmpeg_command(), stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE
+            )
+            feeder = threading.Thread(target=_feed_stdin, args=(process, download, head, errors), daemon=True)
+            feeder.start()
+        stderr_reader = threading.Thread(target=_drain_stderr, args=(process.stderr, stderr_tail), daemon=True)
+        stderr_reader.start()
+
+        while True:
+            pcm = process.stdout.read(READ_BYTES)
+            if not pcm:
+                break
+            yield pcm
+        process.wait()
+        if feeder:
+            feeder.join()
+        stderr_reader.join()
+        if errors:
+            raise errors[0]
+        if process.returncode != 0:
+            raise AudioExtractionError(f"ffmpeg failed: {stderr_tail.decode(errors='replace').strip()}")
+        print(f"Decoded {download.sink.bytes / (1024 * 1024):.1f} MB recording")
+    finally:
+        # Also reached when the caller stops early: stop ffmpeg, which makes
+        # the download thread's next write fail and end it
+        if process:
+            if process.poll() is None:
+                process.kill()
+                process.wait()
+            if stderr_reader:
+                stderr_reader.join()  # ffmpeg is gone, so stderr is at its end
+            process.stdout.close()
+            process.stderr.close()
+        if feeder:
+            feeder.join()
+        if spool_path:
+            os.unlink(spool_path)
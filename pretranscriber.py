@@ -0,0 +1,286 @@
+"""
+Background pre-transcription of new meeting recordings.
+
+Meet saves a recording to the "Meet Recordings" Drive folder shortly after a
+meeting ends. Rather than transcribing it when someone first asks for a
+summary (minutes of download, ffmpeg and Speech-to-Text on the request path),
+the Pretranscriber notices the new file and analyzes it in the background, so
+the summarizer finds it in the transcript cache.
+
+New files are found incrementally with the Drive changes feed: each poll asks
+only for what changed since the page token saved by the previous one. The
+token is kept in SQLite (next to the transcript cache by default), so a
+restart picks up where it left off instead of missing recordings or scanning
+the whole folder again. The very first poll starts from "now".
+
+Background work is kept small:
+- at most `workers` recordings are analyzed at once
+- before each one, the CpuBudget waits until the process (including finished
+  ffmpeg children) has used no more than `cpu_budget` of one core on average
+
+    scheduler = Pretranscriber(DriveChangesSource(get_drive_service), analyze, is_cached, folder_id)
+    scheduler.start()
+    ...
+    scheduler.stop()
+
+Anything with start_page_token() and changes(page_token) can replace
+DriveChangesSource, which is how the scheduler is exercised without Drive.
+"""
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+import meeting_audio
+from transcript_cache import TRANSCRIPT_CACHE_PATH, file_version
+
+PRETRANSCRIBE_RECORDINGS = os.getenv("PRETRANSCRIBE_RECORDINGS", "0") == "1"
+PRETRANSCRIBE_POLL_SECONDS = float(os.getenv("PRETRANSCRIBE_POLL_SECONDS", "60"))
+PRETRANSCRIBE_WORKERS = int(os.getenv("PRETRANSCRIBE_WORKERS", "1"))
+# Average share of one CPU core the process may be using when a background
+# transcription starts
+PRETRANSCRIBE_CPU_BUDGET = float(os.getenv("PRETRANSCRIBE_CPU_BUDGET", "0.5"))
+
+CHANGE_FIELDS = ("nextPageToken, newStartPageToken, "
+                 "changes(fileId, removed, file(id, name, mimeType, parents, trashed, "
+                 "createdTime, modifiedTime, md5Checksum))")
+
+
+class DriveChangesSource:
+    """The Drive changes feed
+
+    Args:
+        drive_service: Function returning the googleapiclient Drive v3
+            service, so the service can be created on first use
+        execute: Runs a request and returns its response, e.g. through the
+            shared rate limiter (default: request.execute())
+    """
+
+    def __init__(self, drive_service, execute=None):
+        self.drive_service = drive_service
+        self.execute = execute or (lambda request: request.execute())
+
+    def start_page_token(self):
+        return self.execute(self.drive_service().changes().getStartPageToken())["startPageToken"]
+
+    def changes(self, page_token: str):
+        """Files changed since page_token, and the token to continue from next time"""
+        files = []
+        while True:
+            response = self.execute(self.drive_service().changes().list(
+                pageToken=page_token, pageSize=1000, spaces="drive", fields=CHANGE_FIELDS
+            ))
+            files.extend(change["file"] for change in response.get("changes", [])
+                         if not change.get("removed") and change.get("file"))
+            if "newStartPageToken" in response:
+                return files, response["newStartPageToken"]
+            page_token = response["nextPageToken"]
+
+
+class PageTokenStore:
+    """Changes-feed page tokens saved in SQLite, by name"""
+
+    def __init__(self, path: str = TRANSCRIPT_CACHE_PATH):
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("CREATE TABLE IF NOT EXISTS page_tokens (name TEXT PRIMARY KEY, token TEXT NOT NULL)")
+        self._db.commit()
+
+    def get(self, name: str):
+        with self._lock:
+            row = self._db.execute("SELECT token FROM page_tokens WHERE name = ?", (name,)).fetchone()
+        return row[0] if row else None
+
+    def set(self, name: str, token: str):
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO page_tokens (name, token) VALUES (?, ?)", (name, token))
+            self._db.commit()
+
+
+def process_cpu_seconds():
+    """CPU time used by this process and its finished child processes (ffmpeg)"""
+    if resource is None:
+        return time.process_time()
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return own.ru_utime + own.ru_stime + children.ru_utime + children.ru_stime
+
+
+class CpuBudget:
+    """Holds background work back while the process uses more than `fraction` of a core
+
+    Usage is averaged since the last time the budget let work through (or
+    since it was created): work may start once the CPU time used since then,
+    spread at `fraction` of a core, fits in the time that has passed. Each
+    pause lasts at most `window` seconds before usage is measured again.
+    """
+
+    def __init__(self, fraction: float, window: float = 60.0, cpu_seconds=process_cpu_seconds, clock=time.monotonic):
+        self.fraction = fraction
+        self.window = window
+        self.cpu_seconds = cpu_seconds
+        self.clock = clock
+        self.waited_seconds = 0.0
+        self._lock = threading.Lock()
+        self._since = clock()
+        self._cpu_at = cpu_seconds()
+
+    def wait(self, stop: threading.Event):
+        """Block until running more work fits the budget; False if stop was set meanwhile"""
+        while not stop.is_set():
+            with self._lock:
+                now = self.clock()
+                cpu = self.cpu_seconds()
+                # Time the CPU used so far would have to be spread over
+                over = (cpu - self._cpu_at) / self.fraction - (now - self._since)
+                if over <= 0:
+                    # The next caller measures from here
+                    self._since, self._cpu_at = now, cpu
+                    return True
+                pause = min(over, self.window)
+                self.waited_seconds += pause
+            stop.wait(pause)
+        return False
+
+
+class Pretranscriber:
+    """Watches the recordings folder and analyzes new recordings ahead of time
+
+    Args:
+        source: Changes feed (see DriveChangesSource)
+        analyze: Called with a file's metadata; transcribes, analyzes and
+            caches the recording
+        is_cached: Called with a file's metadata; True if analyze has nothing to do
+        folder_id: Returns the id of the recordings folder, or None while it
+            doesn't exist
+        token_store: Where the changes page token is kept
+        workers: Recordings analyzed at the same time
+        cpu_budget: See CpuBudget; None disables the check
+        poll_seconds: Time between polls of the changes feed
+    """
+
+    TOKEN_NAME = "meet_recordings"
+
+    def __init__(self, source, analyze, is_cached, folder_id, token_store: PageTokenStore = None,
+                 workers: int = PRETRANSCRIBE_WORKERS, cpu_budget: float = PRETRANSCRIBE_CPU_BUDGET,
+                 poll_seconds: float = PRETRANSCRIBE_POLL_SECONDS):
+        self.source = source
+        self.analyze = analyze
+        self.is_cached = is_cached
+        self.folder_id = folder_id
+        self.token_store = token_store or PageTokenStore()
+        self.workers = workers
+        self.budget = CpuBudget(cpu_budget) if cpu_budget else None
+        self.poll_seconds = poll_seconds
+        self._stop = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()  # for the counters, updated by the workers
+        self.polls = 0
+        self.recordings_seen = 0
+        self.already_cached = 0
+        self.transcribed = 0
+        self.failed = 0
+        self.last_poll = None
+
+    def _is_recording(self, file, folder_id):
+        return (
+            not file.get("trashed")
+            and folder_id in file.get("parents", [])
+            and ("video" in file.get("mimeType", "") or "audio" in file.get("mimeType", ""))
+        )
+
+    def _count(self, counter: str):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def _process(self, file):
+        if self.is_cached(file):
+            self._count("already_cached")
+            return
+        if self.budget and not self.budget.wait(self._stop):
+            return
+        if self._stop.is_set():
+            return
+        print(f"Pre-transcribing {file.get('name', file['id'])}")
+        try:
+            self.analyze(file)
+            self._count("transcribed")
+        except meeting_audio.FFmpegNotFound:
+            print("ffmpeg not installed; stopping background pre-transcription")
+            self._count("failed")
+            self._stop.set()
+        except Exception as e:
+            print(f"ERROR pre-transcribing {file.get('name', file['id'])}: {e}")
+            self._count("failed")
+
+    def poll_once(self):
+        """Analyze the recordings added or changed since the last poll; returns how many were found
+
+        The page token is saved only after the batch is done, so recordings
+        of a batch interrupted by a restart are found again (and the ones
+        already done are cache hits).
+        """
+        folder_id = self.folder_id()
+        token = self.token_store.get(self.TOKEN_NAME)
+        if token is None:
+            # First run: only look at recordings from now on
+            self.token_store.set(self.TOKEN_NAME, self.source.start_page_token())
+            return 0
+        if folder_id is None:
+            return 0
+
+        files, next_token = self.source.changes(token)
+        # A file can change several times between polls; keep its latest state
+        latest = {}
+        for file in files:
+            if self._is_recording(file, folder_id):
+                latest[(file["id"], file_version(file))] = file
+        recordings = list(latest.values())
+        self.recordings_seen += len(recordings)
+
+        if recordings:
+            with ThreadPoolExecutor(self.workers, thread_name_prefix="pretranscribe") as pool:
+                list(pool.map(self._process, recordings))
+        if not self._stop.is_set():
+            self.token_store.set(self.TOKEN_NAME, next_token)
+        self.polls += 1
+        self.last_poll = datetime.now(timezone.utc).isoformat().replace('+00:00', 'Z')
+        return len(recordings)
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.poll_once()
+            except Exception as e:
+                print(f"ERROR polling Drive changes: {e}")
+            self._stop.wait(self.poll_seconds)
+
+    def start(self):
+        print(f"Pre-transcribing new recordings every {self.poll_seconds:g} s "
+              f"({self.workers} at a time, CPU budget {self.budget.fraction if self.budget else 'off'})")
+        self._thread = threading.Thread(target=self._run, name="pretranscriber", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = None):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+
+    def stats(self):
+        return {
+            "running": bool(self._thread and self._thread.is_alive()),
+            "polls": self.polls,
+            "recordings_seen": self.recordings_seen,
+            "already_cached": self.already_cached,
+            "transcribed": self.transcribed,
+            "failed": self.failed,
+            "cpu_budget_wait_seconds": round(self.budget.waited_seconds, 1) if self.budget else 0.0,
+            "last_poll": self.last_poll
+        }
@@ -1,9 +1,24 @@
+import anyio
+import asyncio
+import hashlib
+import heapq
 import httpx
+import json
 import os
+from collections import OrderedDict
+from contextlib import AsyncExitStack, aclosing, asynccontextmanager
+from urllib.parse import quote
 from dotenv import load_dotenv
 from mcp.server.fastmcp import Context
 from north_mcp_python_sdk import NorthMCPServer
 
+import google_auth
+import google_rate_limit
+import tool_metrics
+from calendar_batch import MAX_BATCH_SIZE, build_batch_request, parse_batch_response
+from calendar_store import CalendarEventStore, parse_event_time
+from singleflight import AsyncSingleFlight
+
 load_dotenv()
 
 # update all the mcp tool functions to be <firstname_lastname>_<tool>
@@ -15,60 +30,645 @@ mcp = NorthMCPServer(
     port=3002
 )
 
+# Time every tool registered below and serve Prometheus metrics at /metrics
+tool_metrics.instrument_server(mcp)
+
 CALENDAR_API_BASE = "https://www.googleapis.com/calendar/v3"
+# Batch endpoint, and the path prefix that calls inside a batch are relative to
+CALENDAR_BATCH_URL = "https://www.googleapis.com/batch/calendar/v3"
+CALENDAR_BATCH_PATH = "/calendar/v3"
+
+# Connection pool settings for the shared Google API client. They can be tuned
+# through environment variables without touching the code:
+# - max connections: upper bound on sockets open to googleapis.com at once
+# - max keep-alive: idle sockets kept around for reuse by the next tool call
+# - keep-alive expiry: seconds an idle socket is kept before being closed
+# - timeout: default per-request timeout in seconds (helpers can override it)
+HTTP_MAX_CONNECTIONS = int(os.getenv("GOOGLE_HTTP_MAX_CONNECTIONS", "100"))
+HTTP_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("GOOGLE_HTTP_MAX_KEEPALIVE", "20"))
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("GOOGLE_HTTP_KEEPALIVE_EXPIRY", "30"))
+HTTP_TIMEOUT = float(os.getenv("GOOGLE_HTTP_TIMEOUT", "10"))
+
+# One client for the whole process. Reusing it keeps TCP+TLS connections alive
+# between tool calls instead of paying a fresh handshake to Google every time,
+# and HTTP/2 lets concurrent tool calls share a single connection.
+_http_client = None
+
+
+def _create_http_client():
+    return httpx.AsyncClient(
+        http2=True,
+        limits=httpx.Limits(
+            max_connections=HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=HTTP_KEEPALIVE_EXPIRY
+        ),
+        timeout=httpx.Timeout(HTTP_TIMEOUT)
+    )
+
+
+def _get_http_client():
+    """Return the shared client, creating it if the server lifespan hasn't yet"""
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = _create_http_client()
+    return _http_client
+
+
+@asynccontextmanager
+async def http_client_lifespan():
+    """Open the shared client on server startup and close it on shutdown"""
+    global _http_client
+    _http_client = _create_http_client()
+    try:
+        yield _http_client
+    finally:
+        await _http_client.aclose()
+        _http_client = None
+
+
+def _request_timeout(timeout: float = None):
+    # USE_CLIENT_DEFAULT falls back to the pool-wide HTTP_TIMEOUT
+    return httpx.USE_CLIENT_DEFAULT if timeout is None else timeout
+
+
+# Access tokens come from GOOGLE_REFRESH_TOKEN/GOOGLE_CLIENT_ID/GOOGLE_CLIENT_SECRET
+# when set, refreshed in the background before they expire; otherwise from the
+# static ACCESS_TOKEN
+_token_provider = google_auth.provider_from_env()
+
+
+async def _get_google_token():
+    return await _token_provider.get_token_async()
+
 
-def _get_google_token():
-    return os.getenv("ACCESS_TOKEN")
+def _token_key(access_token: str):
+    # Short hash so cache keys don't hold the token itself
+    return hashlib.sha256(access_token.encode()).hexdigest()[:12]
 
 
-async def _fetch_calendar_data(access_token: str, url: str, params: dict = None):
-    """Helper function for GET requests to Google Calendar API"""
+async def _send_limited(access_token: str, send, cost: int = 1, retry_server_errors: bool = None):
+    """Send a request through the shared rate limiter, retrying 429s (and 5xx for idempotent methods)"""
+    response = await google_rate_limit.call_async(
+        "calendar", send, user=_token_provider.identity, cost=cost, retry_server_errors=retry_server_errors
+    )
+    if response.status_code == 401:
+        # Revoked or expired early: make the next call fetch a new token
+        _token_provider.invalidate(access_token)
+    return response
+
+
+# Identical GETs in flight at the same time share one request to Google.
+# CALENDAR_COALESCE_TTL (seconds) additionally keeps results around briefly
+# so back-to-back identical reads are answered locally; 0 disables that.
+_read_flight = AsyncSingleFlight(
+    ttl=float(os.getenv("CALENDAR_COALESCE_TTL", "0")),
+    max_cached=int(os.getenv("CALENDAR_COALESCE_CACHE_SIZE", "256"))
+)
+
+
+async def _fetch_calendar_data(access_token: str, url: str, params: dict = None, timeout: float = None):
+    """Helper function for GET requests to Google Calendar API
+
+    Concurrent calls with the same token, URL and params are coalesced, so the
+    returned dict may be shared with other callers: copy it before changing it.
+    """
+    key = (_token_key(access_token), url, json.dumps(params, sort_keys=True))
+    return await _read_flight.do(key, lambda: _get_calendar_data(access_token, url, params, timeout))
+
+
+async def _get_calendar_data(access_token: str, url: str, params: dict = None, timeout: float = None):
+    """The actual GET request behind _fetch_calendar_data"""
     # Authorization header authenticates with Google using OAuth2 bearer token
     headers = {"Authorization": f"Bearer {access_token}"}
     
     # Using async/await for non-blocking I/O - allows the server to handle multiple
     # calendar requests concurrently while waiting for Google API responses
-    async with httpx.AsyncClient() as client:
-        response = await client.get(url, headers=headers, params=params)
-        # raise_for_status() converts HTTP errors (401, 404, 500, etc.) into exceptions
-        # immediately, preventing attempts to parse error responses as valid JSON
-        response.raise_for_status()
-        return response.json()
+    client = _get_http_client()
+    response = await _send_limited(
+        access_token,
+        lambda: client.get(url, headers=headers, params=params, timeout=_request_timeout(timeout))
+    )
+    # raise_for_status() converts HTTP errors (401, 404, 500, etc.) into exceptions
+    # immediately, preventing attempts to parse error responses as valid JSON
+    response.raise_for_status()
+    return response.json()
 
 
-async def _modify_calendar_data(access_token: str, url: str, method: str, json_payload: dict = None):
-    """Helper function for POST/DELETE requests to Google Calendar API"""
+async def _modify_calendar_data(access_token: str, url: str, method: str, json_payload: dict = None,
+                                timeout: float = None, extra_headers: dict = None):
+    """Helper function for POST/PUT/PATCH/DELETE requests to Google Calendar API"""
     # Authorization header authenticates with Google using OAuth2 bearer token
     headers = {"Authorization": f"Bearer {access_token}"}
+    # Extra headers such as If-Match for conditional writes
+    if extra_headers:
+        headers.update(extra_headers)
     
     # Content-Type header tells Google the payload format (only needed when sending data)
     if json_payload:
         headers["Content-Type"] = "application/json"
     
-    async with httpx.AsyncClient() as client:
-        # json_payload is the request body containing data to send (e.g., event details
-        # for creating/updating events). It's automatically serialized to JSON format.
-        response = await client.request(
+    client = _get_http_client()
+    # Any write may change what reads return, so drop coalesced/cached reads
+    _read_flight.clear()
+    # json_payload is the request body containing data to send (e.g., event details
+    # for creating/updating events). It's automatically serialized to JSON format.
+    response = await _send_limited(
+        access_token,
+        lambda: client.request(
             method,
             url,
             headers=headers,
-            json=json_payload
+            json=json_payload,
+            timeout=_request_timeout(timeout)
+        )
+    )
+    response.raise_for_status()
+    
+    # 204 = "No Content" - request succeeded but no response body (typical for DELETE)
+    # Return success dict instead of trying to parse empty response as JSON
+    if response.status_code == 204:
+        return {"success": True}
+    
+    return response.json()
+
+
+async def _fetch_calendar_data_if_changed(access_token: str, url: str, etag: str = None, params: dict = None,
+                                          timeout: float = None):
+    """Conditional GET: returns None when Google answers 304 Not Modified"""
+    headers = {"Authorization": f"Bearer {access_token}"}
+    # If-None-Match asks Google to skip the body when the event's ETag still
+    # matches the version we already have
+    if etag:
+        headers["If-None-Match"] = etag
+    
+    client = _get_http_client()
+    response = await _send_limited(
+        access_token,
+        lambda: client.get(url, headers=headers, params=params, timeout=_request_timeout(timeout))
+    )
+    if response.status_code == 304:
+        return None
+    response.raise_for_status()
+    return response.json()
+
+
+# Number of batch requests one bulk tool call sends to Google at the same time
+BATCH_CONCURRENCY = int(os.getenv("CALENDAR_BATCH_CONCURRENCY", "4"))
+
+
+async def _send_batch(access_token: str, operations: list, timeout: float = None):
+    """Send up to MAX_BATCH_SIZE calls in one multipart request to the batch endpoint"""
+    content_type, body = build_batch_request(operations)
+    # The outer request's Authorization header applies to every call in the batch
+    headers = {"Authorization": f"Bearer {access_token}", "Content-Type": content_type}
+    
+    client = _get_http_client()
+    _read_flight.clear()
+    # Every call inside the batch counts against the quota, so it costs as many tokens.
+    # The batch is a POST, but resending it after a 5xx is only as safe as the
+    # calls inside it
+    response = await _send_limited(
+        access_token,
+        lambda: client.post(CALENDAR_BATCH_URL, headers=headers, content=body, timeout=_request_timeout(timeout)),
+        cost=len(operations),
+        retry_server_errors=all(
+            operation["method"] in google_rate_limit.IDEMPOTENT_METHODS for operation in operations
         )
-        response.raise_for_status()
-        
-        # 204 = "No Content" - request succeeded but no response body (typical for DELETE)
-        # Return success dict instead of trying to parse empty response as JSON
-        if response.status_code == 204:
-            return {"success": True}
-        
-        return response.json()
+    )
+    response.raise_for_status()
+    return parse_batch_response(response.headers["Content-Type"], response.content)
+
+
+def _rate_limited_result(result):
+    # Only answers to single calls (they carry an index); a failed batch
+    # request was already retried by _send_limited
+    return "index" in result and google_rate_limit.is_rate_limited(result["status"], json.dumps(result["body"] or {}))
+
+
+async def _run_batched(access_token: str, operations: list):
+    """Run any number of calls through the batch endpoint
+
+    Calls are packed MAX_BATCH_SIZE per request and up to BATCH_CONCURRENCY
+    requests are in flight at once. Google rate-limits calls inside a batch
+    one by one, answering 429 (or 403 rateLimitExceeded) for some of them;
+    those were never run, so they are sent again in a later batch after a
+    backoff, like a throttled single request. Returns one {"status", "body"}
+    result per operation, in the same order as operations.
+    """
+    results = [None] * len(operations)
+    pending = list(range(len(operations)))
+    for attempt in range(google_rate_limit.MAX_RETRIES + 1):
+        sent = await _send_in_batches(access_token, [operations[index] for index in pending])
+        throttled = []
+        retry_after = None
+        for index, result in zip(pending, sent):
+            results[index] = result
+            if _rate_limited_result(result):
+                throttled.append(index)
+                seconds = google_rate_limit.parse_retry_after(result.get("headers", {}).get("retry-after"))
+                if seconds is not None:
+                    retry_after = max(retry_after or 0.0, seconds)
+        if not throttled or attempt == google_rate_limit.MAX_RETRIES:
+            break
+        delay = google_rate_limit.backoff_delay(attempt, retry_after)
+        print(f"Google rate-limited {len(throttled)} calls in a batch, resending them in {delay:.1f}s")
+        await asyncio.sleep(delay)
+        pending = throttled
+    return results
+
+
+async def _send_in_batches(access_token: str, operations: list):
+    """One pass of _run_batched: every operation sent once, results in order"""
+    semaphore = asyncio.Semaphore(BATCH_CONCURRENCY)
+
+    async def run_chunk(offset):
+        chunk = operations[offset:offset + MAX_BATCH_SIZE]
+        async with semaphore:
+            try:
+                results = await _send_batch(access_token, chunk)
+            except httpx.HTTPError as e:
+                # The batch request as a whole failed - report it on every call in it
+                status = e.response.status_code if isinstance(e, httpx.HTTPStatusError) else None
+                return {offset + i: {"status": status, "body": {"error": {"message": str(e)}}} for i in range(len(chunk))}
+        return {offset + result["index"]: result for result in results}
 
+    chunks = await asyncio.gather(*(run_chunk(offset) for offset in range(0, len(operations), MAX_BATCH_SIZE)))
+    by_index = {index: result for chunk in chunks for index, result in chunk.items()}
+    missing = {"status": None, "body": {"error": {"message": "No response for this call in the batch"}}}
+    return [by_index.get(index, missing) for index in range(len(operations))]
 
 
-def format_event_to_document(event):
+# Google caps a single events.list page at 2500 items
+MAX_PAGE_SIZE = 2500
+
+
+def _check_positive(name: str, value: int):
+    """Reject counts Google would answer with a 400 (maxResults must be at least 1)"""
+    if value is None or value < 1:
+        raise ValueError(f"{name} must be at least 1, got {value}")
+
+
+async def _iter_event_pages(access_token: str, url: str, params: dict, max_items: int,
+                           semaphore: asyncio.Semaphore = None, prefetch: bool = True):
+    """Yield (items, resume_page_token) for each page of an events.list query
+
+    The request for the next page is started before the current page is handed
+    to the caller, so formatting one page overlaps with downloading the next.
+    At most two pages are held in memory at a time, regardless of max_items.
+    resume_page_token is only set on the last page when the item budget ran out
+    before Google ran out of results. A semaphore shared between several
+    iterators bounds how many of their page requests run at once; with
+    prefetch=False the next page is only requested when the caller asks for it.
+    """
+    page_size = min(params.get("maxResults", MAX_PAGE_SIZE), MAX_PAGE_SIZE)
+    remaining = max_items
+    if page_size < 1 or remaining < 1:
+        return  # maxResults=0 is a 400 from Google; there is nothing to fetch anyway
+
+    def start_fetch(page_token=None):
+        page_params = dict(params)
+        # Never ask for more than the remaining budget, so a page is never cut
+        # short and the page token always resumes exactly where we stopped
+        page_params["maxResults"] = min(page_size, remaining)
+        if page_token:
+            page_params["pageToken"] = page_token
+        return asyncio.create_task(fetch(page_params))
+
+    async def fetch(page_params):
+        if semaphore is None:
+            return await _fetch_calendar_data(access_token, url, params=page_params)
+        async with semaphore:
+            return await _fetch_calendar_data(access_token, url, params=page_params)
+
+    pending = start_fetch(params.get("pageToken"))
+    try:
+        while pending is not None:
+            page = await pending
+            pending = None
+            items = page.get("items", [])
+            remaining -= len(items)
+            next_page_token = page.get("nextPageToken")
+            if next_page_token and remaining > 0:
+                if prefetch:
+                    pending = start_fetch(next_page_token)  # Prefetch while the caller works
+                    yield items, None
+                else:
+                    yield items, None
+                    pending = start_fetch(next_page_token)
+            else:
+                yield items, next_page_token
+    finally:
+        # The caller stopped early (or failed) - don't leave a stray request running
+        if pending is not None:
+            pending.cancel()
+
+
+async def _stream_calendar_events(ctx: Context, access_token: str, url: str, params: dict, max_items: int,
+                                  profile: str = "full"):
+    """Page through events.list server-side, streaming each page as progress"""
+    # Progress notifications only reach the client if it sent a progressToken.
+    # Without one we fall back to collecting the events into the final result.
+    meta = ctx.request_context.meta
+    streaming = meta is not None and meta.progressToken is not None
+
+    collected = []
+    total_returned = 0
+    pages_fetched = 0
+    resume_page_token = None
+
+    async with aclosing(_iter_event_pages(access_token, url, params, max_items)) as pages:
+        async for items, resume_page_token in pages:
+            events = [format_event_to_document(item, profile) for item in items]
+            total_returned += len(events)
+            pages_fetched += 1
+            if streaming:
+                # Each progress chunk carries one page of formatted events as JSON
+                await ctx.report_progress(
+                    progress=total_returned,
+                    total=max_items,
+                    message=json.dumps({"page": pages_fetched, "events": events})
+                )
+            else:
+                collected.extend(events)
+
+    result = {
+        "events": collected,
+        "total_returned": total_returned,
+        "pages_fetched": pages_fetched,
+        "streamed": streaming
+    }
+    if resume_page_token:
+        result["next_page_token"] = resume_page_token
+        result["has_more"] = True
+    return result
+
+
+# Number of calendars a multi-calendar listing downloads from at the same time
+FANOUT_CONCURRENCY = int(os.getenv("CALENDAR_FANOUT_CONCURRENCY", "8"))
+# Smallest page requested per calendar in a multi-calendar listing
+FANOUT_MIN_PAGE_SIZE = 25
+
+
+def _calendar_events_url(calendar_id: str):
+    # Calendar ids are email-like and can contain '#' (e.g. holiday calendars)
+    return f"{CALENDAR_API_BASE}/calendars/{quote(calendar_id, safe='')}/events"
+
+
+async def _list_calendar_ids(access_token: str):
+    """Ids of every calendar in the user's calendar list that isn't hidden"""
+    url = f"{CALENDAR_API_BASE}/users/me/calendarList"
+    params = {"maxResults": 250, "fields": "nextPageToken,items(id,hidden)"}
+    calendar_ids = []
+    while True:
+        page = await _fetch_calendar_data(access_token, url, params=params)
+        calendar_ids.extend(item["id"] for item in page.get("items", []) if not item.get("hidden"))
+        if not page.get("nextPageToken"):
+            return calendar_ids
+        params = dict(params, pageToken=page["nextPageToken"])
+
+
+async def _merge_calendar_events(access_token: str, calendar_ids: list, params: dict, max_results: int):
+    """K-way merge of several calendars' startTime-ordered events.list streams
+
+    Each calendar is paged through its own _iter_event_pages iterator; all of
+    them share a semaphore so at most FANOUT_CONCURRENCY page requests run at
+    once. A heap holds the next unmerged event of every calendar, keyed on its
+    parsed start time, so the merged output comes out in order while only the
+    pages actually needed are downloaded. First pages are sized for an even
+    share of max_results (with headroom), and a calendar's next page is only
+    requested once the merge has consumed its current one; when max_results
+    events are merged the iterators are closed and nothing more is fetched.
+
+    Returns (merged [(calendar_id, event)], errors {calendar_id: message},
+    pages_fetched, has_more).
+    """
+    semaphore = asyncio.Semaphore(FANOUT_CONCURRENCY)
+    errors = {}
+    pages_fetched = 0
+    has_more = False
+    merged = []
+    # The same meeting shows up on every calendar that was invited; keep the first copy
+    seen = set()
+
+    # Twice an even share: most calendars then need a single page, and a busy
+    # calendar that supplies more than its share just pages further
+    fair_share = -(-max_results // max(1, len(calendar_ids)))
+    page_params = dict(params, maxResults=min(max_results, MAX_PAGE_SIZE, max(FANOUT_MIN_PAGE_SIZE, 2 * fair_share)))
+    
+    async with AsyncExitStack() as stack:
+        streams = [
+            await stack.enter_async_context(aclosing(
+                # One calendar alone may have to supply every result
+                _iter_event_pages(access_token, _calendar_events_url(calendar_id), page_params, max_results,
+                                  semaphore, prefetch=False)
+            ))
+            for calendar_id in calendar_ids
+        ]
+
+        async def next_page(index):
+            """Next page of calendar index as a list, or None when it is done or failed"""
+            nonlocal pages_fetched, has_more
+            try:
+                page = await anext(streams[index], None)
+            except httpx.HTTPError as e:
+                # One unreadable calendar (no access, deleted, network error) shouldn't sink the rest
+                if isinstance(e, httpx.HTTPStatusError):
+                    errors[calendar_ids[index]] = f"{e.response.status_code}: {e.response.reason_phrase}"
+                else:
+                    errors[calendar_ids[index]] = str(e) or type(e).__name__
+                return None
+            if page is None:
+                return None
+            items, resume_page_token = page
+            pages_fetched += 1
+            has_more = has_more or resume_page_token is not None
+            return items
+
+        def push(heap, index, items, position):
+            # Skip entries without a usable start time (shouldn't happen with orderBy=startTime)
+            while position < len(items):
+                start = parse_event_time(items[position].get("start", {}))
+                if start is not None:
+                    heapq.heappush(heap, (start, index, position, items))
+                    return
+                position += 1
+
+        heap = []
+        first_pages = await asyncio.gather(*(next_page(index) for index in range(len(calendar_ids))))
+        for index, items in enumerate(first_pages):
+            if items:
+                push(heap, index, items, 0)
+
+        while heap and len(merged) < max_results:
+            _, index, position, items = heapq.heappop(heap)
+            event = items[position]
+            key = (event.get("iCalUID") or event.get("id"), event["start"].get("dateTime", event["start"].get("date")))
+            if key not in seen:
+                seen.add(key)
+                merged.append((calendar_ids[index], event))
+            if position + 1 < len(items):
+                push(heap, index, items, position + 1)
+            else:
+                # This page is used up; only now is its successor requested
+                items = await next_page(index)
+                if items:
+                    push(heap, index, items, 0)
+
+        has_more = has_more or bool(heap)
+
+    return merged, errors, pages_fetched, has_more
+
+
+
+# Local event store (see calendar_store.py). When enabled, a background task keeps
+# a copy of the primary calendar fresh with incremental syncToken syncs, and the
+# list/get tools answer from memory instead of calling Google whenever they can.
+# - sync interval: seconds between incremental syncs
+# - days back/ahead: the window of events kept locally
+# - max events: hard cap on stored events (the window shrinks to fit)
+EVENT_STORE_ENABLED = os.getenv("CALENDAR_SYNC_ENABLED", "false").lower() in ("1", "true", "yes")
+EVENT_STORE_SYNC_INTERVAL = float(os.getenv("CALENDAR_SYNC_INTERVAL", "30"))
+EVENT_STORE_DAYS_BACK = int(os.getenv("CALENDAR_SYNC_DAYS_BACK", "30"))
+EVENT_STORE_DAYS_AHEAD = int(os.getenv("CALENDAR_SYNC_DAYS_AHEAD", "90"))
+EVENT_STORE_MAX_EVENTS = int(os.getenv("CALENDAR_SYNC_MAX_EVENTS", "10000"))
+
+_event_store = CalendarEventStore(
+    days_back=EVENT_STORE_DAYS_BACK,
+    days_ahead=EVENT_STORE_DAYS_AHEAD,
+    max_events=EVENT_STORE_MAX_EVENTS
+) if EVENT_STORE_ENABLED else None
+
+
+async def _sync_event_store(store: CalendarEventStore, access_token: str):
+    """Run one sync of the store: a full download the first time, deltas after"""
+    url = f"{CALENDAR_API_BASE}/calendars/primary/events"
+    params = store.start_sync()
+    while params is not None:
+        try:
+            page = await _fetch_calendar_data(access_token, url, params=params)
+        except httpx.HTTPStatusError as e:
+            # 410 Gone = the sync token expired; throw the copy away and resync
+            if e.response.status_code != 410:
+                raise
+            print("Sync token expired, starting a full resync")
+            store.reset()
+            params = store.start_sync()
+            continue
+        params = store.apply_page(page)
+
+
+async def _run_event_store_sync():
+    """Keep the local event store fresh until the server shuts down"""
+    while True:
+        try:
+            await _sync_event_store(_event_store, await _get_google_token())
+        except Exception as e:
+            # Keep serving from the last good copy; the tools fall back to the
+            # API on their own if the store never got its first sync
+            print(f"ERROR syncing local event store: {e}")
+        await anyio.sleep(EVENT_STORE_SYNC_INTERVAL)
+
+
+class EventDocumentCache:
+    """
+    LRU cache of (event id, profile) -> (ETag, formatted document) for the get tool
+
+    Counters:
+        hits: revalidations that came back 304, served straight from the cache
+        misses: lookups with no entry, or whose event had changed upstream
+        revalidations: conditional requests sent to Google with If-None-Match
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+
+    def get(self, event_id: str, profile: str = "full"):
+        entry = self._entries.get((event_id, profile))
+        if entry is not None:
+            self._entries.move_to_end((event_id, profile))  # Mark as most recently used
+        return entry
+
+    def put(self, event_id: str, etag: str, document: dict, profile: str = "full"):
+        # A new version of the event makes every other profile's copy stale
+        for other_profile in EVENT_PROFILES:
+            entry = self._entries.get((event_id, other_profile))
+            if entry is not None and entry[0] != etag:
+                del self._entries[(event_id, other_profile)]
+        if not etag:
+            return  # Nothing to revalidate against
+        self._entries[(event_id, profile)] = (etag, document)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)  # Evict the least recently used
+
+    def invalidate(self, event_id: str):
+        for profile in EVENT_PROFILES:
+            self._entries.pop((event_id, profile), None)
+
+    def known_etag(self, event_id: str):
+        """Latest ETag seen for the event under any profile, without touching LRU order"""
+        for profile in EVENT_PROFILES:
+            entry = self._entries.get((event_id, profile))
+            if entry is not None:
+                return entry[0]
+        return None
+
+    def stats(self):
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "revalidations": self.revalidations
+        }
+
+
+_event_cache = EventDocumentCache(int(os.getenv("CALENDAR_EVENT_CACHE_SIZE", "512")))
+
+
+# Output profiles for format_event_to_document:
+# - "full": everything, including description, attendees and the video link
+# - "summary": title, times, location, status and link - enough for an overview
+# - "ids-only": just the event id, for callers that will fetch details later
+EVENT_PROFILES = ("full", "summary", "ids-only")
+
+# Google partial-response masks (the fields= parameter) matching each profile,
+# so fields a profile never renders are never downloaded or parsed. The etag is
+# kept so the ETag cache can revalidate whatever profile it stored.
+_EVENT_FIELD_MASKS = {
+    "full": None,
+    "summary": "id,etag,kind,summary,start,end,location,htmlLink,status",
+    "ids-only": "id,etag"
+}
+
+
+def event_fields_mask(profile: str, list_response: bool = False, extra_fields: tuple = ()):
+    """fields= value for a profile, or None to download the whole event
+
+    extra_fields are event fields the caller needs on top of what the profile renders.
+    """
+    if profile not in EVENT_PROFILES:
+        raise ValueError(f"Unknown profile '{profile}'. Use one of: {', '.join(EVENT_PROFILES)}")
+    fields = _EVENT_FIELD_MASKS[profile]
+    if fields is None:
+        return None
+    missing = [field for field in extra_fields if field not in fields.split(",")]
+    if missing:
+        fields = ",".join([fields, *missing])
+    # events.list wraps events in "items" and paginates with nextPageToken
+    return f"nextPageToken,items({fields})" if list_response else fields
+
+
+def format_event_to_document(event, profile: str = "full"):
     """Convert a calendar event to a well-formatted document"""
+    if profile == "ids-only":
+        return {"id": event.get("id")}
+    
     summary = event.get("summary", "(No title)")
-    description = event.get("description", "")
     location = event.get("location", "")
     html_link = event.get("htmlLink", "")
     
@@ -82,65 +682,118 @@ def format_event_to_document(event):
     start_time = start.get("dateTime", start.get("date", "Not specified"))
     end_time = end.get("dateTime", end.get("date", "Not specified"))
     
-    # Format attendees
-    attendees = event.get("attendees", [])
-    attendees_formatted = []
-    for attendee in attendees:
-        name = attendee.get("displayName", attendee.get("email", "Unknown"))
-        status = attendee.get("responseStatus", "needsAction")
-        organizer = " (Organizer)" if attendee.get("organizer") else ""
-        attendees_formatted.append(f"{name} - {status}{organizer}")
+    # Content is collected as a list of pieces and joined once at the end;
+    # repeated += on a string copies everything built so far on every append
+    parts = [f"# {summary}\n\n"]
+    full = profile == "full"
+    
+    description = event.get("description", "") if full else ""
+    if description:
+        parts.append(f"**Description:** {description}\n\n")
+    
+    parts.append(f"**Start:** {start_time}\n")
+    parts.append(f"**End:** {end_time}\n\n")
+    
+    if location:
+        parts.append(f"**Location:** {location}\n\n")
+    
+    # Attendees and conference data are only scanned for the full profile
+    attendees = event.get("attendees", []) if full else []
+    if attendees:
+        parts.append(f"**Attendees ({len(attendees)}):**\n")
+        parts.extend(
+            f"  - {attendee.get('displayName', attendee.get('email', 'Unknown'))}"
+            f" - {attendee.get('responseStatus', 'needsAction')}"
+            f"{' (Organizer)' if attendee.get('organizer') else ''}\n"
+            for attendee in attendees
+        )
+        parts.append("\n")
     
     # Format conference data
     # Entry points are different ways to join a meeting: video link, phone dial-in, SIP address
     # We filter for "video" type to get the clickable URL (Google Meet/Zoom link)
     conference_link = ""
-    conference_data = event.get("conferenceData", {})
-    if conference_data:
-        entry_points = conference_data.get("entryPoints", [])
-        for entry in entry_points:
+    if full:
+        for entry in event.get("conferenceData", {}).get("entryPoints", []):
             # Only extract video conference link (e.g., meet.google.com/abc-defg-hij)
             if entry.get("entryPointType") == "video":
                 conference_link = entry.get("uri", "")
                 break  # Stop after finding the first video link
-    
-    
-    # Build formatted content
-    content = f"# {summary}\n\n"
-    
-    if description:
-        content += f"**Description:** {description}\n\n"
-    
-    content += f"**Start:** {start_time}\n"
-    content += f"**End:** {end_time}\n\n"
-    
-    if location:
-        content += f"**Location:** {location}\n\n"
-    if attendees_formatted:
-        content += f"**Attendees ({len(attendees_formatted)}):**\n"
-        for attendee in attendees_formatted:
-            content += f"  - {attendee}\n"
-        content += "\n"
-    
     if conference_link:
-        content += f"**Video Conference:** {conference_link}\n\n"
+        parts.append(f"**Video Conference:** {conference_link}\n\n")
+    
     status = event.get("status", "confirmed")
-    content += f"**Status:** {status}\n"
+    parts.append(f"**Status:** {status}\n")
     
     if html_link:
-        content += f"**Link:** {html_link}\n"
+        parts.append(f"**Link:** {html_link}\n")
     
-    return {
+    document = {
         "id": event.get("id"),
         "kind": event.get("kind", "calendar#event"),
         "title": summary,
         "url": html_link,
-        "content": content.strip(),
+        "content": "".join(parts).strip(),
         "start_time": start_time,
         "end_time": end_time,
-        "location": location,
-        "attendees_count": len(attendees)
+        "location": location
+    }
+    if full:
+        document["attendees_count"] = len(attendees)
+    return document
+
+
+def _build_event_body(title, start_time, end_time, description="", location="", attendees=None):
+    """Request body for creating an event"""
+    event_data = {
+        "summary": title,
+        "description": description,
+        "start": {"dateTime": start_time, "timeZone": "UTC"},
+        "end": {"dateTime": end_time, "timeZone": "UTC"}
     }
+    
+    if location:
+        event_data["location"] = location
+    if attendees:
+        email_list = [email.strip() for email in attendees.split(",")]
+        event_data["attendees"] = [{"email": email} for email in email_list]
+    return event_data
+
+
+def _build_event_changes(title=None, start_time=None, end_time=None, description=None, location=None, attendees=None):
+    """Only the fields that were provided, in the shape the API expects"""
+    changes = {}
+    if title is not None:
+        changes["summary"] = title
+    if description is not None:
+        changes["description"] = description
+    if location is not None:
+        changes["location"] = location
+    if start_time is not None:
+        changes["start"] = {"dateTime": start_time, "timeZone": "UTC"}
+    if end_time is not None:
+        changes["end"] = {"dateTime": end_time, "timeZone": "UTC"}
+    if attendees is not None:
+        email_list = [email.strip() for email in attendees.split(",")]
+        changes["attendees"] = [{"email": email} for email in email_list]
+    return changes
+
+
+def _remember_written_event(event: dict):
+    """Record an event Google just returned from a write and format it"""
+    if _event_store is not None:
+        _event_store.apply_event(event)
+    
+    # Writes replace whatever the cache held for this event with the fresh copy
+    document = format_event_to_document(event)
+    _event_cache.put(event.get("id"), event.get("etag"), document)
+    return document
+
+
+def _forget_deleted_event(event_id: str):
+    if _event_store is not None:
+        _event_store.remove_event(event_id)
+    _event_cache.invalidate(event_id)
 
 
 @mcp.tool()
@@ -149,19 +802,34 @@ async def firstname_lastname_list_calendar_events(
     max_results: int = 10,
     time_min: str = None,
     time_max: str = None,
-    search_query: str = None
+    search_query: str = None,
+    page_token: str = None,
+    auto_paginate: bool = False,
+    max_items: int = 1000,
+    profile: str = "full"
 ):
     """List events from the user's primary calendar with optional filtering
     Args:
         ctx: Request context
-        max_results: Maximum number of events to return (default: 10)
+        max_results: Maximum number of events to return (default: 10). With auto_paginate
+            this is the page size instead.
         time_min: Lower bound for event start time (RFC3339 format, e.g., "2024-01-15T00:00:00Z")
         time_max: Upper bound for event end time (RFC3339 format)
         search_query: Free text search to find events matching keywords
+        page_token: next_page_token from a previous call, to continue where it stopped
+        auto_paginate: Fetch every page server-side instead of returning only one.
+            Pages are streamed to the client as progress notifications when it
+            sends a progress token (default: False)
+        max_items: Total number of events to fetch when auto_paginate is set (default: 1000)
+        profile: How much of each event to return: "full", "summary" (title, times,
+            location, status, link) or "ids-only" (default: "full")
     Returns:
         List of formatted calendar events with detailed information
     """
-    token = _get_google_token()
+    _check_positive("max_results", max_results)
+    if auto_paginate:
+        _check_positive("max_items", max_items)
+    token = await _get_google_token()
     
     # Build query parameters for Google Calendar API
     params = {
@@ -169,6 +837,10 @@ async def firstname_lastname_list_calendar_events(
         "singleEvents": True,  # Expand recurring events into individual instances
         "orderBy": "startTime"  # Sort chronologically (requires singleEvents=True)
     }
+    # Partial response: only download the fields the chosen profile renders
+    fields = event_fields_mask(profile, list_response=True)
+    if fields:
+        params["fields"] = fields
     
     # Add optional filters if provided
     if time_min:
@@ -177,16 +849,28 @@ async def firstname_lastname_list_calendar_events(
         params["timeMax"] = time_max
     if search_query:
         params["q"] = search_query  # Free text search across event fields
+    if page_token:
+        params["pageToken"] = page_token
+    
+    url = f"{CALENDAR_API_BASE}/calendars/primary/events"
+    if auto_paginate:
+        return await _stream_calendar_events(ctx, token, url, params, max_items, profile)
+    
+    # Answer from the local copy when the whole query falls inside its window.
+    # One extra event is asked for to tell whether max_results cut the list
+    # short; if it did, Google is asked instead so the caller gets a
+    # next_page_token to continue from.
+    if _event_store is not None and not page_token:
+        items = _event_store.list_events(time_min, time_max, search_query, max_results + 1)
+        if items is not None and len(items) <= max_results:
+            events = [format_event_to_document(item, profile) for item in items]
+            return {"events": events, "total_returned": len(events)}
     
     # Fetch events from the user's primary calendar
-    response = await _fetch_calendar_data(
-        token,
-        f"{CALENDAR_API_BASE}/calendars/primary/events",
-        params=params
-    )
+    response = await _fetch_calendar_data(token, url, params=params)
     
     # Convert raw API response items to formatted documents
-    events = [format_event_to_document(item) for item in response.get("items", [])]
+    events = [format_event_to_document(item, profile) for item in response.get("items", [])]
     
     result = {
         "events": events,
@@ -204,6 +888,72 @@ async def firstname_lastname_list_calendar_events(
     return result
 
 
+@mcp.tool()
+async def firstname_lastname_list_events_across_calendars(
+    ctx: Context,
+    calendar_ids: list[str] = None,
+    max_results: int = 50,
+    time_min: str = None,
+    time_max: str = None,
+    search_query: str = None,
+    profile: str = "full"
+):
+    """List events from several calendars at once, merged into one chronological list
+    Args:
+        ctx: Request context
+        calendar_ids: Calendars to read, e.g. ["primary", "team@group.calendar.google.com"]
+            (default: every calendar in the user's calendar list that isn't hidden)
+        max_results: Maximum number of events to return across all calendars (default: 50)
+        time_min: Lower bound (exclusive) for event end time (RFC3339 format)
+        time_max: Upper bound (exclusive) for event start time (RFC3339 format)
+        search_query: Free text search terms to find events
+        profile: How much of each event to return: "full", "summary" or "ids-only" (default: "full")
+    Returns:
+        Events ordered by start time, each tagged with the calendar it came from, plus
+        per-calendar errors for calendars that could not be read
+    """
+    _check_positive("max_results", max_results)
+    token = await _get_google_token()
+    if not calendar_ids:
+        calendar_ids = await _list_calendar_ids(token)
+    # A calendar passed twice would only produce duplicates
+    calendar_ids = list(dict.fromkeys(calendar_ids))
+    
+    params = {
+        "singleEvents": True,
+        "orderBy": "startTime"  # Every calendar's stream must be sorted for the merge
+    }
+    # The merge needs start times and iCalUIDs even when the profile doesn't render them
+    fields = event_fields_mask(profile, list_response=True, extra_fields=("start", "iCalUID"))
+    if fields:
+        params["fields"] = fields
+    if time_min:
+        params["timeMin"] = time_min
+    if time_max:
+        params["timeMax"] = time_max
+    if search_query:
+        params["q"] = search_query
+    
+    merged, errors, pages_fetched, has_more = await _merge_calendar_events(token, calendar_ids, params, max_results)
+    
+    events = []
+    for calendar_id, item in merged:
+        document = format_event_to_document(item, profile)
+        document["calendar_id"] = calendar_id
+        events.append(document)
+    
+    result = {
+        "events": events,
+        "total_returned": len(events),
+        "calendars_queried": len(calendar_ids),
+        "pages_fetched": pages_fetched,
+        "has_more": has_more
+    }
+    if errors:
+        result["errors"] = errors
+    return result
+
+
 # destructiveHint=True triggers safety prompts, asking the user to confirm
 # before creating a calendar event (prevents accidental data modifications)
 @mcp.tool(annotations={"destructiveHint": True})
@@ -228,19 +978,8 @@ async def firstname_lastname_create_calendar_event(
     Returns:
         Created event details with formatted information
     """
-    token = _get_google_token()
-    event_data = {
-        "summary": title,
-        "description": description,
-        "start": {"dateTime": start_time, "timeZone": "UTC"},
-        "end": {"dateTime": end_time, "timeZone": "UTC"}
-    }
-    
-    if location:
-        event_data["location"] = location
-    if attendees:
-        email_list = [email.strip() for email in attendees.split(",")]
-        event_data["attendees"] = [{"email": email} for email in email_list]
+    token = await _get_google_token()
+    event_data = _build_event_body(title, start_time, end_time, description, location, attendees)
     
     response = await _modify_calendar_data(
         token,
@@ -249,25 +988,46 @@ async def firstname_lastname_create_calendar_event(
         json_payload=event_data
     )
     
-    return format_event_to_document(response)
+    return _remember_written_event(response)
 
 
 @mcp.tool()
-async def firstname_lastname_get_calendar_event(ctx: Context, event_id: str):
+async def firstname_lastname_get_calendar_event(ctx: Context, event_id: str, profile: str = "full"):
     """Get detailed information about a specific calendar event
     Args:
         ctx: Request context
         event_id: The ID of the event to retrieve
+        profile: How much of the event to return: "full", "summary" (title, times,
+            location, status, link) or "ids-only" (default: "full")
     Returns:
         Detailed event information with formatted content
     """
-    token = _get_google_token()
-    response = await _fetch_calendar_data(
+    fields = event_fields_mask(profile)
+    if _event_store is not None:
+        event = _event_store.get_event(event_id)
+        if event is not None:
+            return format_event_to_document(event, profile)
+    
+    token = await _get_google_token()
+    cached = _event_cache.get(event_id, profile)
+    if cached is not None:
+        _event_cache.revalidations += 1
+    response = await _fetch_calendar_data_if_changed(
         token,
-        f"{CALENDAR_API_BASE}/calendars/primary/events/{event_id}"
+        f"{CALENDAR_API_BASE}/calendars/primary/events/{event_id}",
+        etag=cached[0] if cached else None,
+        params={"fields": fields} if fields else None
     )
     
-    return format_event_to_document(response)
+    # 304 Not Modified - reuse the document rendered last time, no parsing needed
+    if response is None:
+        _event_cache.hits += 1
+        return cached[1]
+    
+    _event_cache.misses += 1
+    document = format_event_to_document(response, profile)
+    _event_cache.put(event_id, response.get("etag"), document, profile)
+    return document
 
 
 # destructiveHint=True triggers safety prompts, asking the user to confirm
@@ -281,16 +1041,62 @@ async def firstname_lastname_delete_calendar_event(ctx: Context, event_id: str):
     Returns:
         Success confirmation
     """
-    token = _get_google_token()
+    token = await _get_google_token()
     await _modify_calendar_data(
         token,
         f"{CALENDAR_API_BASE}/calendars/primary/events/{event_id}",
         method="DELETE"
     )
     
+    _forget_deleted_event(event_id)
+    
     return {"success": True, "message": f"Event {event_id} deleted successfully"}
 
 
+# How many times a PATCH is retried after a 412 Precondition Failed
+PATCH_MAX_RETRIES = int(os.getenv("CALENDAR_PATCH_MAX_RETRIES", "3"))
+
+
+def _known_event_etag(event_id: str):
+    """Look up an event's ETag from the local caches, without calling Google"""
+    etag = _event_cache.known_etag(event_id)
+    if etag is not None:
+        return etag
+    if _event_store is not None:
+        event = _event_store.get_event(event_id)
+        if event is not None:
+            return event.get("etag")
+    return None
+
+
+async def _patch_calendar_event(access_token: str, event_id: str, url: str, changes: dict):
+    """Apply changes with PATCH + If-Match (optimistic concurrency)
+
+    If-Match makes Google reject the write with 412 when the event changed
+    since we saw that ETag. On 412 we re-read the current ETag and try again;
+    PATCH only touches the fields in changes, so whatever the other writer
+    changed is kept. The GET only happens when no ETag is known locally.
+    """
+    etag = _known_event_etag(event_id)
+    for attempt in range(PATCH_MAX_RETRIES + 1):
+        if etag is None:
+            current_event = await _fetch_calendar_data(access_token, url)
+            etag = current_event.get("etag")
+        try:
+            return await _modify_calendar_data(
+                access_token,
+                url,
+                method="PATCH",
+                json_payload=changes,
+                extra_headers={"If-Match": etag} if etag else None
+            )
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code != 412 or attempt == PATCH_MAX_RETRIES:
+                raise
+            print(f"Event {event_id} changed concurrently, retrying update ({attempt + 1}/{PATCH_MAX_RETRIES})")
+            _event_cache.invalidate(event_id)
+            etag = None
+
 # destructiveHint=True triggers safety prompts, asking the user to confirm
 # before updating a calendar event (prevents accidental data modifications)
 @mcp.tool(annotations={"destructiveHint": True})
@@ -302,7 +1108,8 @@ async def firstname_lastname_update_calendar_event(
     end_time: str = None,
     description: str = None,
     location: str = None,
-    attendees: str = None
+    attendees: str = None,
+    use_patch: bool = False
 ):
     """Update an existing calendar event
     Args:
@@ -314,44 +1121,212 @@ async def firstname_lastname_update_calendar_event(
         description: New event description (optional)
         location: New event location (optional)
         attendees: New comma-separated list of email addresses (optional)
+        use_patch: Send only the changed fields in one PATCH request, guarded by the
+            event's ETag, instead of a GET followed by a full PUT (default: False)
     Returns:
         Updated event details with formatted information
     """
-    token = _get_google_token()
+    token = await _get_google_token()
+    url = f"{CALENDAR_API_BASE}/calendars/primary/events/{event_id}"
     
-    # First, get the current event
-    current_event = await _fetch_calendar_data(
-        token,
-        f"{CALENDAR_API_BASE}/calendars/primary/events/{event_id}"
-    )
+    # Collect only the provided fields
+    changes = _build_event_changes(title, start_time, end_time, description, location, attendees)
     
-    # Update only the provided fields
-    if title is not None:
-        current_event["summary"] = title
-    if description is not None:
-        current_event["description"] = description
-    if location is not None:
-        current_event["location"] = location
-    if start_time is not None:
-        current_event["start"] = {"dateTime": start_time, "timeZone": "UTC"}
-    if end_time is not None:
-        current_event["end"] = {"dateTime": end_time, "timeZone": "UTC"}
-    if attendees is not None:
-        email_list = [email.strip() for email in attendees.split(",")]
-        current_event["attendees"] = [{"email": email} for email in email_list]
+    if use_patch:
+        response = await _patch_calendar_event(token, event_id, url, changes)
+    else:
+        # First, get the current event, then send the whole thing back with the changes
+        # (copied, since the fetched dict may be shared with concurrent readers)
+        current_event = dict(await _fetch_calendar_data(token, url))
+        current_event.update(changes)
+        response = await _modify_calendar_data(
+            token,
+            url,
+            method="PUT",
+            json_payload=current_event
+        )
     
-    response = await _modify_calendar_data(
-        token,
-        f"{CALENDAR_API_BASE}/calendars/primary/events/{event_id}",
-        method="PUT",
-        json_payload=current_event
-    )
+    return _remember_written_event(response)
+
+
+async def _run_bulk(access_token: str, prepared: list):
+    """Send the valid operations in prepared as batches
+
+    prepared holds an operation dict per item, or an error message string for
+    items that failed validation. Returns a list of (success, body or error)
+    aligned with prepared.
+    """
+    to_send = [index for index, operation in enumerate(prepared) if isinstance(operation, dict)]
+    results = await _run_batched(access_token, [prepared[index] for index in to_send])
+    outcomes = [(False, operation) for operation in prepared]
+    for index, result in zip(to_send, results):
+        status = result["status"]
+        if status is not None and status < 300:
+            outcomes[index] = (True, result["body"])
+        else:
+            error = (result["body"] or {}).get("error", {})
+            message = error.get("message", "Unknown error") if isinstance(error, dict) else str(error)
+            outcomes[index] = (False, f"{status}: {message}" if status else message)
+    return outcomes
+
+
+def _bulk_summary(results: list):
+    succeeded = sum(1 for result in results if result["success"])
+    return {"results": results, "succeeded": succeeded, "failed": len(results) - succeeded}
+
+
+# destructiveHint=True triggers safety prompts, asking the user to confirm
+# before creating calendar events (prevents accidental data modifications)
+@mcp.tool(annotations={"destructiveHint": True})
+async def firstname_lastname_bulk_create_calendar_events(ctx: Context, events: list[dict]):
+    """Create many calendar events at once, packed into batch requests
+    Args:
+        ctx: Request context
+        events: Events to create. Each has "title", "start_time" and "end_time", and optionally
+            "description", "location" and "attendees" (same formats as create_calendar_event)
+    Returns:
+        One result per event, in input order, with the created event or the error
+    """
+    token = await _get_google_token()
+    prepared = []
+    for event in events:
+        if not all(event.get(field) for field in ("title", "start_time", "end_time")):
+            prepared.append("title, start_time and end_time are required")
+            continue
+        prepared.append({
+            "method": "POST",
+            "path": f"{CALENDAR_BATCH_PATH}/calendars/primary/events",
+            "body": _build_event_body(
+                event["title"],
+                event["start_time"],
+                event["end_time"],
+                event.get("description", ""),
+                event.get("location", ""),
+                event.get("attendees")
+            )
+        })
+    
+    results = []
+    for index, (success, outcome) in enumerate(await _run_bulk(token, prepared)):
+        if success:
+            results.append({"index": index, "success": True, "event": _remember_written_event(outcome)})
+        else:
+            results.append({"index": index, "success": False, "error": outcome})
+    return _bulk_summary(results)
+
+
+# destructiveHint=True triggers safety prompts, asking the user to confirm
+# before updating calendar events (prevents accidental data modifications)
+@mcp.tool(annotations={"destructiveHint": True})
+async def firstname_lastname_bulk_update_calendar_events(ctx: Context, updates: list[dict]):
+    """Update many calendar events at once, packed into batch requests
+    Args:
+        ctx: Request context
+        updates: Changes to apply. Each has "event_id" plus any of "title", "start_time",
+            "end_time", "description", "location" and "attendees"; only those fields change
+    Returns:
+        One result per update, in input order, with the updated event or the error
+    """
+    token = await _get_google_token()
+    prepared = []
+    for update in updates:
+        changes = _build_event_changes(
+            update.get("title"),
+            update.get("start_time"),
+            update.get("end_time"),
+            update.get("description"),
+            update.get("location"),
+            update.get("attendees")
+        )
+        if not update.get("event_id"):
+            prepared.append("event_id is required")
+        elif not changes:
+            prepared.append("No fields to update")
+        else:
+            prepared.append({
+                "method": "PATCH",
+                "path": f"{CALENDAR_BATCH_PATH}/calendars/primary/events/{update['event_id']}",
+                "body": changes
+            })
+    
+    results = []
+    for index, (success, outcome) in enumerate(await _run_bulk(token, prepared)):
+        event_id = updates[index].get("event_id")
+        if success:
+            results.append({"index": index, "event_id": event_id, "success": True, "event": _remember_written_event(outcome)})
+        else:
+            results.append({"index": index, "event_id": event_id, "success": False, "error": outcome})
+    return _bulk_summary(results)
+
+
+# destructiveHint=True triggers safety prompts, asking the user to confirm
+# before deleting calendar events (prevents accidental data loss)
+@mcp.tool(annotations={"destructiveHint": True})
+async def firstname_lastname_bulk_delete_calendar_events(ctx: Context, event_ids: list[str]):
+    """Delete many calendar events at once, packed into batch requests
+    Args:
+        ctx: Request context
+        event_ids: IDs of the events to delete
+    Returns:
+        One result per event ID, in input order, with success or the error
+    """
+    token = await _get_google_token()
+    prepared = [
+        {"method": "DELETE", "path": f"{CALENDAR_BATCH_PATH}/calendars/primary/events/{event_id}"}
+        for event_id in event_ids
+    ]
     
-    return format_event_to_document(response)
+    results = []
+    for index, (success, outcome) in enumerate(await _run_bulk(token, prepared)):
+        if success:
+            _forget_deleted_event(event_ids[index])
+            results.append({"index": index, "event_id": event_ids[index], "success": True})
+        else:
+            results.append({"index": index, "event_id": event_ids[index], "success": False, "error": outcome})
+    return _bulk_summary(results)
+
+
+@mcp.tool()
+async def firstname_lastname_get_client_stats(ctx: Context):
+    """Report cache and rate limiting counters for the calendar tools
+    Args:
+        ctx: Request context
+    Returns:
+        Hit/miss/revalidation counters for the event cache, the local event store state,
+        throttling/retry counters from the Google API rate limiter, how many reads
+        were coalesced with an identical request in flight, and access token refreshes
+    """
+    stats = {
+        "event_cache": _event_cache.stats(),
+        "rate_limiter": google_rate_limit.stats(),
+        "request_coalescing": _read_flight.stats(),
+        "access_token": _token_provider.stats()
+    }
+    if _event_store is not None:
+        stats["event_store"] = {
+            "events": len(_event_store),
+            "synced": _event_store.is_synced,
+            "seconds_since_sync": _event_store.seconds_since_sync()
+        }
+    return stats
+
+
+async def _serve_streamable_http():
+    # The shared HTTP client lives exactly as long as the server process: it is
+    # opened before the server starts accepting requests and closed after shutdown.
+    # (FastMCP's own lifespan hook runs once per client session, which would tear
+    # the connection pool down every time a session ends.)
+    async with http_client_lifespan():
+        async with anyio.create_task_group() as task_group:
+            if _event_store is not None:
+                task_group.start_soon(_run_event_store_sync)
+            await mcp.run_streamable_http_async()
+            # Server has stopped - stop the background sync with it
+            task_group.cancel_scope.cancel()
 
 
 # Use streamable-http transport to enable streaming responses over HTTP.
 # This allows the server to send data to the client incrementally (in chunks),
 # improving responsiveness for long-running or large operations.
 if __name__ == "__main__":
-    mcp.run(transport="streamable-http")
+    anyio.run(_serve_streamable_http)
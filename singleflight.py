@@ -0,0 +1,173 @@
+"""
+Request coalescing ("singleflight") for identical concurrent API calls.
+
+When several tool calls ask Google the same question at the same moment, only
+the first one (the leader) actually calls the API; the others wait for it and
+receive the same result. Optionally, results are also kept for a short TTL so
+back-to-back identical calls (e.g. a client polling the next meeting) are
+answered locally.
+
+    flight = AsyncSingleFlight(ttl=1.0)
+    data = await flight.do(key, lambda: fetch(url, params))
+
+SingleFlight is the same thing for threads (synchronous googleapiclient code).
+
+Every waiter receives the *same* result object, so callers must not mutate it;
+copy it first if you need to change it. Errors are shared with every waiter but
+never cached. Call clear() after a write so later reads see fresh data.
+"""
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+
+_MISSING = object()
+
+
+class _FlightBase:
+    def __init__(self, ttl: float = 0.0, max_cached: int = 256):
+        self.ttl = ttl
+        self.max_cached = max_cached
+        self._cache = OrderedDict()  # key -> (expires_at, result)
+        # Bumped by clear(): a call that started before a write must not
+        # cache its (possibly stale) result afterwards
+        self._generation = 0
+        self.executed = 0    # calls that went upstream
+        self.coalesced = 0   # calls that joined a call already in flight
+        self.cache_hits = 0  # calls answered from the TTL cache
+
+    def _cached(self, key):
+        entry = self._cache.get(key)
+        if entry is None:
+            return _MISSING
+        expires_at, result = entry
+        if time.monotonic() >= expires_at:
+            del self._cache[key]
+            return _MISSING
+        self._cache.move_to_end(key)
+        return result
+
+    def _store(self, key, result, generation):
+        if self.ttl <= 0 or generation != self._generation:
+            return
+        self._cache[key] = (time.monotonic() + self.ttl, result)
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.max_cached:
+            self._cache.popitem(last=False)
+
+    def stats(self):
+        total = self.executed + self.coalesced + self.cache_hits
+        return {
+            "executed": self.executed,
+            "coalesced": self.coalesced,
+            "cache_hits": self.cache_hits,
+            "saved_ratio": round((self.coalesced + self.cache_hits) / total, 3) if total else 0.0,
+            "in_flight": len(self._calls),
+            "cached": len(self._cache)
+        }
+
+
+class AsyncSingleFlight(_FlightBase):
+    """Coalesce identical concurrent coroutine calls (single event loop)"""
+
+    def __init__(self, ttl: float = 0.0, max_cached: int = 256):
+        super().__init__(ttl, max_cached)
+        self._calls = {}  # key -> shared asyncio.Task
+
+    async def do(self, key, fn):
+        """Return fn()'s result, sharing one call among concurrent callers with the same key
+
+        fn is a zero-argument function returning a coroutine.
+        """
+        cached = self._cached(key)
+        if cached is not _MISSING:
+            self.cache_hits += 1
+            return cached
+
+        task = self._calls.get(key)
+        if task is None:
+            self.executed += 1
+            task = asyncio.ensure_future(fn())
+            self._calls[key] = task
+            generation = self._generation
+            task.add_done_callback(lambda done: self._finish(key, done, generation))
+        else:
+            self.coalesced += 1
+        # shield: one waiter being cancelled must not cancel the call for the others
+        return await asyncio.shield(task)
+
+    def _finish(self, key, task, generation):
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        if not task.cancelled() and task.exception() is None:
+            self._store(key, task.result(), generation)
+
+    def clear(self):
+        """Forget cached results and in-flight calls (e.g. after a write)"""
+        self._generation += 1
+        self._cache.clear()
+        self._calls.clear()
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight(_FlightBase):
+    """Coalesce identical concurrent calls made from different threads"""
+
+    def __init__(self, ttl: float = 0.0, max_cached: int = 256):
+        super().__init__(ttl, max_cached)
+        self._calls = {}  # key -> _Call
+        self._lock = threading.Lock()
+
+    def do(self, key, fn):
+        """Return fn()'s result, sharing one call among concurrent callers with the same key"""
+        with self._lock:
+            cached = self._cached(key)
+            if cached is not _MISSING:
+                self.cache_hits += 1
+                return cached
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                self.executed += 1
+                call = _Call()
+                self._calls[key] = call
+                generation = self._generation
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                if self._calls.get(key) is call:
+                    del self._calls[key]
+                if call.error is None:
+                    self._store(key, call.result, generation)
+            call.done.set()
+
+    def clear(self):
+        """Forget cached results and in-flight calls (e.g. after a write)"""
+        with self._lock:
+            self._generation += 1
+            self._cache.clear()
+            self._calls.clear()
+
+    def stats(self):
+        with self._lock:
+            return super().stats()
@@ -0,0 +1,112 @@
+import os
+import pickle
+import re
+import sys
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from google.oauth2.credentials import Credentials
+
+
+def write_token(workdir):
+    """Save credentials that are valid for a day (but can't reach Google) as workdir/token.pkl"""
+    creds = Credentials(
+        token="test-token",
+        refresh_token="test-refresh",
+        token_uri="https://oauth2.googleapis.com/token",
+        client_id="test",
+        client_secret="test",
+        expiry=datetime.now(timezone.utc).replace(tzinfo=None) + timedelta(days=1)
+    )
+    with open(os.path.join(workdir, "token.pkl"), "wb") as token_file:
+        pickle.dump(creds, token_file)
+
+
+@pytest.fixture
+def cooking(tmp_path, monkeypatch):
+    """cooking.py with a throwaway token.pkl; tests swap in their own Google services
+
+    cooking reads token.pkl and keeps its transcript cache in the working
+    directory, so both live in tmp_path.
+    """
+    write_token(str(tmp_path))
+    monkeypatch.chdir(tmp_path)
+    import cooking
+    cooking._events_list_flight.clear()
+    return cooking
+
+
+class _Response(dict):
+    def __init__(self, status, headers):
+        super().__init__(headers)
+        self.status = status
+        self.reason = "OK"
+
+
+class _MediaHttp:
+    """Answers MediaIoBaseDownload's ranged GETs from bytes in memory"""
+
+    def __init__(self, data):
+        self.data = data
+        self.requests = 0
+
+    def request(self, uri, method="GET", **kwargs):
+        self.requests += 1
+        first, last = map(int, re.match(r"bytes=(\d+)-(\d+)", kwargs["headers"]["range"]).groups())
+        content = self.data[first:last + 1]
+        return _Response(206, {"content-range": f"bytes {first}-{first + len(content) - 1}/{len(self.data)}"}), content
+
+
+class _MediaRequest:
+    def __init__(self, data):
+        self.uri = "https://www.googleapis.com/drive/v3/files/recording?alt=media"
+        self.headers = {}
+        self.http = _MediaHttp(data)
+
+
+class FakeDrive:
+    """Drive service whose files().get_media() serves the files in self.files"""
+
+    def __init__(self, files=None):
+        self.files_by_id = dict(files or {})
+
+    def files(self):
+        return self
+
+    def get_media(self, fileId):
+        return _MediaRequest(self.files_by_id[fileId])
+
+
+@pytest.fixture
+def drive():
+    return FakeDrive()
+
+
+# Stands in for ffmpeg: copies the input (stdin or a file) to stdout as if it
+# were already PCM, after writing FAKE_FFMPEG_STDERR_BYTES bytes of log to
+# stderr, and exits with FAKE_FFMPEG_EXIT
+_FAKE_FFMPEG = r"""
+import os, sys
+source = sys.argv[1]
+data = sys.stdin.buffer.read() if source == "pipe:0" else open(source, "rb").read()
+sys.stderr.buffer.write(b"x" * (int(os.environ["FAKE_FFMPEG_STDERR_BYTES"]) - 4) + b"end\n")
+sys.stderr.flush()
+sys.stdout.buffer.write(data)
+sys.exit(int(os.environ["FAKE_FFMPEG_EXIT"]))
+"""
+
+
+@pytest.fixture
+def fake_ffmpeg(monkeypatch):
+    """Run decode_drive_file against a passthrough ffmpeg; returns a function to set its stderr size and exit code"""
+    import meeting_audio
+
+    monkeypatch.setattr(meeting_audio.shutil, "which", lambda name: sys.executable)
+    monkeypatch.setattr(meeting_audio, "ffmpeg_command", lambda source="pipe:0": [sys.executable, "-c", _FAKE_FFMPEG, source])
+
+    def configure(stderr_bytes=4, exit_code=0):
+        monkeypatch.setenv("FAKE_FFMPEG_STDERR_BYTES", str(stderr_bytes))
+        monkeypatch.setenv("FAKE_FFMPEG_EXIT", str(exit_code))
+
+    configure()
+    return configure
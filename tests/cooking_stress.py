@@ -0,0 +1,52 @@
+"""
+A concurrent cooking.py workload against a local Calendar stub.
+
+handler is the stub's events.list: it names every event after the calendar
+it was listed from. stress makes `calls` aubrey_next_meeting calls, each for
+its own calendar, `concurrency` at a time, so a response delivered to the
+wrong call shows up as a wrong title.
+
+Used by tests/test_cooking_threads.py and benchmarks/bench_cooking_threads.py.
+"""
+import asyncio
+import time
+from urllib.parse import unquote, urlparse
+
+from tests.stub_server import json_response
+
+
+def handler(method, path, headers, body):
+    # GET /calendars/<calendar id>/events?... (api_endpoint replaces the /calendar/v3 base)
+    calendar_id = unquote(urlparse(path).path.split("/")[2])
+    time.sleep(0.002)
+    return json_response({
+        "timeZone": "UTC",
+        "items": [{
+            "id": f"event-{calendar_id}",
+            "summary": calendar_id,
+            "start": {"dateTime": "2026-03-02T10:00:00Z"},
+            "end": {"dateTime": "2026-03-02T11:00:00Z"}
+        }]
+    })
+
+
+async def stress(cooking, calls, concurrency):
+    """Returns (seconds, latencies in ms, error messages, responses for the wrong calendar)"""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies, errors, wrong = [], [], 0
+
+    async def one(i):
+        nonlocal wrong
+        calendar_id = f"calendar-{i}"
+        async with semaphore:
+            start = time.perf_counter()
+            result = await cooking.next_meeting(calendar_id=calendar_id)
+            latencies.append((time.perf_counter() - start) * 1000)
+        if "error" in result:
+            errors.append(result["error"])
+        elif result["title"] != calendar_id:
+            wrong += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(calls)))
+    return time.perf_counter() - start, latencies, errors, wrong
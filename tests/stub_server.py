@@ -0,0 +1,76 @@
+"""
+Tiny local HTTP server used by the tests (and benchmarks) in place of googleapis.com.
+
+Each caller passes a handler function that receives the request and returns
+(status, headers, body). The server speaks HTTP/1.1 with keep-alive so that
+clients which pool connections can actually reuse them.
+"""
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def json_response(payload, status=200, headers=None):
+    """Build a (status, headers, body) tuple with a JSON body"""
+    response_headers = {"Content-Type": "application/json"}
+    if headers:
+        response_headers.update(headers)
+    return status, response_headers, json.dumps(payload).encode()
+
+
+class StubServer:
+    """
+    Run a handler on a background thread at http://127.0.0.1:<port>
+
+    Usage:
+        with StubServer(handler) as server:
+            url = server.url + "/calendar/v3/..."
+    """
+
+    def __init__(self, handler):
+        self.handler = handler
+        self.request_count = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._make_request_handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        host, port = self._server.server_address
+        return f"http://{host}:{port}"
+
+    def _make_request_handler(self):
+        stub = self
+
+        class _RequestHandler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # Enables keep-alive
+            disable_nagle_algorithm = True  # Headers and body go out as separate writes
+
+            def _handle(self):
+                length = int(self.headers.get("Content-Length", 0))
+                body = self.rfile.read(length) if length else b""
+                with stub._lock:
+                    stub.request_count += 1
+                status, headers, payload = stub.handler(self.command, self.path, self.headers, body)
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            do_GET = do_POST = do_PUT = do_PATCH = do_DELETE = _handle
+
+            def log_message(self, format, *args):
+                pass  # Keep test and benchmark output readable
+
+        return _RequestHandler
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._server.shutdown()
+        self._server.server_close()
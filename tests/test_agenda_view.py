@@ -0,0 +1,85 @@
+"""
+AgendaViews over a fake events.list for a calendar far from UTC: all-day
+events fall on the calendar's days, not UTC's, and timezone() reports the
+calendar's zone.
+"""
+from datetime import date, datetime, time, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+import pytest
+
+import agenda_view
+from calendar_store import CalendarEventStore
+
+AUCKLAND = "Pacific/Auckland"  # UTC+12/+13: its midnight is the previous UTC day
+
+
+def iso(moment):
+    return moment.astimezone(timezone.utc).isoformat().replace("+00:00", "Z")
+
+
+def all_day(event_id, day):
+    return {"id": event_id, "summary": event_id, "status": "confirmed",
+            "start": {"date": day.isoformat()}, "end": {"date": (day + timedelta(days=1)).isoformat()}}
+
+
+class FakeEventsList:
+    def __init__(self, events, time_zone):
+        self.events = events
+        self.time_zone = time_zone
+
+    def list_page(self, calendar_id, params):
+        return {"items": list(self.events), "timeZone": self.time_zone, "nextSyncToken": "sync-1"}
+
+
+DAY = date.today() + timedelta(days=3)
+MIDNIGHT = datetime.combine(DAY, time(), ZoneInfo(AUCKLAND))
+
+
+@pytest.fixture
+def agenda():
+    return agenda_view.AgendaViews(FakeEventsList([all_day("holiday", DAY)], AUCKLAND).list_page)
+
+
+def ids(events):
+    return [event["id"] for event in events]
+
+
+def test_all_day_events_start_at_the_calendars_midnight(agenda):
+    # The calendar's day DAY, in UTC: it starts (and ends) half a day before DAY 00:00Z
+    day_in_utc = agenda.list_events("primary", iso(MIDNIGHT), iso(MIDNIGHT + timedelta(days=1)))
+    assert ids(day_in_utc) == ["holiday"]
+
+    # The UTC evening after the calendar's day ends is no longer inside it
+    after = MIDNIGHT + timedelta(days=1)
+    assert agenda.list_events("primary", iso(after), iso(after + timedelta(hours=6))) == []
+    before = MIDNIGHT - timedelta(hours=6)
+    assert agenda.list_events("primary", iso(before), iso(MIDNIGHT)) == []
+
+
+def test_timezone_is_the_calendars(agenda):
+    assert agenda.timezone("primary") == "UTC"  # not synced yet
+    agenda.list_events("primary", iso(MIDNIGHT), iso(MIDNIGHT + timedelta(hours=1)))
+    assert agenda.timezone("primary") == AUCKLAND
+
+
+def test_store_moves_all_day_events_when_the_time_zone_changes():
+    store = CalendarEventStore(days_back=1, days_ahead=10)
+    store.start_sync()
+    store.apply_page({"items": [all_day("holiday", DAY)], "timeZone": "UTC", "nextSyncToken": "1"})
+    # The UTC afternoon of DAY: inside DAY in UTC, after DAY has ended in Auckland
+    afternoon = datetime.combine(DAY, time(15), timezone.utc)
+    assert ids(store.list_events(iso(afternoon), iso(afternoon + timedelta(minutes=1)))) == ["holiday"]
+
+    store.start_sync()
+    store.apply_page({"items": [], "timeZone": AUCKLAND, "nextSyncToken": "2"})
+
+    assert store.timezone == AUCKLAND
+    assert store.list_events(iso(afternoon), iso(afternoon + timedelta(minutes=1))) == []
+    assert ids(store.list_events(iso(MIDNIGHT), iso(MIDNIGHT + timedelta(minutes=1)))) == ["holiday"]
+
+
+def test_unknown_time_zone_keeps_utc():
+    store = CalendarEventStore()
+    store.set_timezone("Not/AZone")
+    assert store.timezone == "UTC"
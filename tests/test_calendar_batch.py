@@ -0,0 +1,148 @@
+"""
+calendar_batch: the multipart/mixed encoding of batch requests and responses,
+round-tripped through the parsers, plus simple_calendar resending the calls
+Google rate-limited inside a batch.
+"""
+import asyncio
+
+import httpx
+import pytest
+
+import google_rate_limit
+import simple_calendar
+from calendar_batch import build_batch_request, build_batch_response, parse_batch_request, parse_batch_response
+
+OPERATIONS = [
+    {"method": "POST", "path": "/calendar/v3/calendars/primary/events", "body": {"summary": "Standup"}},
+    {"method": "DELETE", "path": "/calendar/v3/calendars/primary/events/abc123"},
+    {"method": "PATCH", "path": "/calendar/v3/calendars/primary/events/def456",
+     "headers": {"If-Match": '"etag-1"'}, "body": {"summary": "Retro", "location": "Room 2"}},
+]
+
+
+def test_request_round_trip():
+    content_type, body = build_batch_request(OPERATIONS, boundary="batch_test")
+
+    assert content_type == "multipart/mixed; boundary=batch_test"
+    operations = parse_batch_request(content_type, body)
+    assert [operation["index"] for operation in operations] == [0, 1, 2]
+    for parsed, original in zip(operations, OPERATIONS):
+        assert parsed["method"] == original["method"]
+        assert parsed["path"] == original["path"]
+        assert parsed["body"] == original.get("body")
+    assert operations[2]["headers"]["if-match"] == '"etag-1"'
+
+
+def test_response_parts_are_put_back_in_content_id_order():
+    content_type, body = build_batch_response([(2, 200, {"id": "c"}), (0, 200, {"id": "a"}), (1, 200, {"id": "b"})])
+
+    results = parse_batch_response(content_type, body)
+
+    assert [result["index"] for result in results] == [0, 1, 2]
+    assert [result["body"]["id"] for result in results] == ["a", "b", "c"]
+
+
+def test_quoted_boundary():
+    _, body = build_batch_response([(0, 200, {"id": "a"})], boundary="batch_q=1")
+
+    results = parse_batch_response('multipart/mixed; boundary="batch_q=1"', body)
+
+    assert results[0]["body"] == {"id": "a"}
+
+
+@pytest.mark.parametrize("newline", ["\r\n", "\n"])
+def test_crlf_and_lf_bodies(newline):
+    content_type, body = build_batch_response([(0, 200, {"id": "a"}), (1, 204, None)])
+    body = body.decode().replace("\r\n", newline).encode()
+
+    results = parse_batch_response(content_type, body)
+
+    assert [(result["status"], result["body"]) for result in results] == [(200, {"id": "a"}), (204, None)]
+
+
+def test_error_and_empty_items():
+    error = {"error": {"code": 404, "message": "Not Found"}}
+    content_type, body = build_batch_response([(0, 404, error), (1, 204, None), (2, 200, {"id": "c"})])
+
+    results = parse_batch_response(content_type, body)
+
+    assert results[0]["status"] == 404
+    assert results[0]["body"] == error
+    assert results[1]["status"] == 204
+    assert results[1]["body"] is None  # delete answers with no body
+    assert results[2]["body"] == {"id": "c"}
+
+
+class RateLimitingBatchApi:
+    """Batch endpoint that answers 429 for the first `throttled` calls of every batch it is sent"""
+
+    def __init__(self, throttled, reason=None):
+        self.throttled = throttled
+        self.reason = reason
+        self.batches = []
+
+    def handle(self, request):
+        operations = parse_batch_request(request.headers["Content-Type"], request.content)
+        self.batches.append([operation["body"]["summary"] for operation in operations])
+        results = []
+        for position, operation in enumerate(operations):
+            if position < self.throttled:
+                if self.reason:
+                    status, body = 403, {"error": {"code": 403, "errors": [{"reason": self.reason}]}}
+                else:
+                    status, body = 429, {"error": {"code": 429, "message": "Rate Limit Exceeded"}}
+                results.append((operation["index"], status, body))
+            else:
+                results.append((operation["index"], 200, {"id": operation["body"]["summary"]}))
+        self.throttled = max(0, self.throttled - 1)
+        content_type, body = build_batch_response(results)
+        return httpx.Response(200, headers={"Content-Type": content_type}, content=body)
+
+
+@pytest.fixture
+def batch_api(monkeypatch):
+    saved = (google_rate_limit.BACKOFF_BASE, google_rate_limit.BACKOFF_MAX)
+    google_rate_limit.configure(backoff_base=0.001, backoff_max=0.01)
+
+    def install(api):
+        client = httpx.AsyncClient(transport=httpx.MockTransport(api.handle))
+        monkeypatch.setattr(simple_calendar, "_http_client", client)
+        return api
+
+    yield install
+    google_rate_limit.configure(backoff_base=saved[0], backoff_max=saved[1])
+
+
+def create_operations(count):
+    return [{"method": "POST", "path": "/calendar/v3/calendars/primary/events", "body": {"summary": f"e{i}"}}
+            for i in range(count)]
+
+
+@pytest.mark.parametrize("reason", [None, "rateLimitExceeded"])
+def test_rate_limited_calls_are_resent_in_a_later_batch(batch_api, reason):
+    api = batch_api(RateLimitingBatchApi(throttled=2, reason=reason))
+
+    results = asyncio.run(simple_calendar._run_batched("test-token", create_operations(4)))
+
+    assert [(result["status"], result["body"]["id"]) for result in results] == [(200, f"e{i}") for i in range(4)]
+    # Only the throttled calls were sent again
+    assert api.batches == [["e0", "e1", "e2", "e3"], ["e0", "e1"], ["e0"]]
+
+
+def test_calls_still_rate_limited_after_max_retries_are_reported(batch_api, monkeypatch):
+    monkeypatch.setattr(google_rate_limit, "MAX_RETRIES", 2)
+    api = batch_api(RateLimitingBatchApi(throttled=10))
+
+    results = asyncio.run(simple_calendar._run_batched("test-token", create_operations(2)))
+
+    assert [result["status"] for result in results] == [429, 429]
+    assert len(api.batches) == 3
+
+
+def test_other_item_errors_are_not_resent(batch_api):
+    api = batch_api(RateLimitingBatchApi(throttled=1, reason="forbidden"))
+
+    results = asyncio.run(simple_calendar._run_batched("test-token", create_operations(2)))
+
+    assert [result["status"] for result in results] == [403, 200]
+    assert len(api.batches) == 1
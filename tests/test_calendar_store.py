@@ -0,0 +1,214 @@
+"""
+CalendarEventStore kept in sync through simple_calendar against a local fake
+Calendar API: full sync, deltas, cancelled events, 410 resync and the window
+and max_events bounds.
+
+The fake serves events.list through httpx.MockTransport on simple_calendar's
+shared client, so the real sync code (_sync_event_store) drives it.
+"""
+import asyncio
+from datetime import datetime, timedelta, timezone
+from urllib.parse import parse_qs
+
+import httpx
+import pytest
+
+import simple_calendar
+from calendar_store import CalendarEventStore, parse_event_time, parse_rfc3339
+
+NOW = datetime.now(timezone.utc)
+
+
+def iso(moment):
+    return moment.isoformat().replace("+00:00", "Z")
+
+
+def make_event(event_id, hours_from_now, minutes=30):
+    start = NOW + timedelta(hours=hours_from_now)
+    return {
+        "id": event_id,
+        "summary": f"Meeting {event_id}",
+        "status": "confirmed",
+        "start": {"dateTime": iso(start)},
+        "end": {"dateTime": iso(start + timedelta(minutes=minutes))},
+    }
+
+
+class FakeCalendarApi:
+    """events.list of one calendar, with syncToken deltas like Google's
+
+    Every change is numbered; a sync token is the number of the last change
+    the client has seen, and an incremental sync returns the latest state of
+    every event changed after it (deleted ones as status "cancelled").
+    """
+
+    def __init__(self, events, page_size=2):
+        self.events = {event["id"]: event for event in events}
+        self.changes = []  # event ids, in the order they changed
+        self.page_size = page_size
+        self.expired = False
+        self.requests = []
+
+    def put(self, event):
+        self.events[event["id"]] = event
+        self.changes.append(event["id"])
+
+    def delete(self, event_id):
+        self.events[event_id] = {"id": event_id, "status": "cancelled"}
+        self.changes.append(event_id)
+
+    def handle(self, request):
+        params = {key: values[0] for key, values in parse_qs(request.url.query.decode()).items()}
+        self.requests.append(params)
+        if "syncToken" in params:
+            if self.expired:
+                return httpx.Response(410, json={"error": {"code": 410, "message": "Sync token is no longer valid"}})
+            changed_ids = dict.fromkeys(self.changes[int(params["syncToken"]):])
+            items = [self.events[event_id] for event_id in changed_ids]
+        else:
+            lower = parse_rfc3339(params["timeMin"]) if "timeMin" in params else None
+            upper = parse_rfc3339(params["timeMax"]) if "timeMax" in params else None
+            items = sorted(
+                (event for event in self.events.values()
+                 if event.get("status") != "cancelled"
+                 and (lower is None or parse_event_time(event["end"]) > lower)
+                 and (upper is None or parse_event_time(event["start"]) < upper)),
+                key=lambda event: parse_event_time(event["start"])
+            )
+        offset = int(params.get("pageToken", 0))
+        size = min(int(params.get("maxResults", 250)), self.page_size)
+        body = {"items": items[offset:offset + size], "timeZone": "UTC"}
+        if offset + size < len(items):
+            body["nextPageToken"] = str(offset + size)
+        elif "timeMin" not in params or "orderBy" not in params:
+            # Sync requests (no orderBy) end with a token for the next delta
+            body["nextSyncToken"] = str(len(self.changes))
+        return httpx.Response(200, json=body)
+
+
+@pytest.fixture
+def api(monkeypatch):
+    fake = FakeCalendarApi([make_event(f"e{i}", hours_from_now=i + 1) for i in range(5)])
+    client = httpx.AsyncClient(transport=httpx.MockTransport(fake.handle))
+    monkeypatch.setattr(simple_calendar, "_http_client", client)
+    monkeypatch.setattr(simple_calendar, "_get_google_token", _fake_token)
+    return fake
+
+
+async def _fake_token():
+    return "test-token"
+
+
+def sync(store):
+    asyncio.run(simple_calendar._sync_event_store(store, "test-token"))
+
+
+def stored_ids(store, time_min=None, time_max=None):
+    events = store.list_events(time_min or iso(NOW), time_max or iso(NOW + timedelta(days=2)), max_results=100)
+    return [event["id"] for event in events]
+
+
+def test_full_sync_downloads_every_page_of_the_window(api):
+    api.put(make_event("far", hours_from_now=24 * 200))  # outside a 90 day window
+    store = CalendarEventStore(days_back=30, days_ahead=90)
+    sync(store)
+
+    assert store.is_synced
+    assert len(store) == 5
+    assert stored_ids(store) == ["e0", "e1", "e2", "e3", "e4"]
+    assert len(api.requests) == 3  # 5 events, 2 per page
+    assert all("syncToken" not in request for request in api.requests)
+
+
+def test_incremental_sync_applies_deltas(api):
+    store = CalendarEventStore()
+    sync(store)
+    api.requests.clear()
+
+    api.put(make_event("new", hours_from_now=3.5))
+    api.put(make_event("e0", hours_from_now=10))  # moved later
+    sync(store)
+
+    assert [request.get("syncToken") for request in api.requests] == ["0"]
+    assert stored_ids(store) == ["e1", "e2", "new", "e3", "e4", "e0"]
+    assert store.get_event("e0")["start"] == api.events["e0"]["start"]
+
+
+def test_cancelled_events_are_removed(api):
+    store = CalendarEventStore()
+    sync(store)
+
+    api.delete("e2")
+    sync(store)
+
+    assert store.get_event("e2") is None
+    assert "e2" not in stored_ids(store)
+    assert len(store) == 4
+
+
+def test_expired_sync_token_falls_back_to_a_full_sync(api):
+    store = CalendarEventStore()
+    sync(store)
+    api.delete("e1")
+    api.put(make_event("new", hours_from_now=6))
+    api.expired = True
+    api.requests.clear()
+
+    sync(store)
+
+    assert "syncToken" in api.requests[0]
+    assert all("syncToken" not in request for request in api.requests[1:])
+    assert stored_ids(store) == ["e0", "e2", "e3", "e4", "new"]
+    assert store.is_synced
+
+
+def test_reads_outside_the_window_are_not_answered(api):
+    store = CalendarEventStore(days_back=1, days_ahead=1)
+    api.put(make_event("later", hours_from_now=48))
+    sync(store)
+
+    assert store.get_event("later") is None
+    # Starts before the window: the store can't know what it is missing
+    assert store.list_events(iso(NOW - timedelta(days=3)), iso(NOW), max_results=10) is None
+    # Ends after the window with room left under max_results
+    assert store.list_events(iso(NOW), iso(NOW + timedelta(days=3)), max_results=10) is None
+    # Inside the window
+    assert len(store.list_events(iso(NOW), iso(NOW + timedelta(hours=12)), max_results=10)) == 5
+
+    # A write outside the window isn't kept either
+    store.apply_event(make_event("also-later", hours_from_now=30))
+    assert store.get_event("also-later") is None
+
+
+def test_max_events_drops_the_furthest_events_and_shrinks_the_window(api):
+    store = CalendarEventStore(max_events=3)
+    sync(store)
+
+    assert len(store) == 3
+    assert stored_ids(store, time_max=iso(NOW + timedelta(hours=3, minutes=30))) == ["e0", "e1", "e2"]
+    assert store.window_end <= parse_event_time(api.events["e3"]["start"])
+    # e3 and e4 were dropped, so a range reaching them goes to the API
+    assert store.list_events(iso(NOW), iso(NOW + timedelta(hours=6)), max_results=10) is None
+
+
+def test_list_tool_asks_google_when_max_results_cuts_the_store_answer_short(api, monkeypatch):
+    store = CalendarEventStore()
+    sync(store)
+    monkeypatch.setattr(simple_calendar, "_event_store", store)
+    api.requests.clear()
+    time_min, time_max = iso(NOW), iso(NOW + timedelta(days=1))
+
+    complete = asyncio.run(simple_calendar.firstname_lastname_list_calendar_events(
+        None, max_results=10, time_min=time_min, time_max=time_max
+    ))
+    assert complete["total_returned"] == 5
+    assert "has_more" not in complete
+    assert api.requests == []  # answered from the store
+
+    truncated = asyncio.run(simple_calendar.firstname_lastname_list_calendar_events(
+        None, max_results=2, time_min=time_min, time_max=time_max
+    ))
+    assert truncated["total_returned"] == 2
+    assert truncated["has_more"] is True
+    assert truncated["next_page_token"] == "2"
+    assert len(api.requests) == 1
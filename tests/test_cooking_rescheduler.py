@@ -0,0 +1,73 @@
+"""
+aubrey_meeting_rescheduler must not edit the events.list result it found the
+meeting in: that dict is shared with concurrent callers and the listing cache.
+"""
+import copy
+
+import pytest
+
+
+class Request:
+    def __init__(self, result=None, error=None):
+        self.result = result
+        self.error = error
+
+    def execute(self, **kwargs):
+        if self.error:
+            raise self.error
+        return self.result
+
+
+class FakeCalendar:
+    def __init__(self, listing, update_error=None):
+        self.listing = listing
+        self.update_error = update_error
+        self.updated = []
+
+    def events(self):
+        return self
+
+    def calendars(self):
+        return self
+
+    def freebusy(self):
+        return self
+
+    def list(self, **kwargs):
+        return Request(self.listing)  # the same dict every time, like a cached listing
+
+    def get(self, **kwargs):
+        return Request({"id": "primary", "timeZone": "UTC"})
+
+    def query(self, body):
+        return Request({"calendars": {calendar["id"]: {"busy": []} for calendar in body["items"]}})
+
+    def update(self, calendarId, eventId, body):
+        self.updated.append(copy.deepcopy(body))
+        return Request(body, error=self.update_error)
+
+
+LISTING = {"items": [{
+    "id": "sync1",
+    "summary": "Weekly sync",
+    "start": {"dateTime": "2030-01-07T10:00:00Z"},
+    "end": {"dateTime": "2030-01-07T10:30:00Z"},
+}]}
+
+
+@pytest.mark.parametrize("update_error", [None, RuntimeError("backend error")])
+def test_rescheduling_by_title_leaves_the_shared_listing_alone(cooking, monkeypatch, update_error):
+    listing = copy.deepcopy(LISTING)
+    calendar = FakeCalendar(listing, update_error)
+    monkeypatch.setattr(cooking, "_calendar_service", lambda: calendar)
+
+    result = cooking.meeting_rescheduler.blocking(
+        meeting_title="Weekly sync", new_date="2030-01-08", new_time="15:00", duration_minutes=30
+    )
+
+    assert listing == LISTING
+    assert calendar.updated[0]["start"]["dateTime"] == "2030-01-08T15:00:00Z"
+    if update_error:
+        assert "error" in result
+    else:
+        assert result["new_start_time"] == "2030-01-08T15:00:00Z"
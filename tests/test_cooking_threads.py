@@ -0,0 +1,52 @@
+"""
+Many concurrent cooking.py tool calls through real googleapiclient services
+pointed at a local Calendar stub. Every call must succeed and get the events
+of the calendar it asked for: httplib2 transports aren't thread-safe, so a
+transport shared between worker threads mixes up responses.
+"""
+import asyncio
+import socket
+import threading
+
+import googleapiclient.discovery
+import pytest
+
+import google_rate_limit
+from tests.cooking_stress import handler, stress
+from tests.stub_server import StubServer
+
+CALLS = 400
+CONCURRENCY = 32
+
+
+@pytest.fixture
+def stub_calendar(cooking, monkeypatch):
+    """cooking with fresh per-thread services that talk to a local Calendar stub"""
+    saved = (google_rate_limit.RATE_PER_SECOND, google_rate_limit.BURST)
+    google_rate_limit.configure(rate_per_second=1e9, burst=10**9)
+    # A transport that lost track of its responses would otherwise wait 60 s per call
+    timeout = socket.getdefaulttimeout()
+    socket.setdefaulttimeout(5)
+    build = googleapiclient.discovery.build
+    with StubServer(handler) as stub:
+        monkeypatch.setattr(googleapiclient.discovery, "build",
+                            lambda *args, **kwargs: build(*args, client_options={"api_endpoint": stub.url + "/"},
+                                                          **kwargs))
+        # Services built by earlier tests stay in the pool threads otherwise
+        monkeypatch.setattr(cooking, "_services", threading.local())
+        yield cooking
+    socket.setdefaulttimeout(timeout)
+    google_rate_limit.configure(*saved)
+
+
+def test_concurrent_calls_get_their_own_responses(stub_calendar):
+    cooking = stub_calendar
+    built_before = cooking._service_stats["built"]
+
+    seconds, latencies, errors, wrong = asyncio.run(stress(cooking, CALLS, CONCURRENCY))
+
+    assert errors == []
+    assert wrong == 0
+    assert len(latencies) == CALLS
+    # One service per worker thread that ran a call, not one per call
+    assert 1 <= cooking._service_stats["built"] - built_before <= cooking.LIGHT_TOOL_WORKERS
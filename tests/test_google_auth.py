@@ -0,0 +1,174 @@
+"""
+AccessTokenProvider against a local fake OAuth token endpoint: one refresh
+shared by concurrent callers, refresh-ahead in the background, errors reaching
+the callers, invalidate(), and no refresher for sources that can't refresh.
+"""
+import itertools
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from urllib.parse import parse_qs
+
+import httpx
+import pytest
+
+import google_auth
+from tests.stub_server import StubServer, json_response
+
+
+class FakeTokenEndpoint:
+    """Issues token-1, token-2, ... for the refresh token "refresh" after `delay` seconds"""
+
+    def __init__(self, expires_in=3600, delay=0.0):
+        self.expires_in = expires_in
+        self.delay = delay
+        self.fail = False
+        self.requests = 0
+        self._numbers = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def __call__(self, method, path, headers, body):
+        form = parse_qs(body.decode())
+        with self._lock:
+            self.requests += 1
+        time.sleep(self.delay)
+        if self.fail or form.get("refresh_token") != ["refresh"]:
+            return json_response({"error": "invalid_grant"}, status=400)
+        return json_response({"access_token": f"token-{next(self._numbers)}", "expires_in": self.expires_in})
+
+
+@pytest.fixture
+def endpoint():
+    return FakeTokenEndpoint()
+
+
+@pytest.fixture
+def make_provider(endpoint):
+    providers = []
+    with StubServer(endpoint) as server:
+        def make(refresh_token="refresh", **kwargs):
+            source = google_auth.RefreshTokenSource("client", "secret", refresh_token, token_uri=server.url + "/token")
+            provider = google_auth.AccessTokenProvider(source, **kwargs)
+            providers.append(provider)
+            return provider
+        yield make
+        for provider in providers:
+            provider.stop()
+
+
+def wait_until(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+def call_concurrently(function, callers):
+    results = [None] * callers
+    start = threading.Barrier(callers)
+
+    def run(index):
+        start.wait()
+        try:
+            results[index] = function()
+        except Exception as e:
+            results[index] = e
+
+    threads = [threading.Thread(target=run, args=(index,)) for index in range(callers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_concurrent_callers_share_one_refresh(endpoint, make_provider):
+    endpoint.delay = 0.2
+    provider = make_provider()
+
+    tokens = call_concurrently(provider.get_token, callers=10)
+
+    assert tokens == ["token-1"] * 10
+    assert endpoint.requests == 1
+    assert provider.refreshes == 1
+
+
+def test_token_is_refreshed_ahead_of_expiry_in_the_background(endpoint, make_provider):
+    # Tokens live 60 s and are refreshed 59.5 s early, i.e. half a second after issue
+    endpoint.expires_in = 60
+    provider = make_provider(refresh_margin=59.5)
+    assert provider.get_token() == "token-1"
+    assert provider.blocking_refreshes == 1
+
+    assert wait_until(lambda: provider.refreshes >= 2)
+    assert provider.get_token() != "token-1"
+    assert provider.blocking_refreshes == 1  # nobody waited for the background refresh
+
+
+def test_valid_token_is_used_without_asking_the_endpoint(endpoint, make_provider):
+    expiry = datetime.now(timezone.utc) + timedelta(hours=1)
+    provider = make_provider(token="cached", expiry=expiry, refresh_margin=60)
+
+    assert provider.get_token() == "cached"
+    assert endpoint.requests == 0
+
+
+def test_refresh_errors_reach_every_waiting_caller(endpoint, make_provider):
+    endpoint.delay = 0.2
+    endpoint.fail = True
+    provider = make_provider()
+
+    results = call_concurrently(provider.get_token, callers=5)
+
+    assert all(isinstance(result, httpx.HTTPStatusError) for result in results), results
+    assert all(result.response.status_code == 400 for result in results)
+    assert provider.refresh_failures >= 1
+    assert provider.stats()["has_token"] is False
+
+    # The next call tries again once the endpoint recovers
+    endpoint.fail = False
+    assert provider.get_token().startswith("token-")
+
+
+def test_invalidate_drops_only_the_token_it_names(endpoint, make_provider):
+    provider = make_provider()
+    assert provider.get_token() == "token-1"
+
+    provider.invalidate("some-older-token")
+    assert provider.get_token() == "token-1"
+    assert endpoint.requests == 1
+
+    provider.invalidate("token-1")
+    assert provider.get_token() == "token-2"
+    assert endpoint.requests == 2
+
+
+def test_static_source_without_a_token_fails_fast_and_starts_no_refresher(monkeypatch):
+    for name in ("ACCESS_TOKEN", "GOOGLE_REFRESH_TOKEN", "GOOGLE_CLIENT_ID", "GOOGLE_CLIENT_SECRET"):
+        monkeypatch.delenv(name, raising=False)
+    provider = google_auth.provider_from_env()
+
+    with pytest.raises(ValueError):
+        provider.get_token()
+    assert provider._thread is None
+
+
+def test_static_token_is_handed_out_without_a_refresher(monkeypatch):
+    monkeypatch.setenv("ACCESS_TOKEN", "static")
+    monkeypatch.delenv("GOOGLE_REFRESH_TOKEN", raising=False)
+    provider = google_auth.provider_from_env()
+
+    assert provider.get_token() == "static"
+    assert provider._thread is None
+
+
+def test_blocking_refreshes_counts_every_waiting_caller(endpoint, make_provider):
+    endpoint.delay = 0.2
+    provider = make_provider()
+
+    call_concurrently(provider.get_token, callers=20)
+
+    assert provider.stats()["blocking_refreshes"] == 20
+    assert endpoint.requests == 1
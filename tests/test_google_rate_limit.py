@@ -0,0 +1,188 @@
+"""
+google_rate_limit against a local stub that answers with injected 429s and
+5xx errors: what gets retried, what doesn't, and the counters.
+"""
+import asyncio
+import threading
+
+import httpx
+import httplib2
+import pytest
+from googleapiclient.errors import HttpError
+
+import google_rate_limit
+from tests.stub_server import StubServer, json_response
+
+
+@pytest.fixture(autouse=True)
+def fast_limiter():
+    saved = (google_rate_limit.RATE_PER_SECOND, google_rate_limit.BURST, google_rate_limit.MAX_RETRIES,
+             google_rate_limit.BACKOFF_BASE, google_rate_limit.BACKOFF_MAX)
+    google_rate_limit.configure(rate_per_second=1e6, burst=10**6, max_retries=3, backoff_base=0.001, backoff_max=0.01)
+    yield
+    google_rate_limit.configure(*saved)
+
+
+class FlakyHandler:
+    """Answers the first `failures` requests with `status`, then 200"""
+
+    def __init__(self, failures, status, headers=None, body=None):
+        self.failures = failures
+        self.status = status
+        self.headers = headers
+        self.body = body or {"error": {"code": status}}
+        self.methods = []
+        self._lock = threading.Lock()
+
+    def __call__(self, method, path, headers, body):
+        with self._lock:
+            self.methods.append(method)
+            failing = len(self.methods) <= self.failures
+        if failing:
+            return json_response(self.body, status=self.status, headers=self.headers)
+        return json_response({"ok": True})
+
+
+def call(url, method="GET", **kwargs):
+    async def run():
+        async with httpx.AsyncClient() as client:
+            return await google_rate_limit.call_async(
+                "calendar", lambda: client.request(method, url), user="test", **kwargs
+            )
+    return asyncio.run(run())
+
+
+def counters():
+    return google_rate_limit.stats()["calendar:test"]
+
+
+def test_429s_are_retried_until_the_call_succeeds():
+    handler = FlakyHandler(failures=2, status=429, headers={"Retry-After": "0"})
+    with StubServer(handler) as server:
+        response = call(server.url + "/events")
+
+    assert response.status_code == 200
+    assert len(handler.methods) == 3
+    stats = counters()
+    assert stats["calls"] == 3
+    assert stats["retries"] == 2
+    assert stats["rate_limited_responses"] == 2
+    assert stats["server_errors"] == 0
+
+
+def test_403_is_only_retried_for_rate_limit_reasons():
+    quota = FlakyHandler(failures=1, status=403, body={"error": {"errors": [{"reason": "userRateLimitExceeded"}]}})
+    with StubServer(quota) as server:
+        assert call(server.url + "/events").status_code == 200
+    assert len(quota.methods) == 2
+
+    forbidden = FlakyHandler(failures=1, status=403, body={"error": {"errors": [{"reason": "forbidden"}]}})
+    with StubServer(forbidden) as server:
+        assert call(server.url + "/events").status_code == 403
+    assert len(forbidden.methods) == 1
+
+
+def test_429s_stop_after_max_retries():
+    handler = FlakyHandler(failures=100, status=429)
+    with StubServer(handler) as server:
+        response = call(server.url + "/events")
+
+    assert response.status_code == 429
+    assert len(handler.methods) == google_rate_limit.MAX_RETRIES + 1
+
+
+@pytest.mark.parametrize("method", ["GET", "PUT", "DELETE"])
+def test_server_errors_are_retried_for_idempotent_methods(method):
+    handler = FlakyHandler(failures=1, status=503)
+    with StubServer(handler) as server:
+        response = call(server.url + "/events/e1", method=method)
+
+    assert response.status_code == 200
+    assert handler.methods == [method, method]
+    assert counters()["server_errors"] == 1
+
+
+@pytest.mark.parametrize("method", ["POST", "PATCH"])
+def test_server_errors_are_not_retried_for_other_methods(method):
+    # The event may have been created even though the response was a 5xx
+    handler = FlakyHandler(failures=1, status=500)
+    with StubServer(handler) as server:
+        response = call(server.url + "/events", method=method)
+
+    assert response.status_code == 500
+    assert handler.methods == [method]
+    assert counters()["retries"] == 0
+
+
+def test_callers_can_opt_in_or_out_of_server_error_retries():
+    handler = FlakyHandler(failures=1, status=502)
+    with StubServer(handler) as server:
+        assert call(server.url + "/batch", method="POST", retry_server_errors=True).status_code == 200
+    assert handler.methods == ["POST", "POST"]
+
+    handler = FlakyHandler(failures=1, status=502)
+    with StubServer(handler) as server:
+        assert call(server.url + "/events", retry_server_errors=False).status_code == 502
+    assert handler.methods == ["GET"]
+
+
+class FakeRequest:
+    """A googleapiclient request whose first `failures` executes raise HttpError(status)"""
+
+    def __init__(self, method, failures, status):
+        self.method = method
+        self.failures = failures
+        self.status = status
+        self.attempts = 0
+
+    def execute(self):
+        self.attempts += 1
+        if self.attempts <= self.failures:
+            raise HttpError(httplib2.Response({"status": self.status}), b'{"error": {}}')
+        return {"ok": True}
+
+
+def test_execute_retries_429_for_any_method():
+    request = FakeRequest("POST", failures=2, status=429)
+    assert google_rate_limit.execute(request, "calendar", user="test") == {"ok": True}
+    assert request.attempts == 3
+
+
+def test_execute_only_retries_server_errors_for_idempotent_methods():
+    update = FakeRequest("PUT", failures=1, status=503)
+    assert google_rate_limit.execute(update, "calendar", user="test") == {"ok": True}
+    assert update.attempts == 2
+
+    insert = FakeRequest("POST", failures=1, status=503)
+    with pytest.raises(HttpError):
+        google_rate_limit.execute(insert, "calendar", user="test")
+    assert insert.attempts == 1
+
+
+def test_counters_are_exact_under_concurrent_threads():
+    threads, calls_per_thread = 8, 500
+    request = FakeRequest("GET", failures=0, status=200)
+
+    def worker():
+        for _ in range(calls_per_thread):
+            google_rate_limit.execute(request, "calendar", user="test")
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+
+    assert counters()["calls"] == threads * calls_per_thread
+
+
+def test_bucket_throttles_calls_beyond_the_burst():
+    google_rate_limit.configure(rate_per_second=200, burst=2)
+    request = FakeRequest("GET", failures=0, status=200)
+    for _ in range(6):
+        google_rate_limit.execute(request, "calendar", user="test")
+
+    stats = counters()
+    assert stats["calls"] == 6
+    assert stats["throttled_calls"] == 4
+    assert stats["throttled_seconds"] > 0
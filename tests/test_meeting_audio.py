@@ -0,0 +1,157 @@
+"""
+meeting_audio: the MP4 layout check, cutting PCM at pauses, and decoding a
+Drive file through ffmpeg (a passthrough stand-in, or the real one on a local
+sample when it is installed).
+"""
+import io
+import shutil
+import struct
+import tempfile
+import threading
+import wave
+
+import numpy as np
+import pytest
+
+import meeting_audio
+from meeting_audio import BYTES_PER_SECOND, SAMPLE_RATE
+
+
+def box(kind, payload=b""):
+    return struct.pack(">I4s", 8 + len(payload), kind) + payload
+
+
+def tone(seconds, amplitude=8000, frequency=440):
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    return (amplitude * np.sin(2 * np.pi * frequency * t)).astype(np.int16).tobytes()
+
+
+def silence(seconds):
+    return bytes(int(seconds * SAMPLE_RATE) * 2)
+
+
+def chunked(data, size):
+    return (data[i:i + size] for i in range(0, len(data), size))
+
+
+def test_needs_seek_follows_the_top_level_boxes():
+    ftyp = box(b"ftyp", b"isom" + bytes(4))
+    assert meeting_audio.needs_seek(ftyp + box(b"moov", bytes(16)) + box(b"mdat", bytes(32))) is False
+    assert meeting_audio.needs_seek(ftyp + box(b"free", bytes(8)) + box(b"mdat", bytes(32))) is True
+    # 64-bit box size: size field 1, real size after the type
+    wide = struct.pack(">I4sQ", 1, b"free", 24) + bytes(8)
+    assert meeting_audio.needs_seek(ftyp + wide + box(b"mdat")) is True
+
+
+def test_needs_seek_assumes_streaming_when_it_cannot_tell():
+    assert meeting_audio.needs_seek(b"") is False
+    assert meeting_audio.needs_seek(b"RIFF\x00\x00\x00\x00WAVEfmt ") is False
+    # The head ends before the moov/mdat box is reached
+    assert meeting_audio.needs_seek(box(b"ftyp", bytes(8)) + struct.pack(">I4s", 1000, b"free")) is False
+
+
+def test_split_at_silence_cuts_in_the_pause_and_overlaps():
+    pcm = tone(7) + silence(0.4) + tone(12.6)  # 20 s with one pause at 7.0-7.4 s
+
+    segments = list(meeting_audio.split_at_silence(chunked(pcm, 12345), max_seconds=10, search_seconds=5,
+                                                   overlap_seconds=1))
+
+    assert [segment.index for segment in segments] == list(range(len(segments)))
+    assert all(len(segment.pcm) <= 10 * BYTES_PER_SECOND for segment in segments)
+    first_cut = len(segments[0].pcm) / BYTES_PER_SECOND
+    assert 7.0 <= first_cut <= 7.4
+    assert segments[1].start_seconds == pytest.approx(first_cut - 1)
+    # Every segment is the recording's audio from its start time on, so
+    # together they cover all of it
+    for segment in segments:
+        start = int(segment.start_seconds * BYTES_PER_SECOND)
+        assert segment.pcm == pcm[start:start + len(segment.pcm)]
+    last = segments[-1]
+    assert int(last.start_seconds * BYTES_PER_SECOND) + len(last.pcm) == len(pcm)
+
+
+def test_split_at_silence_keeps_a_short_recording_whole():
+    pcm = tone(3)
+    segments = list(meeting_audio.split_at_silence([pcm], max_seconds=10))
+    assert segments == [meeting_audio.Segment(0, 0.0, pcm)]
+
+
+def recording(seconds=3):
+    return tone(seconds) + silence(0.5)
+
+
+def test_decode_streams_the_file_through_ffmpeg(drive, fake_ffmpeg):
+    drive.files_by_id["rec"] = recording()
+
+    pcm = b"".join(meeting_audio.decode_drive_file(drive, "rec", "audio/ogg", chunk_size=64 * 1024))
+
+    assert pcm == drive.files_by_id["rec"]
+
+
+def test_decode_spools_mp4_with_media_before_index(drive, fake_ffmpeg, tmp_path, monkeypatch):
+    monkeypatch.setattr(tempfile, "tempdir", str(tmp_path))
+    drive.files_by_id["rec"] = box(b"ftyp", bytes(8)) + box(b"mdat", recording())
+
+    pcm = b"".join(meeting_audio.decode_drive_file(drive, "rec", "video/mp4", chunk_size=64 * 1024))
+
+    assert pcm == drive.files_by_id["rec"]
+    assert list(tmp_path.iterdir()) == []  # spool file removed
+
+
+def decode_in_thread(drive, file_id, timeout=30):
+    result = {}
+
+    def run():
+        try:
+            result["pcm"] = b"".join(meeting_audio.decode_drive_file(drive, file_id, "audio/ogg"))
+        except Exception as e:
+            result["error"] = e
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    thread.join(timeout)
+    assert not thread.is_alive(), "decode_drive_file hung"
+    return result
+
+
+def test_decode_survives_ffmpeg_logging_more_than_the_pipe_holds(drive, fake_ffmpeg):
+    # Pipes hold 64 KB on Linux; unread stderr would block ffmpeg before it writes any audio
+    fake_ffmpeg(stderr_bytes=4 * 1024 * 1024)
+    drive.files_by_id["rec"] = recording()
+
+    assert decode_in_thread(drive, "rec") == {"pcm": drive.files_by_id["rec"]}
+
+
+def test_decode_error_reports_the_end_of_ffmpeg_log(drive, fake_ffmpeg):
+    fake_ffmpeg(stderr_bytes=4 * 1024 * 1024, exit_code=1)
+    drive.files_by_id["rec"] = recording()
+
+    error = decode_in_thread(drive, "rec")["error"]
+
+    assert isinstance(error, meeting_audio.AudioExtractionError)
+    assert str(error).endswith("end")
+    assert len(str(error)) <= meeting_audio.STDERR_TAIL_BYTES + len("ffmpeg failed: ")
+
+
+@pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="ffmpeg not installed")
+def test_decode_wav_sample_with_real_ffmpeg(drive):
+    pcm = recording()
+    sample = io.BytesIO()
+    with wave.open(sample, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(SAMPLE_RATE)
+        wav.writeframes(pcm)
+    drive.files_by_id["rec"] = sample.getvalue()
+
+    decoded = b"".join(meeting_audio.decode_drive_file(drive, "rec", "audio/wav", chunk_size=16 * 1024))
+
+    assert decoded == pcm
+
+
+@pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="ffmpeg not installed")
+def test_damaged_file_fails_with_ffmpeg_message(drive):
+    drive.files_by_id["rec"] = b"RIFF" + bytes(100) + b"not audio" * 1000
+
+    with pytest.raises(meeting_audio.AudioExtractionError, match="ffmpeg failed"):
+        b"".join(meeting_audio.decode_drive_file(drive, "rec", "audio/wav"))
@@ -0,0 +1,218 @@
+"""
+Pretranscriber against a fake Drive changes feed: which files get analyzed,
+cached recordings skipped, the page token saved and resumed, stop(), and the
+CpuBudget on a fake clock.
+"""
+import threading
+import time
+
+import pytest
+
+from pretranscriber import CpuBudget, PageTokenStore, Pretranscriber
+
+FOLDER = "meet-recordings"
+
+
+class FakeChangesSource:
+    """A changes feed over a list of file changes; a page token is the position in that list"""
+
+    def __init__(self):
+        self.log = []
+        self.requested = []
+
+    def add(self, file_id, mime_type="video/mp4", parents=(FOLDER,), **fields):
+        self.log.append({"id": file_id, "name": f"{file_id}.mp4", "mimeType": mime_type,
+                         "parents": list(parents), "md5Checksum": f"md5-{file_id}", **fields})
+
+    def start_page_token(self):
+        return str(len(self.log))
+
+    def changes(self, page_token):
+        self.requested.append(page_token)
+        return self.log[int(page_token):], str(len(self.log))
+
+
+class Recorder:
+    """analyze and is_cached for the scheduler, remembering what they were called with"""
+
+    def __init__(self, cached=()):
+        self.cached = set(cached)
+        self.analyzed = []
+        self._lock = threading.Lock()
+
+    def analyze(self, file):
+        with self._lock:
+            self.analyzed.append(file["id"])
+
+    def is_cached(self, file):
+        return file["id"] in self.cached
+
+
+@pytest.fixture
+def store_path(tmp_path):
+    return str(tmp_path / "tokens.db")
+
+
+@pytest.fixture
+def store(store_path):
+    return PageTokenStore(store_path)
+
+
+def make_scheduler(source, recorder, store, **kwargs):
+    return Pretranscriber(source, recorder.analyze, recorder.is_cached, lambda: FOLDER, token_store=store,
+                          cpu_budget=None, **kwargs)
+
+
+def test_only_new_recordings_in_the_folder_are_analyzed(store):
+    source, recorder = FakeChangesSource(), Recorder()
+    source.add("before-start")
+    scheduler = make_scheduler(source, recorder, store)
+
+    assert scheduler.poll_once() == 0  # first poll only records where "now" is
+    source.add("recording")
+    source.add("elsewhere", parents=("other-folder",))
+    source.add("notes", mime_type="application/vnd.google-apps.document")
+    source.add("trashed", trashed=True)
+    source.add("audio-only", mime_type="audio/mp4")
+
+    assert scheduler.poll_once() == 2
+    assert sorted(recorder.analyzed) == ["audio-only", "recording"]
+    assert scheduler.poll_once() == 0  # nothing new since
+    assert scheduler.stats()["transcribed"] == 2
+
+
+def test_cached_recordings_are_skipped(store):
+    source, recorder = FakeChangesSource(), Recorder(cached={"done"})
+    scheduler = make_scheduler(source, recorder, store)
+    scheduler.poll_once()
+    source.add("done")
+    source.add("new")
+
+    scheduler.poll_once()
+
+    assert recorder.analyzed == ["new"]
+    assert scheduler.stats()["already_cached"] == 1
+
+
+def test_page_token_is_saved_and_resumed_after_a_restart(store, store_path):
+    source, recorder = FakeChangesSource(), Recorder()
+    source.add("old")
+    first = make_scheduler(source, recorder, store)
+    first.poll_once()
+    assert store.get(Pretranscriber.TOKEN_NAME) == "1"
+    source.add("a")
+    first.poll_once()
+    assert store.get(Pretranscriber.TOKEN_NAME) == "2"
+
+    # A new scheduler on the same store continues from the saved token
+    source.add("b")
+    restarted = make_scheduler(source, recorder, PageTokenStore(store_path))
+    restarted.poll_once()
+
+    assert recorder.analyzed == ["a", "b"]
+    assert source.requested == ["1", "2"]
+
+
+def test_stop_ends_the_thread(store):
+    source, recorder = FakeChangesSource(), Recorder()
+    scheduler = make_scheduler(source, recorder, store, poll_seconds=0.01)
+    scheduler.start()
+    deadline = time.monotonic() + 5
+    while scheduler.polls < 2 and time.monotonic() < deadline:
+        source.add(f"r{len(source.log)}")
+        time.sleep(0.01)
+
+    scheduler.stop(timeout=5)
+
+    assert not scheduler._thread.is_alive()
+    assert scheduler.stats()["running"] is False
+    assert scheduler.polls >= 2
+
+
+class FakeTime:
+    """Clock, CPU counter and stop event for CpuBudget; waiting advances the clock"""
+
+    def __init__(self):
+        self.now = 0.0
+        self.cpu = 0.0
+        self.stopped = False
+        self.stop_after = None  # stop once the clock reaches this
+
+    def clock(self):
+        return self.now
+
+    def cpu_seconds(self):
+        return self.cpu
+
+    def is_set(self):
+        return self.stopped
+
+    def wait(self, seconds):
+        self.now += seconds
+        if self.stop_after is not None and self.now >= self.stop_after:
+            self.stopped = True
+
+
+def make_budget(fake, fraction=0.5, window=60):
+    return CpuBudget(fraction, window=window, cpu_seconds=fake.cpu_seconds, clock=fake.clock)
+
+
+def test_budget_holds_work_until_usage_since_the_last_pass_fits():
+    fake = FakeTime()
+    budget = make_budget(fake)
+    assert budget.wait(fake) is True
+    assert budget.waited_seconds == 0
+
+    # 30 s of CPU in 20 s: at half a core that only fits in 60 s
+    fake.now, fake.cpu = 20.0, 30.0
+    assert budget.wait(fake) is True
+    assert fake.now == 60.0
+    assert budget.waited_seconds == 40.0
+
+
+def test_budget_measures_from_the_last_pass_not_from_the_start():
+    fake = FakeTime()
+    budget = make_budget(fake)
+    fake.now = 50.0  # idle for 50 s
+    assert budget.wait(fake) is True
+
+    # A burst right after: 20 s of CPU in 5 s would fit in the 55 s since
+    # the start, but not in the 5 s since the last pass
+    fake.now, fake.cpu = 55.0, 20.0
+    assert budget.wait(fake) is True
+    assert fake.now == 90.0
+    assert budget.waited_seconds == 35.0
+
+
+def test_budget_pauses_at_most_a_window_at_a_time():
+    fake = FakeTime()
+    budget = make_budget(fake, window=10)
+    fake.cpu = 100.0  # 200 s over budget
+
+    assert budget.wait(fake) is True
+    assert fake.now == 200.0
+    assert budget.waited_seconds == 200.0
+
+
+def test_budget_wait_returns_false_once_stop_is_set():
+    fake = FakeTime()
+    budget = make_budget(fake, window=10)
+    fake.cpu = 100.0
+    fake.stop_after = 25.0
+
+    assert budget.wait(fake) is False
+    assert fake.now == 30.0  # three 10 s pauses, then it noticed
+
+    fake.stopped = True
+    fake.cpu = 0.0
+    assert budget.wait(fake) is False
+
+
+def test_budget_wait_with_a_real_event_stops_promptly():
+    budget = CpuBudget(0.5, window=60, cpu_seconds=iter(range(0, 10**6, 100)).__next__)
+    stop = threading.Event()
+    threading.Timer(0.1, stop.set).start()
+
+    start = time.monotonic()
+    assert budget.wait(stop) is False
+    assert time.monotonic() - start < 5
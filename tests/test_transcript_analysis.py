@@ -0,0 +1,219 @@
+"""
+transcript_analysis against the analysis it replaced (old_analysis below, the
+baseline code from cooking.py, frozen here so the reference can't drift).
+
+Summary, questions, decisions and action items must come out the same.
+Keywords for key points and sentiment now match whole words and their
+inflections instead of any substring, so sentiment is compared on
+transcripts where no keyword hides inside an unrelated word ("no" in
+"know", "yes" in "yesterday"), and key points are checked directly.
+"""
+import random
+import re
+
+import pytest
+
+import transcript_analysis
+
+SENTENCES = [
+    "I think the rollout went well overall",
+    "We decided to move the launch to the first week of March",
+    "Priya will update the migration guide before Friday",
+    "Does anyone know when the vendor contract expires?",
+    "The main concern is the latency on the search page",
+    "Let's revisit the hiring plan next sprint",
+    "Action item: send the budget summary to finance",
+    "It is important that we keep the old endpoint running for the moment",
+    "Marco needs to check the monitoring alerts with the platform team",
+    "That sounds great, I agree with the proposal",
+    "There was a problem with the staging deploy yesterday",
+    "Can we get the design review on the calendar?",
+    "Decision: freeze the API until the audit is done",
+    "The new dashboard looks good and people like it",
+    "Sam is going to draft the announcement for the all hands",
+    "We decided that we will ship the new editor in May",
+    "They agreed to move fast, and we'll keep the old one around for a while",
+    "Decision: we're going to hire two more engineers this quarter",
+    "Marco will need to talk to the vendor about pricing",
+    "Action item: Priya has to send the contract to legal",
+    "Task: Sam should be going to review the roadmap with the team",
+]
+
+# Inflected keywords only: issues, problems, concerns, priorities, liked, agreed
+PLURALS = (
+    "We went through the open issues from the last release. Two problems were worse than we thought. "
+    "Several concerns came up about the deadline. The priorities for the quarter are set. "
+    "Everyone liked the new dashboard. We agreed to ship the fix on Monday."
+)
+
+
+def old_analysis(transcript):
+    # The analysis in cooking.py before transcript_analysis, unchanged
+    sentences = transcript.split(".")
+
+    summary_sentences = [s.strip() for s in sentences[:5] if s.strip()]
+    summary = ". ".join(summary_sentences)
+    if summary:
+        summary += "."
+
+    key_points = []
+    important_keywords = ['important', 'critical', 'key', 'priority', 'must', 'need to', 'decided', 'agreed']
+    for sentence in sentences:
+        sentence = sentence.strip()
+        if any(keyword in sentence.lower() for keyword in important_keywords) and len(sentence) > 20:
+            key_points.append(sentence)
+
+    decisions = []
+    decision_patterns = [
+        r"(?:we|I|they)\s+(?:decided|agreed|concluded|determined)\s+(?:to|that)\s+(.+?)(?:\.|,|$)",
+        r"(?:decision|conclusion):\s*(.+?)(?:\.|$)",
+        r"(?:let's|we'll|we will|we're going to)\s+(.+?)(?:\.|,|$)"
+    ]
+    for sentence in sentences:
+        for pattern in decision_patterns:
+            for match in re.finditer(pattern, sentence, re.IGNORECASE):
+                decision_text = match.group(1).strip() if match.groups() else sentence.strip()
+                if len(decision_text) > 10 and len(decision_text) < 150:
+                    decisions.append(decision_text)
+
+    questions = []
+    for sentence in sentences:
+        if '?' in sentence:
+            question = sentence.split('?')[0].strip() + '?'
+            if len(question) > 10:
+                questions.append(question)
+
+    action_items = []
+    action_patterns = [
+        r"(\w+)\s+(?:will|should|needs to|has to|must)\s+(.+?)(?:\.|,|$)",
+        r"(?:TODO|Action item|Action|Task):\s*(.+?)(?:\.|$)",
+        r"(\w+)\s+(?:to|going to)\s+(.+?)(?:\.|,|$)"
+    ]
+    for sentence in sentences:
+        sentence = sentence.strip()
+        for pattern in action_patterns:
+            for match in re.finditer(pattern, sentence, re.IGNORECASE):
+                if len(match.groups()) == 2:
+                    person = match.group(1).strip()
+                    task = match.group(2).strip()
+                else:
+                    person = "Unassigned"
+                    task = match.group(1).strip()
+                if len(task) > 10 and len(task) < 200:
+                    action_items.append({"assignee": person.capitalize(), "task": task})
+
+    unique_actions = []
+    seen_tasks = set()
+    for item in action_items:
+        task_key = item['task'].lower()[:50]
+        if task_key not in seen_tasks:
+            seen_tasks.add(task_key)
+            unique_actions.append(item)
+
+    positive_words = ['great', 'good', 'excellent', 'awesome', 'perfect', 'agree', 'yes', 'love', 'like']
+    negative_words = ['bad', 'wrong', 'issue', 'problem', 'concern', 'worried', 'no', 'disagree', 'difficult']
+    positive_count = sum(1 for word in positive_words if word in transcript.lower())
+    negative_count = sum(1 for word in negative_words if word in transcript.lower())
+
+    if positive_count > negative_count * 1.5:
+        sentiment = "Positive - Collaborative and productive discussion"
+    elif negative_count > positive_count * 1.5:
+        sentiment = "Challenging - Several concerns or issues raised"
+    else:
+        sentiment = "Neutral - Balanced discussion"
+
+    return {
+        "summary": summary,
+        "insights": {
+            "key_discussion_points": key_points[:5],
+            "decisions_made": list(set(decisions))[:5],
+            "questions_raised": questions[:5],
+            "action_items": unique_actions[:10],
+            "sentiment": sentiment,
+            "positive_indicators": positive_count,
+            "concerns_raised": negative_count
+        }
+    }
+
+
+def make_transcript(sentences, seed):
+    rng = random.Random(seed)
+    return ". ".join(rng.choice(sentences) for _ in range(30)) + "."
+
+
+def all_old_decisions(transcript):
+    # Everything old_analysis found before its [:5], one sentence at a time
+    decisions = set()
+    for sentence in transcript.split("."):
+        decisions.update(old_analysis(sentence)["insights"]["decisions_made"])
+    return decisions
+
+
+def hides_a_keyword(text):
+    """True if a sentiment keyword is part of a word that isn't one of its forms"""
+    words = set(re.findall(r"\w+", text.lower()))
+    return any(
+        keyword in word and word not in transcript_analysis.word_forms(keyword)
+        for keyword in transcript_analysis.POSITIVE_WORDS + transcript_analysis.NEGATIVE_WORDS
+        for word in words
+    )
+
+
+def assert_same_as_old(transcript):
+    old, new = old_analysis(transcript), transcript_analysis.analyze(transcript)
+    assert new["summary"] == old["summary"]
+    old_insights, new_insights = old["insights"], new["insights"]
+    assert new_insights["questions_raised"] == old_insights["questions_raised"]
+    # The old code reported an arbitrary five of its decisions (set order),
+    # the new one the first five
+    old_decisions = all_old_decisions(transcript)
+    assert set(new_insights["decisions_made"]) <= old_decisions
+    assert len(new_insights["decisions_made"]) == min(transcript_analysis.MAX_DECISIONS, len(old_decisions))
+    assert new_insights["action_items"] == old_insights["action_items"]
+    if not hides_a_keyword(transcript):
+        for name in ("sentiment", "positive_indicators", "concerns_raised"):
+            assert new_insights[name] == old_insights[name], name
+
+
+def test_overlapping_matches_are_all_reported():
+    insights = transcript_analysis.analyze("We decided that we will ship the new editor in May.")["insights"]
+    assert set(insights["decisions_made"]) == {"we will ship the new editor in May", "ship the new editor in May"}
+
+
+@pytest.mark.parametrize("sentence", SENTENCES)
+def test_each_sentence_matches_the_old_analysis(sentence):
+    assert_same_as_old(sentence + ".")
+
+
+def test_transcripts_match_the_old_analysis():
+    plain = [sentence for sentence in SENTENCES if not hides_a_keyword(sentence)]
+    assert len(plain) > 15
+    assert_same_as_old(". ".join(SENTENCES) + ".")
+    for seed in range(20):
+        assert_same_as_old(make_transcript(SENTENCES, seed))
+        assert_same_as_old(make_transcript(plain, seed))
+
+
+def test_inflected_keywords_count_like_before():
+    insights = transcript_analysis.analyze(PLURALS)["insights"]
+
+    assert insights["concerns_raised"] == 3  # issue, problem, concern
+    assert insights["positive_indicators"] == 2  # like, agree
+    assert insights["sentiment"] == "Neutral - Balanced discussion"
+    # "priorities" now counts as "priority"; the old substring check missed it
+    assert insights["key_discussion_points"] == [
+        "The priorities for the quarter are set",
+        "We agreed to ship the fix on Monday",
+    ]
+    assert not hides_a_keyword(PLURALS)
+    assert_same_as_old(PLURALS)
+
+
+def test_repeated_keywords_count_once_and_words_inside_others_not_at_all():
+    insights = transcript_analysis.analyze(
+        "Great work. Great demo, really great. I know it was a monkey patch. Not an issue."
+    )["insights"]
+
+    assert insights["positive_indicators"] == 1  # great, however often
+    assert insights["concerns_raised"] == 1  # issue; "no" isn't in "know" or "not"
+    assert insights["key_discussion_points"] == []  # "key" isn't in "monkey"
@@ -0,0 +1,114 @@
+"""
+transcription: stitching overlapping segment texts, transcribing segments
+concurrently in order, and a whole recording through the pipeline with a fake
+recognizer that "hears" words encoded as loudness.
+"""
+import threading
+import time
+
+import numpy as np
+import pytest
+
+import meeting_audio
+import transcription
+from meeting_audio import SAMPLE_RATE, Segment
+
+WORD_SECONDS = 0.5
+GAP_SECONDS = 0.25
+
+
+def spoken(words):
+    """PCM where word k is half a second at loudness 1000 + 500 k, followed by a short pause"""
+    pcm = []
+    for k in words:
+        pcm.append(np.full(int(WORD_SECONDS * SAMPLE_RATE), 1000 + 500 * k, dtype=np.int16))
+        pcm.append(np.zeros(int(GAP_SECONDS * SAMPLE_RATE), dtype=np.int16))
+    return np.concatenate(pcm).tobytes()
+
+
+class LoudnessRecognizer:
+    """Turns spoken() audio back into "word<k>"; word fragments cut by the overlap are not heard"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def transcribe(self, pcm):
+        self.calls += 1
+        samples = np.frombuffer(pcm, dtype=np.int16)
+        edges = np.flatnonzero(np.diff(np.concatenate(([0], samples != 0, [0])).astype(np.int8)))
+        words = []
+        for start, end in zip(edges[::2], edges[1::2]):
+            if end - start >= 0.4 * WORD_SECONDS * SAMPLE_RATE:
+                words.append(f"word{round((samples[start] - 1000) / 500)}")
+        return " ".join(words)
+
+
+def test_stitch_drops_words_repeated_across_boundaries():
+    assert transcription.stitch(["so we agreed to", "agreed to ship it", "ship it Friday."]) == \
+        "so we agreed to ship it Friday."
+    # Case and punctuation don't hide a repeat
+    assert transcription.stitch(["Let's wrap up, thanks.", "Thanks everyone"]) == "Let's wrap up, thanks. everyone"
+    # Nothing in common: texts are just joined
+    assert transcription.stitch(["first part", "second part"]) == "first part second part"
+
+
+def test_stitch_limits_the_overlap_it_looks_for():
+    assert transcription.stitch(["a b c", "a b c"], max_overlap_words=2) == "a b c a b c"
+    assert transcription.stitch(["a b c", "b c d"], max_overlap_words=2) == "a b c d"
+
+
+def test_transcribe_segments_keeps_order_and_bounds_concurrency():
+    lock = threading.Lock()
+    active = 0
+    most_active = 0
+
+    class SlowRecognizer:
+        def transcribe(self, pcm):
+            nonlocal active, most_active
+            with lock:
+                active += 1
+                most_active = max(most_active, active)
+            time.sleep(0.05 if pcm[0] % 2 else 0.01)  # finish out of order
+            with lock:
+                active -= 1
+            return f"segment {pcm[0]}"
+
+    segments = (Segment(index, index * 10.0, bytes([index])) for index in range(10))
+
+    texts = transcription.transcribe_segments(segments, SlowRecognizer(), parallelism=3)
+
+    assert texts == [f"segment {index}" for index in range(10)]
+    assert most_active <= 3
+
+
+def test_recording_is_transcribed_once_across_segments(drive, fake_ffmpeg):
+    words = list(range(40))  # 30 s of audio
+    drive.files_by_id["rec"] = spoken(words)
+    recognizer = LoudnessRecognizer()
+
+    result = transcription.transcribe_drive_file(drive, "rec", "audio/ogg", recognizer,
+                                                 parallelism=3, segment_seconds=6)
+
+    assert result["transcript"] == " ".join(f"word{k}" for k in words)
+    assert result["segments"] == recognizer.calls > 5
+    assert result["audio_seconds"] == len(drive.files_by_id["rec"]) / meeting_audio.BYTES_PER_SECOND
+
+
+def test_backend_without_transcribe_fails_before_any_work():
+    class Incomplete(transcription.TranscriptionBackend):
+        pass
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+    read = []
+
+    def segments():
+        read.append(True)
+        yield Segment(0, 0.0, b"\0\0")
+
+    with pytest.raises(TypeError):
+        transcription.transcribe_segments(segments(), object())
+    assert read == []
+    # Duck-typed backends need no subclassing
+    assert isinstance(LoudnessRecognizer(), transcription.TranscriptionBackend)
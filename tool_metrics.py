@@ -0,0 +1,230 @@
+"""
+Latency histograms, in-flight gauges and error counters for the MCP servers.
+
+instrument_server(mcp) does two things:
+- every tool registered with @mcp.tool afterwards is timed: duration per tool
+  and outcome, calls in flight, and errors (raised exceptions as well as the
+  {"error": ...} dicts the tools return)
+- GET /metrics on the server's HTTP port returns everything in the Prometheus
+  text format, next to the streamable-http transport
+
+Inside a tool, stages can be timed as named sub-spans, and calls to Google are
+timed by the shared rate limiter; both are attributed to the tool that is
+running (tracked with a context variable, so concurrent calls don't mix):
+
+    with tool_metrics.span("ffmpeg"):
+        subprocess.run([...])
+"""
+import contextvars
+import functools
+import inspect
+import threading
+import time
+from contextlib import contextmanager
+
+from starlette.responses import PlainTextResponse
+
+# Histogram bucket upper bounds in seconds: tool calls range from a few
+# milliseconds (cache hits) to minutes (transcribing a recording)
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+TOOL_DURATION = "mcp_tool_duration_seconds"
+TOOL_IN_FLIGHT = "mcp_tool_in_flight"
+TOOL_ERRORS = "mcp_tool_errors_total"
+SPAN_DURATION = "mcp_tool_span_duration_seconds"
+UPSTREAM_DURATION = "google_api_request_duration_seconds"
+UPSTREAM_ERRORS = "google_api_request_errors_total"
+
+_HELP = {
+    TOOL_DURATION: ("histogram", "Tool call latency by tool and outcome"),
+    TOOL_IN_FLIGHT: ("gauge", "Tool calls currently running"),
+    TOOL_ERRORS: ("counter", "Tool calls that raised or returned an error"),
+    SPAN_DURATION: ("histogram", "Latency of named stages inside a tool call"),
+    UPSTREAM_DURATION: ("histogram", "Latency of individual Google API requests by API and calling tool"),
+    UPSTREAM_ERRORS: ("counter", "Google API requests that failed (network error or HTTP 4xx/5xx)"),
+}
+
+# Name of the tool running in the current thread/task, for attributing spans
+_current_tool = contextvars.ContextVar("current_tool", default=None)
+
+
+class Histogram:
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # Last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        index = 0
+        while index < len(self.buckets) and value > self.buckets[index]:
+            index += 1
+        self.counts[index] += 1
+        self.sum += value
+        self.count += 1
+
+
+_lock = threading.Lock()
+_histograms = {}  # (metric, labels) -> Histogram
+_values = {}      # (metric, labels) -> counter or gauge value
+
+
+def _key(metric: str, labels: dict):
+    return metric, tuple(sorted(labels.items()))
+
+
+def observe(metric: str, labels: dict, seconds: float):
+    key = _key(metric, labels)
+    with _lock:
+        histogram = _histograms.get(key)
+        if histogram is None:
+            histogram = _histograms[key] = Histogram()
+        histogram.observe(seconds)
+
+
+def add(metric: str, labels: dict, amount: float = 1):
+    """Increment a counter, or move a gauge up or down"""
+    key = _key(metric, labels)
+    with _lock:
+        _values[key] = _values.get(key, 0) + amount
+
+
+def current_tool():
+    return _current_tool.get() or "none"
+
+
+@contextmanager
+def span(name: str):
+    """Time a named stage of the current tool call"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(SPAN_DURATION, {"tool": current_tool(), "span": name}, time.perf_counter() - start)
+
+
+class _UpstreamCall:
+    failed = False
+
+
+@contextmanager
+def upstream_call(api: str):
+    """Time one request to a Google API
+
+    Exceptions count as failures; callers that get an error response back
+    without an exception (httpx) set .failed on the yielded object.
+    """
+    labels = {"api": api, "tool": current_tool()}
+    call = _UpstreamCall()
+    start = time.perf_counter()
+    try:
+        yield call
+    except Exception:
+        call.failed = True
+        raise
+    finally:
+        observe(UPSTREAM_DURATION, labels, time.perf_counter() - start)
+        if call.failed:
+            add(UPSTREAM_ERRORS, labels)
+
+
+def _is_error_result(result):
+    # Tools report most failures by returning {"error": ...} rather than raising
+    return isinstance(result, dict) and "error" in result
+
+
+def instrument(fn, tool_name: str):
+    """Wrap a tool function (sync or async) to record its latency, in-flight count and errors"""
+    labels = {"tool": tool_name}
+
+    def finish(start, failed):
+        status = "error" if failed else "ok"
+        observe(TOOL_DURATION, {"tool": tool_name, "status": status}, time.perf_counter() - start)
+        if failed:
+            add(TOOL_ERRORS, labels)
+        add(TOOL_IN_FLIGHT, labels, -1)
+
+    if inspect.iscoroutinefunction(fn):
+        @functools.wraps(fn)
+        async def async_wrapper(*args, **kwargs):
+            token = _current_tool.set(tool_name)
+            add(TOOL_IN_FLIGHT, labels)
+            start = time.perf_counter()
+            failed = True
+            try:
+                result = await fn(*args, **kwargs)
+                failed = _is_error_result(result)
+                return result
+            finally:
+                finish(start, failed)
+                _current_tool.reset(token)
+        return async_wrapper
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        token = _current_tool.set(tool_name)
+        add(TOOL_IN_FLIGHT, labels)
+        start = time.perf_counter()
+        failed = True
+        try:
+            result = fn(*args, **kwargs)
+            failed = _is_error_result(result)
+            return result
+        finally:
+            finish(start, failed)
+            _current_tool.reset(token)
+    return wrapper
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels, extra=()):
+    pairs = [*labels, *extra]
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def render():
+    """Every metric in the Prometheus text exposition format"""
+    with _lock:
+        histograms = {key: (list(h.counts), h.sum, h.count, h.buckets) for key, h in _histograms.items()}
+        values = dict(_values)
+
+    lines = []
+    for metric, (kind, help_text) in _HELP.items():
+        lines.append(f"# HELP {metric} {help_text}")
+        lines.append(f"# TYPE {metric} {kind}")
+        if kind == "histogram":
+            for (name, labels), (counts, total, count, buckets) in sorted(histograms.items()):
+                if name != metric:
+                    continue
+                cumulative = 0
+                for bound, bucket_count in zip([*buckets, "+Inf"], counts):
+                    cumulative += bucket_count
+                    lines.append(f"{metric}_bucket{_format_labels(labels, [('le', bound)])} {cumulative}")
+                lines.append(f"{metric}_sum{_format_labels(labels)} {total}")
+                lines.append(f"{metric}_count{_format_labels(labels)} {count}")
+        else:
+            for (name, labels), value in sorted(values.items()):
+                if name == metric:
+                    lines.append(f"{metric}{_format_labels(labels)} {value}")
+    return "\n".join(lines) + "\n"
+
+
+def instrument_server(mcp, path: str = "/metrics"):
+    """Time every tool registered on mcp from now on, and serve the metrics at path"""
+    register_tool = mcp.tool
+
+    def tool(name=None, *args, **kwargs):
+        def decorator(fn):
+            return register_tool(name, *args, **kwargs)(instrument(fn, name or fn.__name__))
+        return decorator
+
+    mcp.tool = tool
+
+    @mcp.custom_route(path, methods=["GET"])
+    async def metrics_endpoint(request):
+        return PlainTextResponse(render(), media_type="text/plain; version=0.0.4")
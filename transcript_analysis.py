@@ -0,0 +1,213 @@
+"""
+Meeting transcript analysis in a single pass.
+
+Produces the summary and insights the meeting tools report: key discussion
+points, decisions, questions, action items and an overall sentiment. Each
+sentence is visited once:
+
+- its words are tokenized once and run through a word trie holding every
+  keyword and phrase (key-point markers, positive and negative words) with
+  their regular inflections, so "issues", "concerns", "agreed" and
+  "priorities" count, but a keyword no longer matches inside an unrelated
+  word: "no" doesn't match "know", "key" doesn't match "monkey"
+- decisions and action items use the same patterns as before, precompiled,
+  each in its own pass so overlapping matches are all reported ("we decided
+  that we will ship X" is both a "decided that" and a "we will" decision);
+  a pattern only runs on sentences containing one of the words it needs
+- lists stop growing once they hold as many items as are reported
+
+Sentiment is counted as it always was: each positive or negative keyword
+counts once if it (or an inflection of it) appears anywhere in the
+transcript, however often it is repeated.
+
+    analysis = transcript_analysis.analyze(transcript)
+    analysis["summary"], analysis["insights"]["action_items"]
+"""
+import re
+
+KEY_PHRASES = ('important', 'critical', 'key', 'priority', 'must', 'need to', 'decided', 'agreed')
+POSITIVE_WORDS = ('great', 'good', 'excellent', 'awesome', 'perfect', 'agree', 'yes', 'love', 'like')
+NEGATIVE_WORDS = ('bad', 'wrong', 'issue', 'problem', 'concern', 'worried', 'no', 'disagree', 'difficult')
+
+SUMMARY_SENTENCES = 5
+MAX_KEY_POINTS = 5
+MAX_DECISIONS = 5
+MAX_QUESTIONS = 5
+MAX_ACTION_ITEMS = 10
+
+_WORD = re.compile(r"\w+(?:'\w+)*")
+
+
+def _patterns(*patterns):
+    # (compiled pattern, lowercase strings any match contains one of), tried in order
+    return tuple((re.compile(pattern, re.IGNORECASE), needs) for pattern, needs in patterns)
+
+
+# Group 1 is the decision
+_DECISIONS = _patterns(
+    (r"(?:we|I|they)\s+(?:decided|agreed|concluded|determined)\s+(?:to|that)\s+(.+?)(?:\.|,|$)",
+     ('decided', 'agreed', 'concluded', 'determined')),
+    (r"(?:decision|conclusion):\s*(.+?)(?:\.|$)", ('decision:', 'conclusion:')),
+    (r"(?:let's|we'll|we will|we're going to)\s+(.+?)(?:\.|,|$)", ("let's", "we'll", 'we will', "we're going to"))
+)
+
+# Two groups: someone and what they will do; one group: an unassigned task
+_ACTIONS = _patterns(
+    (r"(\w+)\s+(?:will|should|needs to|has to|must)\s+(.+?)(?:\.|,|$)",
+     ('will', 'should', 'needs to', 'has to', 'must')),
+    (r"(?:TODO|Action item|Action|Task):\s*(.+?)(?:\.|$)", ('todo:', 'action item:', 'action:', 'task:')),
+    (r"(\w+)\s+(?:to|going to)\s+(.+?)(?:\.|,|$)", ('to',))
+)
+
+
+def _finditer(patterns, sentence, lowered):
+    """Matches of each pattern in turn, skipping patterns whose words aren't in the sentence"""
+    for pattern, needs in patterns:
+        if any(word in lowered for word in needs):
+            yield from pattern.finditer(sentence)
+
+
+def word_forms(phrase: str):
+    """phrase with its first word in its regular inflected forms
+
+    "issue" -> issue, issues, issued, issuing, ...; "priority" -> priorities;
+    "need to" -> needs to, needed to, ... Forms that aren't real words are
+    harmless: they never occur.
+    """
+    word, _, rest = phrase.lower().partition(" ")
+    stem = word[:-1] if word.endswith("e") else word
+    forms = {word, word + "s", word + "es", stem + "ed", stem + "ing", word + "ly"}
+    if word.endswith("y"):
+        forms |= {word[:-1] + "ies", word[:-1] + "ied"}
+    return {f"{form} {rest}".strip() for form in forms}
+
+
+class PhraseTrie:
+    """Whole-word matching of many keywords and phrases at once
+
+    Phrases are split into lowercase words and stored in a trie of words, so
+    scanning a sentence costs one dict lookup per word, however many phrases
+    there are.
+    """
+
+    def __init__(self):
+        self.root = {}
+
+    def add(self, phrase: str, label: str):
+        node = self.root
+        for word in phrase.lower().split():
+            node = node.setdefault(word, {})
+        node.setdefault(None, set()).add(label)
+
+    def matches(self, words):
+        """Yield the label of every phrase occurrence in a list of lowercase words"""
+        root = self.root
+        for start, word in enumerate(words):
+            node = root.get(word)
+            position = start + 1
+            while node is not None:
+                labels = node.get(None)
+                if labels:
+                    yield from labels
+                if position == len(words):
+                    break
+                node = node.get(words[position])
+                position += 1
+
+
+class TranscriptAnalyzer:
+    """Reusable analyzer; the keyword lists are compiled into a trie once"""
+
+    def __init__(self, key_phrases=KEY_PHRASES, positive_words=POSITIVE_WORDS, negative_words=NEGATIVE_WORDS):
+        self.trie = PhraseTrie()
+        for phrase in key_phrases:
+            for form in word_forms(phrase):
+                self.trie.add(form, "key")
+        # Sentiment labels name the keyword, so each one is counted once
+        for kind, words in (("positive", positive_words), ("negative", negative_words)):
+            for word in words:
+                for form in word_forms(word):
+                    self.trie.add(form, (kind, word))
+
+    def analyze(self, transcript: str):
+        """Summary and insights of a transcript, in the shape the meeting tools return"""
+        summary_sentences = []
+        key_points = []
+        decisions = {}  # dict as an ordered set
+        questions = []
+        action_items = []
+        seen_tasks = set()
+        sentiment_words = set()  # (kind, keyword) seen anywhere
+
+        for sentence in transcript.split("."):
+            sentence = sentence.strip()
+            if not sentence:
+                continue
+            if len(summary_sentences) < SUMMARY_SENTENCES:
+                summary_sentences.append(sentence)
+
+            lowered = sentence.lower()
+            found = set()
+            for label in self.trie.matches(_WORD.findall(lowered)):
+                if label == "key":
+                    found.add(label)
+                else:
+                    sentiment_words.add(label)
+            if "key" in found and len(key_points) < MAX_KEY_POINTS and len(sentence) > 20:
+                key_points.append(sentence)
+
+            if len(decisions) < MAX_DECISIONS:
+                for match in _finditer(_DECISIONS, sentence, lowered):
+                    decision = match.group(1).strip()
+                    if 10 < len(decision) < 150:
+                        decisions[decision] = None
+
+            if len(questions) < MAX_QUESTIONS and '?' in sentence:
+                question = sentence.split('?')[0].strip() + '?'
+                if len(question) > 10:
+                    questions.append(question)
+
+            if len(action_items) < MAX_ACTION_ITEMS:
+                for match in _finditer(_ACTIONS, sentence, lowered):
+                    if match.re.groups == 2:
+                        person, task = match.group(1), match.group(2).strip()
+                    else:
+                        person, task = "Unassigned", match.group(1).strip()
+                    task_key = task.lower()[:50]
+                    if 10 < len(task) < 200 and task_key not in seen_tasks:
+                        seen_tasks.add(task_key)
+                        action_items.append({"assignee": person.capitalize(), "task": task})
+
+        summary = ". ".join(summary_sentences)
+        if summary:
+            summary += "."
+
+        positive_count = sum(1 for kind, _ in sentiment_words if kind == "positive")
+        negative_count = len(sentiment_words) - positive_count
+        if positive_count > negative_count * 1.5:
+            sentiment = "Positive - Collaborative and productive discussion"
+        elif negative_count > positive_count * 1.5:
+            sentiment = "Challenging - Several concerns or issues raised"
+        else:
+            sentiment = "Neutral - Balanced discussion"
+
+        return {
+            "summary": summary,
+            "insights": {
+                "key_discussion_points": key_points,
+                "decisions_made": list(decisions)[:MAX_DECISIONS],
+                "questions_raised": questions,
+                "action_items": action_items[:MAX_ACTION_ITEMS],
+                "sentiment": sentiment,
+                "positive_indicators": positive_count,
+                "concerns_raised": negative_count
+            }
+        }
+
+
+_default = TranscriptAnalyzer()
+
+
+def analyze(transcript: str):
+    """Analyze a transcript with the default keyword lists"""
+    return _default.analyze(transcript)
@@ -0,0 +1,132 @@
+"""
+On-disk cache of recording transcripts and their analysis.
+
+Transcribing a recording takes minutes, and the same recording is analyzed
+over and over: every summarizer call for a meeting, and once per past meeting
+on every prep request. Entries are keyed by the Drive file id together with a
+version of its content (md5Checksum, or modifiedTime for files Drive has no
+checksum for), so a repeat costs one metadata lookup plus a local read, and a
+recording that was replaced is transcribed again.
+
+Entries live in SQLite, so they survive restarts. The total size is bounded:
+once it exceeds max_bytes the least recently used entries are dropped.
+
+    cache = TranscriptCache("transcript_cache.db")
+    result = cache.get(file_id, version)
+    if result is None:
+        result = analyze(...)
+        cache.put(file_id, version, result)
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+
+TRANSCRIPT_CACHE_PATH = os.getenv("TRANSCRIPT_CACHE_PATH", "transcript_cache.db")
+TRANSCRIPT_CACHE_MAX_MB = float(os.getenv("TRANSCRIPT_CACHE_MAX_MB", "256"))
+
+
+def file_version(file: dict):
+    """The part of a Drive file's metadata that changes when its content does"""
+    return file.get("md5Checksum") or file.get("modifiedTime") or ""
+
+
+class TranscriptCache:
+    """
+    Size-bounded LRU cache of analysis results, keyed by Drive file id and version
+
+    Args:
+        path: SQLite database file (":memory:" for a throwaway cache)
+        max_bytes: Upper bound on the stored results' total size
+    """
+
+    def __init__(self, path: str = TRANSCRIPT_CACHE_PATH, max_bytes: int = int(TRANSCRIPT_CACHE_MAX_MB * 1024 * 1024)):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        # One connection shared by the tool threads, serialized by _lock
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS transcripts ("
+            " file_id TEXT PRIMARY KEY,"
+            " version TEXT NOT NULL,"
+            " result TEXT NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " last_used REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS transcripts_last_used ON transcripts (last_used)")
+        self._db.commit()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0  # lookups that found an older version of the file
+        self.evictions = 0
+
+    def get(self, file_id: str, version: str):
+        """The cached result for this version of the file, or None"""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT version, result FROM transcripts WHERE file_id = ?", (file_id,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            if row[0] != version:
+                # The recording changed since it was analyzed
+                self._db.execute("DELETE FROM transcripts WHERE file_id = ?", (file_id,))
+                self._db.commit()
+                self.invalidations += 1
+                self.misses += 1
+                return None
+            self._db.execute("UPDATE transcripts SET last_used = ? WHERE file_id = ?", (time.time(), file_id))
+            self._db.commit()
+            self.hits += 1
+            return json.loads(row[1])
+
+    def contains(self, file_id: str, version: str):
+        """True if this version of the file is cached; doesn't count as a lookup or refresh its LRU position"""
+        with self._lock:
+            row = self._db.execute("SELECT version FROM transcripts WHERE file_id = ?", (file_id,)).fetchone()
+        return row is not None and row[0] == version
+
+    def put(self, file_id: str, version: str, result: dict):
+        """Store a JSON-serializable result, then evict old entries over the size bound"""
+        encoded = json.dumps(result)
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO transcripts (file_id, version, result, size, last_used) VALUES (?, ?, ?, ?, ?)",
+                (file_id, version, encoded, len(encoded), time.time())
+            )
+            total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM transcripts").fetchone()[0]
+            if total > self.max_bytes:
+                # Walk from least to most recently used, keeping the entry just added
+                for old_id, size in self._db.execute(
+                    "SELECT file_id, size FROM transcripts WHERE file_id != ? ORDER BY last_used", (file_id,)
+                ).fetchall():
+                    if total <= self.max_bytes:
+                        break
+                    self._db.execute("DELETE FROM transcripts WHERE file_id = ?", (old_id,))
+                    total -= size
+                    self.evictions += 1
+            self._db.commit()
+
+    def clear(self):
+        with self._lock:
+            self._db.execute("DELETE FROM transcripts")
+            self._db.commit()
+
+    def stats(self):
+        with self._lock:
+            entries, size = self._db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM transcripts").fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+            "entries": entries,
+            "size_mb": round(size / (1024 * 1024), 2),
+            "max_mb": round(self.max_bytes / (1024 * 1024), 2)
+        }
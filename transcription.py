@@ -0,0 +1,168 @@
+"""
+Parallel transcription of long recordings.
+
+meeting_audio cuts a recording into segments of a few minutes at quiet
+moments. Here the segments are sent to a TranscriptionBackend concurrently,
+up to TRANSCRIPTION_PARALLELISM at a time, and the texts are stitched back
+together in order. Neighbouring segments share a second of audio, so the
+words at the start of one segment that repeat the end of the previous one are
+dropped while stitching.
+
+    backend = SpeechToTextBackend(creds)
+    result = transcribe_drive_file(drive_service, file_id, "video/mp4", backend)
+    result["transcript"]
+
+Any object with a transcribe(pcm) -> str method can stand in for the backend
+(TranscriptionBackend is a Protocol), so the pipeline can be exercised
+offline with a local fake.
+"""
+import contextvars
+import os
+import re
+from abc import abstractmethod
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Protocol, runtime_checkable
+
+import meeting_audio
+import tool_metrics
+
+# Segments transcribed at the same time, per recording
+TRANSCRIPTION_PARALLELISM = int(os.getenv("TRANSCRIPTION_PARALLELISM", "4"))
+
+# Threads shared by every recording being transcribed in this process
+_pool = ThreadPoolExecutor(int(os.getenv("TRANSCRIPTION_WORKERS", "8")), thread_name_prefix="transcribe")
+
+# The overlap is about a second of audio; a few words at most
+MAX_OVERLAP_WORDS = 8
+
+
+@runtime_checkable
+class TranscriptionBackend(Protocol):
+    """Turns one segment of 16 kHz mono 16-bit PCM into text
+
+    Subclassing is optional; a subclass that doesn't implement transcribe
+    can't be instantiated.
+    """
+
+    @abstractmethod
+    def transcribe(self, pcm: bytes) -> str:
+        ...
+
+
+class SpeechToTextBackend(TranscriptionBackend):
+    """Google Speech-to-Text streaming recognition, one stream per segment"""
+
+    # Audio sent per streaming request: 100 ms, as Speech-to-Text recommends
+    FRAME_BYTES = meeting_audio.BYTES_PER_SECOND // 10
+
+    def __init__(self, credentials, language_code: str = "en-US"):
+        # Imported here so the server starts without loading the Speech client
+        from google.cloud import speech_v1
+
+        self.speech = speech_v1
+        self.client = speech_v1.SpeechClient(credentials=credentials)
+        self.streaming_config = speech_v1.StreamingRecognitionConfig(
+            config=speech_v1.RecognitionConfig(
+                encoding=speech_v1.RecognitionConfig.AudioEncoding.LINEAR16,
+                sample_rate_hertz=meeting_audio.SAMPLE_RATE,
+                language_code=language_code,
+                enable_automatic_punctuation=True,
+            )
+        )
+
+    def transcribe(self, pcm: bytes):
+        requests = (
+            self.speech.StreamingRecognizeRequest(audio_content=pcm[offset:offset + self.FRAME_BYTES])
+            for offset in range(0, len(pcm), self.FRAME_BYTES)
+        )
+        responses = self.client.streaming_recognize(config=self.streaming_config, requests=requests)
+        return " ".join(
+            result.alternatives[0].transcript.strip()
+            for response in responses
+            for result in response.results
+            if result.is_final and result.alternatives
+        )
+
+
+def _normalize(word):
+    return re.sub(r"[^\w']", "", word.lower())
+
+
+def stitch(texts, max_overlap_words: int = MAX_OVERLAP_WORDS):
+    """Join segment texts in order, dropping words repeated across each boundary
+
+    The longest run of up to max_overlap_words words that ends one text and
+    starts the next (ignoring case and punctuation) is kept only once.
+    """
+    words = []
+    for text in texts:
+        incoming = text.split()
+        longest = min(max_overlap_words, len(words), len(incoming))
+        tail = [_normalize(word) for word in words[len(words) - longest:]]
+        head = [_normalize(word) for word in incoming[:longest]]
+        for size in range(longest, 0, -1):
+            if tail[longest - size:] == head[:size]:
+                incoming = incoming[size:]
+                break
+        words.extend(incoming)
+    return " ".join(words)
+
+
+def _transcribe_one(backend, segment):
+    with tool_metrics.span("speech_to_text"):
+        return backend.transcribe(segment.pcm)
+
+
+def transcribe_segments(segments, backend: TranscriptionBackend, parallelism: int = None):
+    """Transcribe Segments concurrently and return their texts in segment order
+
+    At most parallelism segments are in flight (and held in memory) at once;
+    the next one is only read from segments when a slot frees up.
+    """
+    # Checked before the first segment is read, not when a worker first calls it
+    if not isinstance(backend, TranscriptionBackend):
+        raise TypeError(f"{type(backend).__name__} has no transcribe(pcm) method")
+    parallelism = max(1, parallelism or TRANSCRIPTION_PARALLELISM)
+    texts = {}
+    running = {}
+    try:
+        for segment in segments:
+            if len(running) >= parallelism:
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    texts[running.pop(future)] = future.result()
+            # copy_context keeps span metrics attributed to the calling tool
+            future = _pool.submit(contextvars.copy_context().run, _transcribe_one, backend, segment)
+            running[future] = segment.index
+        for future in list(running):
+            texts[running.pop(future)] = future.result()
+    finally:
+        for future in running:
+            future.cancel()
+    return [texts[index] for index in sorted(texts)]
+
+
+def transcribe_drive_file(drive_service, file_id: str, mime_type: str, backend: TranscriptionBackend,
+                          parallelism: int = None, segment_seconds: float = None):
+    """Download, decode, segment and transcribe a recording
+
+    Returns {"transcript", "segments", "audio_seconds"}.
+    """
+    audio_bytes = 0
+
+    def counted(pcm_chunks):
+        nonlocal audio_bytes
+        for pcm in pcm_chunks:
+            audio_bytes += len(pcm)
+            yield pcm
+
+    pcm = counted(meeting_audio.decode_drive_file(drive_service, file_id, mime_type))
+    segments = meeting_audio.split_at_silence(pcm, max_seconds=segment_seconds)
+    texts = transcribe_segments(segments, backend, parallelism)
+    audio_seconds = audio_bytes / meeting_audio.BYTES_PER_SECOND
+    print(f"Transcribed {audio_seconds / 60:.1f} minutes of audio in {len(texts)} segments")
+    return {
+        "transcript": stitch(text for text in texts if text),
+        "segments": len(texts),
+        "audio_seconds": round(audio_seconds, 1)
+    }